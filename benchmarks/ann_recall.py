@@ -0,0 +1,70 @@
+"""
+Recall vs latency of the IVF index of NumpyVectorStore against exact search.
+
+    python benchmarks/ann_recall.py --rows 100000 --dims 384 --queries 200
+"""
+import argparse
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from grox.documents.numpy_store import NumpyVectorStore
+
+
+class _NoEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+
+def _clustered(rng, rows, dims, clusters=256):
+    # real embeddings are clustered, uniform noise would understate IVF recall
+    centers = rng.normal(size=(clusters, dims))
+    labels = rng.integers(0, clusters, size=rows)
+    return (centers[labels] + 0.5 * rng.normal(size=(rows, dims))).astype(np.float32)
+
+
+def _timed_search(store, queries, k, **kwargs):
+    started = time.perf_counter()
+    results = [store.similarity_search_with_score_by_vector(q, k=k, **kwargs) for q in queries]
+    elapsed = time.perf_counter() - started
+    return [[doc.id for doc, _ in hits] for hits in results], elapsed / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", default="cosine", choices=["cosine", "ip", "l2"])
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _clustered(rng, args.rows, args.dims)
+    queries = _clustered(rng, args.queries, args.dims)
+    ids = [str(i) for i in range(args.rows)]
+
+    store = NumpyVectorStore(_NoEmbeddings(), distance_metric=args.metric, algorithm="ivf", nlist=args.nlist)
+    store.add_vectors(vectors, ids, ids=ids)
+
+    started = time.perf_counter()
+    store.similarity_search_with_score_by_vector(queries[0], k=args.k)
+    print(f"rows={args.rows} dims={args.dims} metric={args.metric} train={time.perf_counter() - started:.2f}s")
+
+    exact, exact_ms = _timed_search(store, queries, args.k, exact=True)
+    print(f"{'exact':>10}  recall@{args.k}=1.000  {exact_ms:8.3f} ms/query")
+
+    for nprobe in args.nprobe:
+        approx, approx_ms = _timed_search(store, queries, args.k, nprobe=nprobe)
+        recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(approx, exact)])
+        print(f"{'nprobe=' + str(nprobe):>10}  recall@{args.k}={recall:.3f}  {approx_ms:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+GroxExecutionContext creations per second against the previous implementation
+that copied every project attribute and bound a new logger per request.
+
+    python benchmarks/context_creation.py --contexts 200000
+"""
+import argparse
+import time
+
+import structlog
+
+from grox.config import GroxAppConfig, GroxProjectConfig, ProjectMetadata
+from grox.context import GroxExecutionContext
+from grox.project import GroxProject
+
+
+class _CopyingContext:
+    """The previous implementation."""
+
+    def __init__(self, project, input=None, correlation_id=None, user_id=None):
+        for key, value in project.__dict__.items():
+            if not key.startswith("_"):
+                setattr(self, key, value)
+        self.input = input or {}
+        self.correlation_id = correlation_id
+        self.user_id = user_id
+
+        logger_metadata = {
+            "tenant_id": project.tenant_id,
+            "project_code": project.project_code,
+            "correlation_id": correlation_id,
+            "user_id": user_id,
+            "service": project.app.service,
+            "version": project.app.version,
+            "environment": project.app.environment,
+        }
+        self.logger = structlog.get_logger().bind(**{k: v for k, v in logger_metadata.items() if v is not None})
+        self.logger.debug("available context properties", data=self.__dict__.keys())
+
+
+def _rate(factory, project, contexts, use_logger):
+    started = time.perf_counter()
+    for i in range(contexts):
+        ctx = factory(project, input={"prompt": "hi"}, correlation_id=str(i), user_id="user")
+        if use_logger:
+            ctx.logger
+    return contexts / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contexts", type=int, default=200_000)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(20))  # INFO
+    app = GroxAppConfig(service="bench", environment="bench")
+    project = GroxProject(app, "tenant", GroxProjectConfig(
+        version="1.0.0", metadata=ProjectMetadata(title="bench", project="bench"),
+    ))
+
+    print(f"contexts={args.contexts}")
+    for use_logger in (False, True):
+        before = _rate(_CopyingContext, project, args.contexts, use_logger)
+        after = _rate(GroxExecutionContext, project, args.contexts, use_logger)
+        label = "with logger" if use_logger else "no logger"
+        print(f"{label:>12}  copying={before:12,.0f}/s  slotted={after:12,.0f}/s  x{after / before:.2f}")
+
+
+if __name__ == "__main__":
+    main()
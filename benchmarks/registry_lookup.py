@@ -0,0 +1,85 @@
+"""
+Project lookup throughput of GroxContext under N threads, copy-on-write registry
+against the previous lock-per-lookup registry.
+
+    python benchmarks/registry_lookup.py --projects 1000 --threads 1 4 16 --lookups 200000
+"""
+import argparse
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from grox.config import GroxAppConfig
+from grox.context import GroxContext
+
+
+class _LockedRegistry:
+    """The previous implementation: every read takes the registry and instance locks."""
+
+    _instance_lock = threading.Lock()
+
+    def __init__(self, projects):
+        self._projects = dict(projects)
+        self._projects_lock = threading.Lock()
+
+    def get_instance(self):
+        with self._instance_lock:
+            return self
+
+    def get_project(self, tenant_id, project_code):
+        with self._projects_lock:
+            return self._projects.get((tenant_id, project_code))
+
+    def has_project(self, tenant_id, project_code):
+        with self._projects_lock:
+            return (tenant_id, project_code) in self._projects
+
+
+def _run(registry, get_instance, keys, threads, lookups):
+    """Lookups per second over all threads, every thread does lookups // threads lookups."""
+    per_thread = lookups // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        sample = random.Random(seed).choices(keys, k=per_thread)
+        barrier.wait()
+        for tenant_id, project_code in sample:
+            ctx = get_instance()
+            if ctx.has_project(tenant_id, project_code):
+                ctx.get_project(tenant_id, project_code)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    keys = [(f"tenant_{i % 50}", f"proj_{i}") for i in range(args.projects)]
+    projects = {key: SimpleNamespace(tenant_id=key[0], project_code=key[1]) for key in keys}
+
+    ctx = GroxContext(GroxAppConfig(log_level="WARNING"))
+    for project in projects.values():
+        ctx.register_project(project)
+    locked = _LockedRegistry(projects)
+
+    print(f"projects={args.projects} lookups={args.lookups}")
+    for threads in args.threads:
+        before = _run(locked, locked.get_instance, keys, threads, args.lookups)
+        after = _run(ctx, GroxContext.get_instance, keys, threads, args.lookups)
+        print(f"threads={threads:>3}  locked={before:12,.0f}/s  copy-on-write={after:12,.0f}/s  x{after / before:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
+import importlib
+
 from .config import GroxAppConfig, GroxProjectConfig
-from .context import GroxContext, GroxExecutionContext
-from .project import GroxProject
-from .grox import Grox
 from .logger import setup_logging, register_log_callback
 
+# The runtime classes pull in langgraph, langchain and the model SDKs,
+# they are imported on first access so that `import grox` stays cheap.
+_LAZY_EXPORTS = {
+    "GroxContext": "grox.context",
+    "GroxExecutionContext": "grox.context",
+    "GroxProject": "grox.project",
+    "Grox": "grox.grox",
+    "ProjectWatcher": "grox.reload",
+}
+
 __all__ = [
     "GroxAppConfig",
     "GroxProjectConfig",
@@ -11,6 +20,20 @@ __all__ = [
     "GroxExecutionContext",
     "GroxProject",
     "Grox",
+    "ProjectWatcher",
     "setup_logging",
     "register_log_callback"
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
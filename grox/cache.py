@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache with an optional time-to-live per entry.
+    Keeps hit/miss/eviction counters for monitoring.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ) -> None:
+        """
+        max_size - maximum number of entries, least recently used are evicted first
+        ttl - seconds an entry stays valid after it was set, None - forever
+        on_evict - called with (key, value) for entries dropped by size or ttl
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, expires_at: Optional[float], now: float) -> bool:
+        return expires_at is not None and expires_at <= now
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        evicted = _MISSING
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self._expired(entry[1], time.monotonic()):
+                del self._data[key]
+                self.evictions += 1
+                evicted = entry[0]
+                entry = _MISSING
+
+            if entry is _MISSING:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+
+        if evicted is not _MISSING and self.on_evict:
+            self.on_evict(key, evicted)
+        return default if entry is _MISSING else entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        evicted = []
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                old_key, (old_value, _) = self._data.popitem(last=False)
+                self.evictions += 1
+                evicted.append((old_key, old_value))
+
+        if self.on_evict:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def popitem(self) -> Tuple[Hashable, Any]:
+        """Remove and return the least recently used entry, without calling on_evict. KeyError when empty."""
+        with self._lock:
+            key, (value, _) = self._data.popitem(last=False)
+            self.evictions += 1
+        return key, value
+
+    def purge_expired(self) -> int:
+        """Drop expired entries now instead of on access, returns the number dropped."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [(k, v) for k, (v, expires_at) in self._data.items() if self._expired(expires_at, now)]
+            for k, _ in expired:
+                del self._data[k]
+            self.evictions += len(expired)
+
+        if self.on_evict:
+            for k, v in expired:
+                self.on_evict(k, v)
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and not self._expired(entry[1], time.monotonic())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
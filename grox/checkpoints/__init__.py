@@ -0,0 +1,29 @@
+import importlib
+
+# Names are resolved on first access: the savers pull in langgraph and redis,
+# which a deployment using the memory backends never needs.
+_EXPORTS = {
+    "PipelinedRedisSaver": "grox.checkpoints.redis_saver",
+    "AsyncPipelinedRedisSaver": "grox.checkpoints.redis_saver",
+    "PipelinedRedisChatMessageHistory": "grox.checkpoints.redis_history",
+    "CompactSerializer": "grox.checkpoints.serializer",
+    "BoundedMemorySaver": "grox.checkpoints.memory",
+    "ChatHistoryMemoryManager": "grox.checkpoints.memory",
+    "compact_checkpoints": "grox.checkpoints.compaction",
+    "thread_prefix": "grox.checkpoints.compaction",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
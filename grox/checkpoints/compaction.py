@@ -0,0 +1,207 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from langgraph.checkpoint.redis.base import (
+    CHECKPOINT_PREFIX,
+    CHECKPOINT_WRITE_PREFIX,
+    REDIS_KEY_SEPARATOR,
+    BaseRedisSaver,
+)
+from pydantic import BaseModel
+
+from ..grox import THREAD_ID_SEPARATOR
+from .serializer import DELTA_PREFIX, CompactSerializer
+
+_GLOB_SPECIAL = set("*?[]\\")
+
+_CHECKPOINT_FIELDS = ("$.thread_id", "$.checkpoint_ns", "$.checkpoint_id", "$.checkpoint.channel_versions")
+
+
+class CompactionReport(BaseModel):
+    prefix: str
+    dry_run: bool = False
+    threads: int = 0
+    checkpoints_kept: int = 0
+    checkpoints_deleted: int = 0
+    blobs_deleted: int = 0
+    writes_deleted: int = 0
+    bytes_reclaimed: int = 0
+
+
+def thread_prefix(tenant_id: str, project_code: Optional[str] = None, session_id: Optional[str] = None) -> str:
+    """
+    Start of the thread ids Grox._make_thread_id gives the sessions of a tenant,
+    of one of its projects or the thread id of a single session.
+    """
+    if session_id is not None and project_code is None:
+        raise ValueError("A session can only be selected together with its project")
+    parts = [tenant_id, project_code, session_id]
+    prefix = THREAD_ID_SEPARATOR.join(part for part in parts if part is not None)
+    return prefix if session_id is not None else prefix + THREAD_ID_SEPARATOR
+
+
+def _glob_escape(value: str) -> str:
+    return "".join("\\" + char if char in _GLOB_SPECIAL else char for char in value)
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _blob_key(thread_id: str, checkpoint_ns: str, channel: str, version: Any) -> str:
+    return BaseRedisSaver._make_redis_checkpoint_blob_key(thread_id, checkpoint_ns, channel, str(version))
+
+
+def _first(doc: Optional[Dict[str, list]], path: str) -> Any:
+    values = (doc or {}).get(path) or []
+    return values[0] if values else None
+
+
+class _Compactor:
+    def __init__(self, redis_client, batch_size: int) -> None:
+        self.redis = redis_client
+        self.batch_size = batch_size
+        self._serde: Optional[CompactSerializer] = None
+
+    @property
+    def serde(self) -> CompactSerializer:
+        # delta blobs only exist with the compact format, zstandard is not needed otherwise
+        if self._serde is None:
+            self._serde = CompactSerializer()
+        return self._serde
+
+    def scan(self, pattern: str) -> Iterator[str]:
+        for key in self.redis.scan_iter(match=pattern, count=self.batch_size):
+            yield _text(key)
+
+    def fetch(self, keys: List[str], *paths: str) -> Iterator[Tuple[str, Any]]:
+        """(key, document) for every key, a single path yields its first value, several a dict."""
+        for batch in _batched(keys, self.batch_size):
+            pipeline = self.redis.pipeline(transaction=False)
+            for key in batch:
+                pipeline.json().get(key, *paths)
+            for key, doc in zip(batch, pipeline.execute()):
+                if doc is None:
+                    continue
+                yield key, (doc[0] if doc else None) if len(paths) == 1 else doc
+
+    def size(self, keys: List[str]) -> int:
+        total = 0
+        for batch in _batched(keys, self.batch_size):
+            pipeline = self.redis.pipeline(transaction=False)
+            for key in batch:
+                pipeline.memory_usage(key)
+            total += sum(size or 0 for size in pipeline.execute())
+        return total
+
+    def delete(self, keys: List[str]) -> None:
+        for batch in _batched(keys, self.batch_size):
+            pipeline = self.redis.pipeline(transaction=False)
+            for key in batch:
+                pipeline.unlink(key)
+            pipeline.execute()
+
+    def delta_bases(self, blobs: Dict[str, Tuple[str, str, str]]) -> Set[str]:
+        """
+        The blobs the delta encoded ones among blobs (key -> thread_id, checkpoint_ns,
+        channel) are built on, transitively.
+        """
+        needed: Dict[str, Tuple[str, str, str]] = {}
+        frontier = sorted(blobs)
+        while frontier:
+            deltas = [key for key, type_ in self.fetch(frontier, "$.type") if _text(type_ or "").startswith(DELTA_PREFIX)]
+            frontier = []
+            for key, doc in self.fetch(deltas, "$.type", "$.blob"):
+                delta = self.serde.loads_typed((_first(doc, "$.type"), _first(doc, "$.blob")))
+                owner = blobs.get(key) or needed[key]
+                base = _blob_key(*owner, delta.base_version)
+                if base not in blobs and base not in needed:
+                    needed[base] = owner
+                    frontier.append(base)
+        return set(needed)
+
+
+def compact_checkpoints(
+    redis_client,
+    prefix: str,
+    *,
+    keep_ancestors: int = 0,
+    batch_size: int = 500,
+    dry_run: bool = False,
+) -> CompactionReport:
+    """
+    Trim the checkpoint history of the threads whose id starts with prefix
+    (see thread_prefix): per thread and namespace the latest checkpoint and its
+    keep_ancestors predecessors stay, older checkpoints go together with their
+    pending writes and the blobs no kept checkpoint references. Blobs a kept
+    delta encoded value is built on are kept as well, so every kept checkpoint
+    can still be resumed.
+
+    Blobs no checkpoint references yet, e.g. of a checkpoint being written, are
+    never touched. Keys are read, sized and deleted in pipelines of batch_size
+    commands; with dry_run nothing is deleted, the report tells what would be.
+    """
+    if keep_ancestors < 0:
+        raise ValueError("keep_ancestors can not be negative")
+    compactor = _Compactor(redis_client, batch_size)
+    report = CompactionReport(prefix=prefix, dry_run=dry_run)
+    exact = not prefix.endswith(THREAD_ID_SEPARATOR)
+    pattern_prefix = _glob_escape(prefix) + (REDIS_KEY_SEPARATOR if exact else "")
+
+    # (thread_id, checkpoint_ns) -> [(checkpoint_id, key, channel_versions)]
+    threads: Dict[Tuple[str, str], List[Tuple[str, str, Dict[str, Any]]]] = defaultdict(list)
+    checkpoint_keys = list(compactor.scan(f"{CHECKPOINT_PREFIX}{REDIS_KEY_SEPARATOR}{pattern_prefix}*"))
+    for key, doc in compactor.fetch(checkpoint_keys, *_CHECKPOINT_FIELDS):
+        thread_id, checkpoint_ns, checkpoint_id, versions = (_first(doc, path) for path in _CHECKPOINT_FIELDS)
+        if thread_id is None or (exact and thread_id != prefix):
+            continue
+        threads[(thread_id, checkpoint_ns)].append((checkpoint_id, key, versions or {}))
+
+    kept_blobs: Dict[str, Tuple[str, str, str]] = {}
+    dropped_blobs: Set[str] = set()
+    dropped_checkpoints: List[str] = []
+    dropped_writes: Set[str] = set()  # checkpoint_write:{thread}:{ns}:{checkpoint_id}
+    for (thread_id, checkpoint_ns), checkpoints in threads.items():
+        # checkpoint ids are time ordered
+        checkpoints.sort(key=lambda checkpoint: checkpoint[0])
+        split = max(len(checkpoints) - 1 - keep_ancestors, 0)
+        for checkpoint_id, key, versions in checkpoints[split:]:
+            for channel, version in versions.items():
+                kept_blobs[_blob_key(thread_id, checkpoint_ns, channel, version)] = (thread_id, checkpoint_ns, channel)
+        for checkpoint_id, key, versions in checkpoints[:split]:
+            dropped_checkpoints.append(key)
+            dropped_writes.add(REDIS_KEY_SEPARATOR.join([CHECKPOINT_WRITE_PREFIX, thread_id, checkpoint_ns, checkpoint_id]))
+            dropped_blobs.update(_blob_key(thread_id, checkpoint_ns, channel, version) for channel, version in versions.items())
+        report.checkpoints_kept += len(checkpoints) - split
+    report.threads = len({thread_id for thread_id, _ in threads})
+
+    # a kept delta needs the blobs it is built on, even those of dropped checkpoints
+    kept = set(kept_blobs) | (compactor.delta_bases(kept_blobs) if dropped_blobs else set())
+    blobs = sorted(dropped_blobs - kept)
+
+    writes: List[str] = []
+    if dropped_writes:
+        for key in compactor.scan(f"{CHECKPOINT_WRITE_PREFIX}{REDIS_KEY_SEPARATOR}{pattern_prefix}*"):
+            # the key ends with :{task_id}:{idx} or, without an index, :{task_id}
+            if key.rsplit(REDIS_KEY_SEPARATOR, 2)[0] in dropped_writes or key.rsplit(REDIS_KEY_SEPARATOR, 1)[0] in dropped_writes:
+                writes.append(key)
+
+    doomed = dropped_checkpoints + blobs + writes
+    report.checkpoints_deleted = len(dropped_checkpoints)
+    report.blobs_deleted = len(blobs)
+    report.writes_deleted = len(writes)
+    report.bytes_reclaimed = compactor.size(doomed)
+    if not dry_run:
+        compactor.delete(doomed)
+    return report
@@ -0,0 +1,297 @@
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from pydantic import PrivateAttr
+
+from ..cache import TTLCache
+from ..config import MemoryLimitsConfig
+
+
+def _max_size(limits: MemoryLimitsConfig) -> int:
+    return limits.max_threads if limits.max_threads is not None else sys.maxsize
+
+
+class _ThreadUsage:
+    """What one thread holds in the saver, so it can be pruned and dropped without scans."""
+
+    __slots__ = ("bytes", "checkpoints", "blobs", "writes")
+
+    def __init__(self) -> None:
+        self.bytes = 0
+        # (checkpoint_ns, checkpoint_id) -> (size, referenced blob keys)
+        self.checkpoints: Dict[Tuple[str, str], Tuple[int, Tuple[tuple, ...]]] = {}
+        # blob key -> [size, referencing checkpoints]
+        self.blobs: Dict[tuple, List[int]] = {}
+        # (checkpoint_ns, checkpoint_id) -> size of its pending writes
+        self.writes: Dict[Tuple[str, str], int] = {}
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver with bounds: threads expire ttl seconds after their last write,
+    at most max_threads threads and max_bytes serialized bytes are kept (least
+    recently used threads are evicted first), and optionally only the last
+    keep_last checkpoints of a thread.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, limits: Optional[MemoryLimitsConfig] = None) -> None:
+        super().__init__()
+        self.limits = limits or MemoryLimitsConfig()
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._threads = TTLCache(max_size=_max_size(self.limits), ttl=ttl, on_evict=self._on_evict)
+        self._bytes = 0
+        self._purged_at = time.monotonic()
+
+    # accounting
+
+    def _usage(self, thread_id: str) -> _ThreadUsage:
+        usage = self._threads.get(thread_id)
+        return usage if usage is not None else _ThreadUsage()
+
+    def _drop_checkpoint(self, thread_id: str, usage: _ThreadUsage, checkpoint_ns: str, checkpoint_id: str) -> None:
+        size, blob_keys = usage.checkpoints.pop((checkpoint_ns, checkpoint_id))
+        self.storage[thread_id][checkpoint_ns].pop(checkpoint_id, None)
+        self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        freed = size + usage.writes.pop((checkpoint_ns, checkpoint_id), 0)
+        for key in blob_keys:
+            entry = usage.blobs[key]
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del usage.blobs[key]
+                self.blobs.pop(key, None)
+                freed += entry[0]
+        usage.bytes -= freed
+        self._bytes -= freed
+
+    def _drop_thread(self, thread_id: str, usage: _ThreadUsage) -> None:
+        self.storage.pop(thread_id, None)
+        for checkpoint_ns, checkpoint_id in usage.writes:
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        for key in usage.blobs:
+            self.blobs.pop(key, None)
+        self._bytes -= usage.bytes
+
+    def _on_evict(self, thread_id: str, usage: _ThreadUsage) -> None:
+        with self._lock:
+            self._drop_thread(thread_id, usage)
+
+    def _enforce_limits(self, thread_id: str) -> None:
+        now = time.monotonic()
+        if self.ttl is not None and now - self._purged_at >= min(self.ttl, 60):
+            self._purged_at = now
+            self._threads.purge_expired()
+
+        max_bytes = self.limits.max_bytes
+        while max_bytes is not None and self._bytes > max_bytes and len(self._threads) > 1:
+            victim, usage = self._threads.popitem()
+            if victim == thread_id:
+                # the thread being written is the most recently used, this can not happen
+                self._threads.set(victim, usage)
+                break
+            self._drop_thread(victim, usage)
+
+    # saver
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with self._lock:
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            checkpoint_id = checkpoint["id"]
+
+            usage = self._usage(thread_id)
+            if (checkpoint_ns, checkpoint_id) in usage.checkpoints:
+                # written again, e.g. by update_state
+                self._drop_checkpoint(thread_id, usage, checkpoint_ns, checkpoint_id)
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+
+            added = 0
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                if key not in usage.blobs:
+                    size = len(self.blobs[key][1])
+                    usage.blobs[key] = [size, 0]
+                    added += size
+
+            blob_keys = tuple(
+                key for key in (
+                    (thread_id, checkpoint_ns, channel, version)
+                    for channel, version in checkpoint["channel_versions"].items()
+                )
+                if key in usage.blobs
+            )
+            for key in blob_keys:
+                usage.blobs[key][1] += 1
+
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint_id]
+            size = len(saved[1]) + len(saved_metadata[1])
+            usage.checkpoints[(checkpoint_ns, checkpoint_id)] = (size, blob_keys)
+            added += size
+            usage.bytes += added
+            self._bytes += added
+
+            keep_last = self.limits.keep_last
+            if keep_last is not None:
+                # checkpoint ids are time ordered
+                ids = sorted(cid for ns, cid in usage.checkpoints if ns == checkpoint_ns)
+                for old_id in ids[:-keep_last]:
+                    self._drop_checkpoint(thread_id, usage, checkpoint_ns, old_id)
+
+            self._threads.set(thread_id, usage)
+            self._enforce_limits(thread_id)
+            return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with self._lock:
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+            checkpoint_id = config["configurable"]["checkpoint_id"]
+            usage = self._threads.get(thread_id)
+            if usage is None or (checkpoint_ns, checkpoint_id) not in usage.checkpoints:
+                # the checkpoint expired or was pruned, its writes have nothing to resume
+                return
+
+            super().put_writes(config, writes, task_id, task_path)
+            size = sum(len(value[1]) for _, _, value, _ in self.writes[(thread_id, checkpoint_ns, checkpoint_id)].values())
+            added = size - usage.writes.get((checkpoint_ns, checkpoint_id), 0)
+            usage.writes[(checkpoint_ns, checkpoint_id)] = size
+            usage.bytes += added
+            self._bytes += added
+            self._enforce_limits(thread_id)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            # unknown threads never reach the defaultdicts of InMemorySaver
+            if self._threads.get(config["configurable"]["thread_id"]) is None:
+                return None
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config and self._threads.get(config["configurable"]["thread_id"]) is None:
+                return
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            usage = self._threads.pop(thread_id)
+            if usage is not None:
+                self._drop_thread(thread_id, usage)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._threads.stats(), "bytes": self._bytes, "max_bytes": self.limits.max_bytes}
+
+
+def _message_size(message: BaseMessage) -> int:
+    content = message.content if isinstance(message.content, str) else repr(message.content)
+    return len(content.encode())
+
+
+class _BoundedChatHistory(InMemoryChatMessageHistory):
+    """Session history reporting its growth to the ChatHistoryMemoryManager that owns it."""
+
+    _manager: Any = PrivateAttr(default=None)
+    _session_id: str = PrivateAttr(default="")
+    _bytes: int = PrivateAttr(default=0)
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.add_messages([message])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        manager = self._manager
+        with manager._lock:
+            self.messages.extend(messages)
+            added = sum(_message_size(message) for message in messages)
+
+            keep_last = manager.limits.keep_last
+            if keep_last is not None and len(self.messages) > keep_last:
+                dropped = self.messages[:-keep_last]
+                del self.messages[:-keep_last]
+                added -= sum(_message_size(message) for message in dropped)
+
+            manager._grew(self._session_id, self, added)
+            self._bytes += added
+
+    def clear(self) -> None:
+        manager = self._manager
+        with manager._lock:
+            self.messages = []
+            manager._grew(self._session_id, self, -self._bytes)
+            self._bytes = 0
+
+
+class ChatHistoryMemoryManager:
+    """
+    In-memory chat histories of one project, one per session. Sessions expire ttl
+    seconds after their last message; at most limits.max_threads sessions and
+    limits.max_bytes of message content are kept, least recently used first out.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, limits: Optional[MemoryLimitsConfig] = None):
+        self.limits = limits or MemoryLimitsConfig()
+        self._lock = threading.RLock()
+        self._memory_buckets = TTLCache(max_size=_max_size(self.limits), ttl=ttl, on_evict=self._on_evict)
+        self._bytes = 0
+
+    def get_instance(self, session_id: str) -> InMemoryChatMessageHistory:
+        with self._lock:
+            history = self._memory_buckets.get(session_id)
+            if history is None:
+                history = _BoundedChatHistory()
+                history._manager = self
+                history._session_id = session_id
+                self._memory_buckets.set(session_id, history)
+            return history
+
+    def _on_evict(self, session_id: str, history: _BoundedChatHistory) -> None:
+        with self._lock:
+            self._bytes -= history._bytes
+
+    def _grew(self, session_id: str, history: _BoundedChatHistory, added: int) -> None:
+        """Called before history._bytes changes by `added`."""
+        if self._memory_buckets.get(session_id) is not history:
+            # evicted while the caller still holds it, no longer counted
+            return
+        self._bytes += added
+        # a new message restarts the ttl
+        self._memory_buckets.set(session_id, history)
+
+        max_bytes = self.limits.max_bytes
+        while max_bytes is not None and self._bytes > max_bytes and len(self._memory_buckets) > 1:
+            victim, victim_history = self._memory_buckets.popitem()
+            self._bytes -= victim_history._bytes
+
+    def __len__(self) -> int:
+        return len(self._memory_buckets)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._memory_buckets.stats(), "bytes": self._bytes, "max_bytes": self.limits.max_bytes}
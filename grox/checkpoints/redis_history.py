@@ -0,0 +1,87 @@
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_redis import RedisChatMessageHistory
+from ulid import ULID
+
+# search index per (client, index name), created once per process
+_indexes: Dict[Tuple[int, str], Any] = {}
+_indexes_lock = threading.Lock()
+
+
+class PipelinedRedisChatMessageHistory(RedisChatMessageHistory):
+    """
+    RedisChatMessageHistory writing all the messages of a turn in one pipeline.
+
+    The base class stores every message with its own round trip and talks to Redis
+    three times (CLIENT SETINFO, FT.INFO, FT.CREATE) each time a session history is
+    constructed, which the chat history factory does once per turn.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        *,
+        redis_client,
+        key_prefix: str = "chat:",
+        ttl: Optional[int] = None,
+        index_name: str = "idx:chat_history",
+    ) -> None:
+        if not session_id or not isinstance(session_id, str):
+            raise ValueError("session_id must be a non-empty, valid string")
+
+        self.redis_client = redis_client
+        self.session_id = session_id
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.index_name = index_name
+        self.overwrite_index = False
+        self._create_search_index()
+
+    def _create_search_index(self) -> None:
+        key = (id(self.redis_client), self.index_name)
+        index = _indexes.get(key)
+        if index is None:
+            with _indexes_lock:
+                index = _indexes.get(key)
+                if index is None:
+                    super()._create_search_index()
+                    index = _indexes[key] = self.index
+        self.index = index
+
+    def _record(self, message: BaseMessage, timestamp: float) -> Tuple[str, Dict[str, Any]]:
+        # same layout as RedisChatMessageHistory.add_message
+        message_id = str(ULID())
+        record: Dict[str, Any] = {
+            "type": message.type,
+            "message_id": message_id,
+            "data": {
+                "content": message.content,
+                "additional_kwargs": message.additional_kwargs,
+                "type": message.type,
+            },
+            "session_id": self.session_id,
+            "timestamp": timestamp,
+        }
+        if isinstance(message, ToolMessage):
+            record["data"]["tool_call_id"] = message.tool_call_id
+            record["data"]["status"] = message.status
+        return self._message_key(message_id), record
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.add_messages([message])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        if any(message is None for message in messages):
+            raise ValueError("Message cannot be None")
+        if not messages:
+            return
+
+        timestamp = datetime.now().timestamp()
+        # messages are read back sorted by timestamp, keep the order within the batch
+        keys, records = zip(*(
+            self._record(message, timestamp + offset * 1e-6) for offset, message in enumerate(messages)
+        ))
+        self.index.load(data=list(records), keys=list(keys), ttl=self.ttl, batch_size=len(records))
@@ -0,0 +1,690 @@
+import json
+import threading
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.redis import AsyncRedisSaver, RedisSaver
+from langgraph.checkpoint.redis.base import (
+    WRITES_IDX_MAP,
+    BaseRedisSaver,
+    to_storage_safe_id,
+    to_storage_safe_str,
+)
+from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer
+
+from ..cache import TTLCache
+from ..config import CheckpointEncodingConfig, LocalCheckpointCacheConfig, WriteFlushConfig
+from .serializer import CompactSerializer, ListDelta
+
+# ("set", key, document, nx), ("hset", key, mapping, None) or ("expire", key, seconds, None),
+# replayed on a pipeline
+Command = Tuple[str, str, Any, Optional[bool]]
+
+# threads whose last list channel values are remembered to write the next ones as deltas
+DELTA_BASES = 1024
+
+# hash per thread: checkpoint_ns -> token of the last write, the version checked by the local tier
+VERSIONS_PREFIX = "grox_checkpoint_versions"
+
+
+class _ListBase(NamedTuple):
+    """The last known value of a list channel and the versions needed to rebuild it."""
+    version: str
+    items: list
+    chain: Tuple[str, ...]
+
+
+class _CachedCheckpoint(NamedTuple):
+    """The latest checkpoint of a thread namespace as written by this process."""
+    token: str
+    checkpoint_id: str
+    checkpoint: Checkpoint
+    metadata: CheckpointMetadata
+    parent_config: Optional[RunnableConfig]
+
+
+def _parent_config(config: Optional[RunnableConfig]) -> Optional[RunnableConfig]:
+    """
+    Config of the parent_checkpoint_id a checkpoint is stored with, which the
+    checkpoint records of RedisSaver set to the checkpoint_id of the put config.
+    """
+    if config is None or not config["configurable"].get("checkpoint_id"):
+        return None
+    configurable = config["configurable"]
+    return {
+        "configurable": {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": configurable["checkpoint_id"],
+        }
+    }
+
+
+def _with_parent(checkpoint_tuple: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+    """RedisSaver reads the parent_checkpoint_id of a checkpoint without returning it."""
+    if checkpoint_tuple is None or checkpoint_tuple.parent_config is not None:
+        return checkpoint_tuple
+    return checkpoint_tuple._replace(parent_config=_parent_config(checkpoint_tuple.config))
+
+
+def _common_prefix(base: list, value: list) -> int:
+    count = 0
+    for old, new in zip(base, value):
+        if old is not new and old != new:
+            break
+        count += 1
+    return count
+
+
+def _newer(version: str, than: str) -> bool:
+    """Channel versions are numbers, RedisSaver's with a zero padded integer part and a random suffix."""
+    try:
+        return float(version.split(".")[0]) > float(than.split(".")[0])
+    except ValueError:
+        return version > than
+
+
+def _apply_deltas(items: list, deltas: List[ListDelta]) -> list:
+    for delta in reversed(deltas):
+        items = items[:delta.count] + list(delta.items)
+    return items
+
+
+class _PipelinedWrites:
+    """
+    Turns put / put_writes into Redis commands sent in one pipeline.
+
+    RedisSaver needs an EXISTS per write and separate round trips for the checkpoint,
+    its blobs and their TTLs. Here a checkpoint is one round trip, and a task's writes
+    are another or, with the step flush policy, travel with the next checkpoint.
+    """
+
+    def _init_pipelining(
+        self,
+        flush: Optional[WriteFlushConfig],
+        encoding: Optional[CheckpointEncodingConfig],
+        local_cache: Optional[LocalCheckpointCacheConfig] = None,
+    ) -> None:
+        self.write_flush = flush or WriteFlushConfig()
+        self._pending: List[Command] = []
+        self.round_trips = 0
+
+        self.local_cache = local_cache or LocalCheckpointCacheConfig()
+        self._latest: Optional[TTLCache] = None
+        if self.local_cache.max_threads:
+            self._latest = TTLCache(max_size=self.local_cache.max_threads, ttl=self.local_cache.ttl)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_stale = 0
+
+        self.encoding = encoding or CheckpointEncodingConfig()
+        self._delta_bases: Optional[TTLCache] = None
+        if self.encoding.format == "compact":
+            self.serde = CompactSerializer(self.encoding)
+            self._delta_bases = TTLCache(max_size=DELTA_BASES)
+
+    def _dump_checkpoint(self, checkpoint: Checkpoint) -> Dict[str, Any]:
+        # the checkpoint document stays JSON whatever the value encoding, it is indexed and queried
+        type_, data = JsonPlusRedisSerializer.dumps_typed(self.serde, checkpoint)
+        return {"type": type_, **json.loads(data), "pending_sends": []}
+
+    # delta encoding of list channels
+
+    def _base(self, thread_id: str, checkpoint_ns: str, channel: str) -> Optional[_ListBase]:
+        if self._delta_bases is None:
+            return None
+        return (self._delta_bases.get(thread_id) or {}).get((checkpoint_ns, channel))
+
+    def _remember(self, thread_id: str, checkpoint_ns: str, channel: str, base: _ListBase) -> None:
+        if self._delta_bases is None:
+            return
+        bases = self._delta_bases.get(thread_id) or {}
+        bases[(checkpoint_ns, channel)] = base
+        self._delta_bases.set(thread_id, bases)
+
+    def _forget(self, thread_id: str) -> None:
+        """Drop what is known of a thread whose blobs were deleted."""
+        if self._delta_bases is not None:
+            self._delta_bases.pop(to_storage_safe_id(thread_id))
+        if self._latest is not None:
+            self._latest.pop(to_storage_safe_id(thread_id))
+
+    def _blob_key(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> str:
+        return BaseRedisSaver._make_redis_checkpoint_blob_key(thread_id, checkpoint_ns, channel, version)
+
+    def _encode_deltas(
+        self, thread_id: str, checkpoint_ns: str, values: Dict[str, Any], versions: ChannelVersions,
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Replace list values extending the last known value of their channel by deltas,
+        returns the values to store and the blob keys the deltas depend on.
+        """
+        if self._delta_bases is None:
+            return values, []
+
+        encoded = dict(values)
+        base_keys: List[str] = []
+        for channel, version in versions.items():
+            value = values.get(channel)
+            if not isinstance(value, list):
+                continue
+            version = str(version)
+            base = self._base(thread_id, checkpoint_ns, channel)
+            count = _common_prefix(base.items, value) if base is not None and base.version != version else 0
+            if count and len(base.chain) < self.encoding.snapshot_every:
+                encoded[channel] = ListDelta(base.version, count, value[count:], base.chain)
+                base_keys.extend(self._blob_key(thread_id, checkpoint_ns, channel, v) for v in base.chain)
+                chain = base.chain + (version,)
+            else:
+                chain = (version,)
+            self._remember(thread_id, checkpoint_ns, channel, _ListBase(version, list(value), chain))
+        return encoded, base_keys
+
+    def _delta_steps(self, thread_id: str, checkpoint_ns: str, channel: str, version: str, value: ListDelta):
+        """
+        Generator walking a delta chain down to a full value: yields lists of blob
+        keys to fetch, is sent their documents and returns the rebuilt list. A delta
+        names its whole chain, so the blobs are fetched together; only the part above
+        a value known here is fetched.
+        """
+        deltas = [value]
+        chain = [version]
+        while True:
+            delta = deltas[-1]
+            base = self._base(thread_id, checkpoint_ns, channel)
+            if base is not None and base.version == delta.base_version:
+                items = base.items
+                chain.extend(reversed(base.chain))
+                break
+            versions = list(delta.chain) or [delta.base_version]
+            if base is not None and base.version in versions:
+                versions = versions[versions.index(base.version) + 1:]
+            docs = yield [self._blob_key(thread_id, checkpoint_ns, channel, v) for v in versions]
+
+            items = None
+            # newest first, down to a full value or to the oldest fetched delta
+            for base_version, doc in zip(reversed(versions), reversed(docs)):
+                if not doc or doc.get("type") == "empty":
+                    raise ValueError(
+                        f"Checkpoint value '{channel}' of thread '{thread_id}' can not be rebuilt, "
+                        f"its base version {base_version} is missing"
+                    )
+                chain.append(base_version)
+                loaded = self.serde.loads_typed((doc["type"], doc["blob"]))
+                if not isinstance(loaded, ListDelta):
+                    items = loaded
+                    break
+                deltas.append(loaded)
+            if items is not None:
+                break
+
+        items = _apply_deltas(items, deltas)
+        known = self._base(thread_id, checkpoint_ns, channel)
+        if known is None or _newer(version, known.version):
+            self._remember(thread_id, checkpoint_ns, channel, _ListBase(version, list(items), tuple(reversed(chain))))
+        return items
+
+    def _pending_deltas(self, checkpoint_tuple: Optional[CheckpointTuple]):
+        """(channel_values, channel, generator) of every delta value of a loaded checkpoint."""
+        if checkpoint_tuple is None:
+            return
+        configurable = checkpoint_tuple.config["configurable"]
+        thread_id = to_storage_safe_id(configurable["thread_id"])
+        checkpoint_ns = to_storage_safe_str(configurable.get("checkpoint_ns", ""))
+        checkpoint = checkpoint_tuple.checkpoint
+        values = checkpoint.get("channel_values") or {}
+        for channel, value in list(values.items()):
+            if isinstance(value, ListDelta):
+                version = str(checkpoint["channel_versions"][channel])
+                yield values, channel, self._delta_steps(thread_id, checkpoint_ns, channel, version, value)
+
+    # local tier of the latest checkpoints
+    #
+    # Every write to a thread namespace stores a new random token in the thread's version
+    # hash, in the pipeline of the write. A checkpoint put here is cached with its token and
+    # served while the hash still holds that token: one HGET instead of the index searches
+    # and blob reads of RedisSaver.get_tuple. A write by another worker, pending writes
+    # included, changes the token and the next read goes to Redis.
+
+    def _versions_key(self, thread_id: str) -> str:
+        return f"{VERSIONS_PREFIX}:{to_storage_safe_id(thread_id)}"
+
+    def _bump_version(self, config: RunnableConfig, commands: List[Command]) -> Optional[str]:
+        """Add the version update of the written thread namespace to commands, returns its token."""
+        if self._latest is None:
+            return None
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = to_storage_safe_str(configurable.get("checkpoint_ns", ""))
+        token = uuid.uuid4().hex
+        key = self._versions_key(thread_id)
+        commands.append(("hset", key, {checkpoint_ns: token}, None))
+        commands.extend(self._expire([key]))
+
+        # the cached checkpoint lacks the pending writes that bumped the version
+        cached = self._latest.get(to_storage_safe_id(thread_id))
+        if cached is not None:
+            cached.pop(checkpoint_ns, None)
+        return token
+
+    def _cache_checkpoint(
+        self, token: Optional[str], next_config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+    ) -> None:
+        if token is None:
+            return
+        configurable = next_config["configurable"]
+        thread_id = to_storage_safe_id(configurable["thread_id"])
+        cached = self._latest.get(thread_id) or {}
+        cached[to_storage_safe_str(configurable["checkpoint_ns"])] = _CachedCheckpoint(
+            # pending sends are read back from the writes, which a new checkpoint has none of
+            token, configurable["checkpoint_id"], {**checkpoint, "pending_sends": []}, dict(metadata),
+            _parent_config(next_config),
+        )
+        self._latest.set(thread_id, cached)
+
+    def _cached(self, config: RunnableConfig) -> Optional[_CachedCheckpoint]:
+        """The cached checkpoint a read of config would return, still to be checked against Redis."""
+        if self._latest is None:
+            return None
+        configurable = config["configurable"]
+        cached = (self._latest.get(to_storage_safe_id(configurable["thread_id"])) or {}).get(
+            to_storage_safe_str(configurable.get("checkpoint_ns", ""))
+        )
+        checkpoint_id = get_checkpoint_id(config)
+        if cached is None or (checkpoint_id and checkpoint_id != cached.checkpoint_id):
+            self.cache_misses += 1
+            return None
+        return cached
+
+    def _cache_hit(self, config: RunnableConfig, cached: _CachedCheckpoint, token: Any) -> Optional[CheckpointTuple]:
+        """The cached checkpoint as RedisSaver.get_tuple returns it, if token is still its version."""
+        if isinstance(token, bytes):
+            token = token.decode()
+        configurable = config["configurable"]
+        if token != cached.token:
+            self.cache_stale += 1
+            entries = self._latest.get(to_storage_safe_id(configurable["thread_id"]))
+            if entries is not None:
+                entries.pop(to_storage_safe_str(configurable.get("checkpoint_ns", "")), None)
+            return None
+
+        self.cache_hits += 1
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": configurable["thread_id"],
+                    "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+                    "checkpoint_id": cached.checkpoint_id,
+                }
+            },
+            # the graph updates the checkpoint it loaded in place
+            checkpoint=copy_checkpoint(cached.checkpoint),
+            metadata=dict(cached.metadata),
+            parent_config=_parent_config(cached.parent_config),
+            pending_writes=[],
+        )
+
+    def cache_stats(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses + self.cache_stale
+        return {
+            "enabled": self._latest is not None,
+            "threads": len(self._latest) if self._latest is not None else 0,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "stale": self.cache_stale,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+        }
+
+    @property
+    def _transactional(self) -> bool:
+        # a MULTI/EXEC can not span the slots of a cluster
+        return not getattr(self, "cluster_mode", False)
+
+    def _ttl_seconds(self) -> Optional[int]:
+        # the saver's TTL config is in minutes
+        ttl = (self.ttl_config or {}).get("default_ttl")
+        return int(ttl * 60) if ttl else None
+
+    def _expire(self, keys: List[str]) -> List[Command]:
+        ttl = self._ttl_seconds()
+        return [("expire", key, ttl, None) for key in keys] if ttl else []
+
+    def _checkpoint_commands(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> Tuple[RunnableConfig, List[Command]]:
+        # same records as RedisSaver.put
+        configurable = config["configurable"].copy()
+        thread_id = configurable.pop("thread_id")
+        checkpoint_ns = configurable.pop("checkpoint_ns")
+        thread_ts = configurable.pop("thread_ts", "")
+        checkpoint_id = configurable.pop("checkpoint_id", configurable.pop("thread_ts", "")) or thread_ts
+
+        safe_thread_id = to_storage_safe_id(thread_id)
+        safe_checkpoint_ns = to_storage_safe_str(checkpoint_ns)
+        safe_checkpoint_id = to_storage_safe_id(checkpoint_id)
+
+        copy = checkpoint.copy()
+        checkpoint_data = {
+            "thread_id": safe_thread_id,
+            "checkpoint_ns": safe_checkpoint_ns,
+            "checkpoint_id": safe_checkpoint_id,
+            "parent_checkpoint_id": safe_checkpoint_id,
+            "checkpoint": self._dump_checkpoint(copy),
+            "metadata": self._dump_metadata(metadata),
+        }
+        if all(key in metadata for key in ["source", "step"]):
+            checkpoint_data["source"] = metadata["source"]
+            checkpoint_data["step"] = metadata["step"]
+
+        checkpoint_key = BaseRedisSaver._make_redis_checkpoint_key(
+            safe_thread_id, safe_checkpoint_ns, safe_checkpoint_id,
+        )
+        values, base_keys = self._encode_deltas(
+            safe_thread_id, safe_checkpoint_ns, copy.get("channel_values", {}), new_versions,
+        )
+        blobs = self._dump_blobs(safe_thread_id, safe_checkpoint_ns, values, new_versions)
+
+        commands: List[Command] = [("set", checkpoint_key, checkpoint_data, False)]
+        commands.extend(("set", key, data, False) for key, data in blobs)
+        # the blobs a delta is built on live as long as the delta
+        commands.extend(self._expire([checkpoint_key, *(key for key, _ in blobs), *base_keys]))
+
+        next_config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+        return next_config, commands
+
+    def _writes_commands(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str,
+    ) -> List[Command]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # special channels (errors, interrupts) are upserted, task writes are kept from the first
+        # attempt; a JSON.SET NX replaces RedisSaver's EXISTS check per write
+        upsert = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+
+        commands: List[Command] = []
+        keys = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            key = self._make_redis_checkpoint_writes_key(thread_id, checkpoint_ns, checkpoint_id, task_id, write_idx)
+            commands.append(("set", key, {
+                "thread_id": to_storage_safe_id(thread_id),
+                "checkpoint_ns": to_storage_safe_str(checkpoint_ns),
+                "checkpoint_id": to_storage_safe_id(checkpoint_id),
+                "task_id": task_id,
+                "task_path": task_path,
+                "idx": write_idx,
+                "channel": channel,
+                "type": type_,
+                "blob": blob,
+            }, not upsert))
+            keys.append(key)
+        commands.extend(self._expire(keys))
+        return commands
+
+    def _blobs_pipeline(self, keys: List[str]):
+        pipeline = self._redis.pipeline(transaction=False)
+        for key in keys:
+            pipeline.json().get(key)
+        self.round_trips += 1
+        return pipeline
+
+    def _pipeline(self, commands: List[Command]):
+        pipeline = self._redis.pipeline(transaction=self._transactional)
+        for op, key, value, nx in commands:
+            if op == "set":
+                pipeline.json().set(key, "$", value, nx=nx)
+            elif op == "hset":
+                pipeline.hset(key, mapping=value)
+            else:
+                pipeline.expire(key, value)
+        self.round_trips += 1
+        return pipeline
+
+
+class PipelinedRedisSaver(_PipelinedWrites, RedisSaver):
+    """
+    RedisSaver writing each checkpoint and each batch of writes in a single round trip,
+    optionally in the compact encoding (CheckpointEncodingConfig) and with the latest
+    checkpoints of recent threads served from process memory (LocalCheckpointCacheConfig).
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        *,
+        redis_client=None,
+        connection_args: Optional[Dict[str, Any]] = None,
+        ttl: Optional[Dict[str, Any]] = None,
+        flush: Optional[WriteFlushConfig] = None,
+        encoding: Optional[CheckpointEncodingConfig] = None,
+        local_cache: Optional[LocalCheckpointCacheConfig] = None,
+    ) -> None:
+        super().__init__(redis_url, redis_client=redis_client, connection_args=connection_args, ttl=ttl)
+        self._init_pipelining(flush, encoding, local_cache)
+        self._pending_lock = threading.Lock()
+
+    def _take_pending(self) -> List[Command]:
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def _send(self, commands: List[Command], pending: List[Command]) -> None:
+        try:
+            self._pipeline(pending + commands).execute()
+        except BaseException:
+            # buffered writes were already acknowledged to the graph, keep them for the next flush
+            with self._pending_lock:
+                self._pending[:0] = pending
+            raise
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config, commands = self._checkpoint_commands(config, checkpoint, metadata, new_versions)
+        token = self._bump_version(config, commands)
+        self._send(commands, self._take_pending())
+        self._cache_checkpoint(token, next_config, checkpoint, metadata)
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if not writes:
+            return
+        commands = self._writes_commands(config, writes, task_id, task_path)
+        self._bump_version(config, commands)
+        if self.write_flush.policy == "step":
+            with self._pending_lock:
+                self._pending.extend(commands)
+                if len(self._pending) < self.write_flush.max_pending:
+                    return
+            commands = []
+        self._send(commands, self._take_pending())
+
+    def flush(self) -> None:
+        """Send the buffered writes, call at the end of a run under the step policy."""
+        pending = self._take_pending()
+        if pending:
+            self._send([], pending)
+
+    # reads see the buffered writes
+
+    def _fetch_blobs(self, keys: List[str]) -> List[Any]:
+        return self._blobs_pipeline(keys).execute()
+
+    def _resolve(self, checkpoint_tuple: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        for values, channel, steps in self._pending_deltas(checkpoint_tuple):
+            try:
+                keys = next(steps)
+                while True:
+                    keys = steps.send(self._fetch_blobs(keys))
+            except StopIteration as done:
+                values[channel] = done.value
+        return _with_parent(checkpoint_tuple)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self.flush()
+        cached = self._cached(config)
+        if cached is not None:
+            token = self._redis.hget(self._versions_key(config["configurable"]["thread_id"]),
+                                     to_storage_safe_str(config["configurable"].get("checkpoint_ns", "")))
+            hit = self._cache_hit(config, cached, token)
+            if hit is not None:
+                return hit
+        return self._resolve(super().get_tuple(config))
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator[CheckpointTuple]:
+        self.flush()
+        for item in super().list(config, **kwargs):
+            yield self._resolve(item)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.flush()
+        super().delete_thread(thread_id)
+        if self._latest is not None:
+            self._redis.delete(self._versions_key(thread_id))
+        self._forget(thread_id)
+
+
+class AsyncPipelinedRedisSaver(_PipelinedWrites, AsyncRedisSaver):
+    """
+    AsyncRedisSaver writing each checkpoint and each batch of writes in a single round trip,
+    optionally in the compact encoding (CheckpointEncodingConfig) and with the latest
+    checkpoints of recent threads served from process memory (LocalCheckpointCacheConfig).
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        *,
+        redis_client=None,
+        connection_args: Optional[Dict[str, Any]] = None,
+        ttl: Optional[Dict[str, Any]] = None,
+        flush: Optional[WriteFlushConfig] = None,
+        encoding: Optional[CheckpointEncodingConfig] = None,
+        local_cache: Optional[LocalCheckpointCacheConfig] = None,
+    ) -> None:
+        super().__init__(redis_url, redis_client=redis_client, connection_args=connection_args, ttl=ttl)
+        self._init_pipelining(flush, encoding, local_cache)
+
+    def _take_pending(self) -> List[Command]:
+        # the buffer is only touched from the saver's loop, swapping it needs no lock
+        pending, self._pending = self._pending, []
+        return pending
+
+    async def _send(self, commands: List[Command], pending: List[Command]) -> None:
+        try:
+            await self._pipeline(pending + commands).execute()
+        except BaseException:
+            # also on cancellation: buffered writes were acknowledged to the graph
+            self._pending[:0] = pending
+            raise
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+        stream_mode: str = "values",
+    ) -> RunnableConfig:
+        next_config, commands = self._checkpoint_commands(config, checkpoint, metadata, new_versions)
+        token = self._bump_version(config, commands)
+        await self._send(commands, self._take_pending())
+        self._cache_checkpoint(token, next_config, checkpoint, metadata)
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        if not writes:
+            return
+        commands = self._writes_commands(config, writes, task_id, task_path)
+        self._bump_version(config, commands)
+        if self.write_flush.policy == "step":
+            self._pending.extend(commands)
+            if len(self._pending) < self.write_flush.max_pending:
+                return
+            commands = []
+        await self._send(commands, self._take_pending())
+
+    async def aflush(self) -> None:
+        """Send the buffered writes, call at the end of a run under the step policy."""
+        pending = self._take_pending()
+        if pending:
+            await self._send([], pending)
+
+    # reads see the buffered writes
+
+    async def _fetch_blobs(self, keys: List[str]) -> List[Any]:
+        return await self._blobs_pipeline(keys).execute()
+
+    async def _aresolve(self, checkpoint_tuple: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        for values, channel, steps in self._pending_deltas(checkpoint_tuple):
+            try:
+                keys = next(steps)
+                while True:
+                    keys = steps.send(await self._fetch_blobs(keys))
+            except StopIteration as done:
+                values[channel] = done.value
+        return _with_parent(checkpoint_tuple)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        await self.aflush()
+        cached = self._cached(config)
+        if cached is not None:
+            token = await self._redis.hget(self._versions_key(config["configurable"]["thread_id"]),
+                                           to_storage_safe_str(config["configurable"].get("checkpoint_ns", "")))
+            hit = self._cache_hit(config, cached, token)
+            if hit is not None:
+                return hit
+        return await self._aresolve(await super().aget_tuple(config))
+
+    async def alist(self, config: Optional[RunnableConfig], **kwargs: Any) -> AsyncIterator[CheckpointTuple]:
+        await self.aflush()
+        async for item in super().alist(config, **kwargs):
+            yield await self._aresolve(item)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.aflush()
+        await super().adelete_thread(thread_id)
+        if self._latest is not None:
+            await self._redis.delete(self._versions_key(thread_id))
+        self._forget(thread_id)
@@ -0,0 +1,89 @@
+import base64
+import binascii
+from typing import Any, NamedTuple, Optional, Tuple, Union
+
+from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ..config import CheckpointEncodingConfig
+
+# type prefix of the values written by CompactSerializer, anything else is read by the JSON serializer
+COMPACT_PREFIX = "grox:"
+DELTA_PREFIX = "grox:delta:"
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Missing 'zstandard' package. Install it with `pip install grox[compact]`.")
+    return zstandard
+
+
+class ListDelta(NamedTuple):
+    """
+    A list channel value stored as the first `count` items of the value at
+    `base_version` followed by `items`; resolved by the saver that read it.
+    `chain` lists the versions the value is built on, from the full value up
+    to base_version, so a reader can fetch them at once (empty when unknown).
+    """
+    base_version: str
+    count: int
+    items: list
+    chain: Tuple[str, ...] = ()
+
+
+class CompactSerializer(JsonPlusRedisSerializer):
+    """
+    Serializer of the Redis savers storing values as msgpack, compressed with zstd
+    above min_compress_size, base64 encoded for the JSON documents of the saver.
+
+    Values written by the JSON serializer are still read, so the format of a running
+    deployment can be switched without migrating its checkpoints.
+    """
+
+    def __init__(self, encoding: Optional[CheckpointEncodingConfig] = None) -> None:
+        super().__init__()
+        self.encoding = encoding or CheckpointEncodingConfig(format="compact")
+        # only needed by the compact format, imported when it is configured
+        zstandard = _zstandard()
+        self._compressor = zstandard.ZstdCompressor(level=self.encoding.zstd_level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def _pack(self, obj: Any) -> Tuple[str, str]:
+        type_, data = JsonPlusSerializer.dumps_typed(self, obj)
+        if type_ == "null":
+            return type_, ""
+        codec = type_
+        if len(data) >= self.encoding.min_compress_size:
+            data = self._compressor.compress(data)
+            codec += "+zstd"
+        return COMPACT_PREFIX + codec, base64.b64encode(data).decode()
+
+    def _unpack(self, type_: str, data: Union[str, bytes]) -> Any:
+        codec = type_[len(COMPACT_PREFIX):]
+        try:
+            raw = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            # already decoded by the saver
+            raw = data if isinstance(data, bytes) else data.encode()
+        if codec.endswith("+zstd"):
+            codec = codec[:-len("+zstd")]
+            raw = self._decompressor.decompress(raw)
+        return JsonPlusSerializer.loads_typed(self, (codec, raw))
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, str]:
+        if isinstance(obj, ListDelta):
+            type_, data = self._pack([obj.base_version, obj.count, obj.items, list(obj.chain)])
+            return DELTA_PREFIX + type_[len(COMPACT_PREFIX):], data
+        return self._pack(obj)
+
+    def loads_typed(self, data: Tuple[str, Union[str, bytes]]) -> Any:
+        type_, data_ = data
+        if type_.startswith(DELTA_PREFIX):
+            base_version, count, items, *chain = self._unpack(COMPACT_PREFIX + type_[len(DELTA_PREFIX):], data_)
+            # deltas written before the chain was stored have none
+            return ListDelta(base_version, count, items, tuple(chain[0]) if chain else ())
+        if type_.startswith(COMPACT_PREFIX):
+            return self._unpack(type_, data_)
+        return super().loads_typed(data)
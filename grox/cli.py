@@ -1,14 +1,13 @@
 import shutil
 from pathlib import Path
 import click
-import shutil
+import asyncio
 import os
+import subprocess
 import sys
+import time
 import importlib.util
 from grox.config import GroxAppConfig, GroxProjectConfig
-from grox.logger import setup_logging
-from grox.context import GroxContext, GroxExecutionContext
-from grox.project import GroxProject
 
 from jinja2 import Environment, PackageLoader, select_autoescape
 
@@ -82,3 +81,114 @@ def run(project_code: str, path: str):
     else:
         click.echo("❌ main.py does not define an async 'main' function")
         sys.exit(1)
+
+
+def _import_times(module: str, top: int):
+    """
+    Import `module` in a fresh interpreter with -X importtime, returns its
+    import seconds and the `top` heaviest top-level packages by own import time.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise click.ClickException(result.stderr.strip().splitlines()[-1])
+
+    total = 0.0
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        own, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        name = name.strip()
+        if name == module:
+            total = int(cumulative) / 1e6
+        # self times summed per top-level package, nested imports are not counted twice
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(own.split(":")[1]) / 1e6
+    return total, sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+@cli.command("profile-startup")
+@click.option("--app", "app_path", default="app.yaml", help="Application config listing the tenant projects")
+@click.option("--secret", "-s", "secrets", multiple=True, help="Project secret as key=value, may be repeated")
+@click.option("--no-index", is_flag=True, help="Skip the document indexing phase")
+@click.option("--top", default=10, show_default=True, help="Heaviest imports to list")
+def profile_startup(app_path: str, secrets: tuple, no_index: bool, top: int):
+    """Report where the startup time goes: imports, config load and the project build phases."""
+    for module in ("grox", "grox.context"):
+        total, heaviest = _import_times(module, top)
+        click.echo(f"import {module}: {total:.3f}s")
+        for name, seconds in heaviest:
+            click.echo(f"  {seconds:8.3f}s  {name}")
+
+    if not Path(app_path).exists():
+        click.echo(f"❌ {app_path} not found, skipping the project phases")
+        return
+
+    secret_values = dict(secret.split("=", 1) for secret in secrets)
+    app = GroxAppConfig.load_yaml(app_path)
+
+    from grox.project import GroxProject
+
+    phases = ("config_load", "model_init", "backend_init", "graph_compile", "indexing")
+    click.echo("")
+    click.echo(f"{'project':<32}" + "".join(f"{phase:>15}" for phase in phases) + f"{'total':>10}")
+
+    async def build(tenant_id: str, project_path: str):
+        started = time.perf_counter()
+        cfg = GroxProjectConfig.load_yaml(project_path, secrets=secret_values)
+        config_load = time.perf_counter() - started
+        project = GroxProject(app, tenant_id, cfg)
+        task = getattr(project, "_indexing_task", None)
+        if task is not None:
+            if no_index:
+                task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass  # a failed indexing is logged by the project
+        project.close()
+        return cfg.metadata.project, {"config_load": config_load, **project.startup_timings}
+
+    for tenant_id, project_paths in app.tenants.items():
+        for project_path in project_paths:
+            project_code, timings = asyncio.run(build(tenant_id, project_path))
+            label = f"{tenant_id}/{project_code}"
+            click.echo(
+                f"{label:<32}"
+                + "".join(f"{timings[phase]:>14.3f}s" if phase in timings else f"{'-':>15}" for phase in phases)
+                + f"{sum(timings.values()):>9.3f}s"
+            )
+
+
+@cli.command()
+@click.option("--redis-url", envvar="REDIS_URL", required=True, help="Redis holding the checkpoints (env REDIS_URL)")
+@click.option("--tenant", "tenant_id", required=True, help="Tenant whose threads are compacted")
+@click.option("--project", "project_code", default=None, help="Only the threads of this project")
+@click.option("--session", "session_id", default=None, help="Only the thread of this session, needs --project")
+@click.option("--keep", "keep_ancestors", default=0, show_default=True, help="Ancestors kept besides the latest checkpoint")
+@click.option("--batch-size", default=500, show_default=True, help="Commands per pipeline")
+@click.option("--dry-run", is_flag=True, help="Report what would be deleted without deleting it")
+def compact(redis_url: str, tenant_id: str, project_code: str, session_id: str, keep_ancestors: int, batch_size: int, dry_run: bool):
+    """Delete old checkpoints of Redis threads, keeping the latest ones resumable."""
+    from grox.checkpoints.compaction import compact_checkpoints, thread_prefix
+    from grox.factory_cache import create_redis_instance
+
+    try:
+        prefix = thread_prefix(tenant_id, project_code, session_id)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    report = compact_checkpoints(
+        create_redis_instance(redis_url), prefix,
+        keep_ancestors=keep_ancestors, batch_size=batch_size, dry_run=dry_run,
+    )
+    verb = "would delete" if dry_run else "deleted"
+    click.echo(
+        f"{report.threads} threads under '{prefix}': kept {report.checkpoints_kept} checkpoints, "
+        f"{verb} {report.checkpoints_deleted} checkpoints, {report.blobs_deleted} blobs "
+        f"and {report.writes_deleted} writes, {report.bytes_reclaimed:,} bytes"
+    )
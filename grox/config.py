@@ -1,11 +1,42 @@
-from pydantic import BaseModel, Field, SecretStr
+from pydantic import BaseModel, ConfigDict, Field, SecretStr
 from typing import Literal, List, Dict, Any, Optional, Callable, Union
 from pathlib import Path
 import yaml
 from seyaml import load_seyaml
-from langfabric import load_model_configs
 from .documents.schema import Document
 
+# === Indexing ===
+class IndexingConfig(BaseModel):
+    batch_size: int = 64
+    max_concurrency: int = 4
+    max_retries: int = 3
+    retry_backoff: float = 0.5
+
+# === Registration ===
+class RegistrationConfig(BaseModel):
+    # serial - build projects one by one, parallel - build them in a worker pool,
+    # lazy - register config stubs and build each project on first use
+    mode: Literal["serial", "parallel", "lazy"] = "serial"
+    max_workers: int = 8
+
+# === Eviction ===
+class EvictionConfig(BaseModel):
+    # built projects kept in memory, least recently used are evicted first, None - no limit
+    max_projects: Optional[int] = None
+    # evict projects not accessed for this long, e.g. "30m", None - never; swept on lookups
+    # (at most once per idle_ttl) or by GroxContext.evict_idle_projects()
+    idle_ttl: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_projects is not None or self.idle_ttl is not None
+
+# === Caches ===
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    max_size: int = 1024
+    ttl: Optional[str] = "1h"
+
 # === Grox ===
 class GroxAppConfig(BaseModel):
     service: str = "grox"
@@ -15,6 +46,10 @@ class GroxAppConfig(BaseModel):
     log_format: str = "console"
     log_callback: Optional[Callable[[dict], None]] = None
     tenants: Dict[str, List[str]] = Field(default_factory=dict)
+    # process-wide limits when indexing all projects together
+    indexing: IndexingConfig = Field(default_factory=IndexingConfig)
+    registration: RegistrationConfig = Field(default_factory=RegistrationConfig)
+    eviction: EvictionConfig = Field(default_factory=EvictionConfig)
 
     @classmethod
     def load_yaml(cls, path: str) -> "GroxAppConfig":
@@ -34,9 +69,23 @@ class ProjectMetadata(BaseModel):
     workspace: str = "default"
 
 # === Orchestration ===
+class StreamingConfig(BaseModel):
+    # updates - {node: update} once a node finished, tokens - additionally
+    # {"token": text, "node": node} for every LLM token as it is generated
+    mode: Literal["updates", "tokens"] = "updates"
+    # print every streamed chunk, local debugging only
+    debug: bool = False
+
 class OrchestrationConfig(BaseModel):
     documents: Optional[List[str]] = Field(default_factory=list)
     document_configs: Optional[list] = None
+    indexing: Optional[IndexingConfig] = None
+    query_embedding_cache: CacheConfig = Field(default_factory=CacheConfig)
+    # results are keyed by collection versions kept per process: after a reindex by another
+    # worker (shared redis vector store) this process serves stale results for up to ttl;
+    # None - 256 entries for 5m with the in-process backends (memory, numpy), off for redis
+    search_result_cache: Optional[CacheConfig] = None
+    streaming: StreamingConfig = Field(default_factory=StreamingConfig)
 
 # === Infrastructure ===
 class DefaultsConfig(BaseModel):
@@ -52,12 +101,83 @@ class InfrastructureConfig(BaseModel):
     backend_configs: Optional[dict] = None
 
 # === Backends (as named collection) ===
+class RedisPoolConfig(BaseModel):
+    # hashable, backends with the same url and pool settings share one client and pool
+    model_config = ConfigDict(frozen=True)
+
+    # connections per pool; when all are in use callers wait up to pool_timeout
+    # seconds for a free one instead of failing with "Too many connections"
+    max_connections: int = 50
+    pool_timeout: Optional[float] = 5.0
+    socket_timeout: Optional[float] = 5.0
+    socket_connect_timeout: Optional[float] = 5.0
+    socket_keepalive: bool = True
+    # seconds a connection may stay idle before it is pinged on checkout, 0 - never
+    health_check_interval: int = 30
+    # retries of connection errors and timeouts with exponential backoff
+    retry_attempts: int = 3
+    retry_backoff_base: float = 0.01
+    retry_backoff_cap: float = 0.5
+
+class WriteFlushConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # immediate - every checkpoint and every task's writes go out as one pipelined round trip,
+    # step - the writes of a super-step are buffered and sent together with its checkpoint
+    policy: Literal["immediate", "step"] = "immediate"
+    # buffered commands forcing a flush under the step policy
+    max_pending: int = 512
+
+class MemoryLimitsConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # threads (checkpoint_saver) or sessions (chat_history) kept, least recently used are evicted first
+    max_threads: Optional[int] = 10_000
+    # approximate serialized size of everything kept, None - no limit
+    max_bytes: Optional[int] = None
+    # checkpoints per thread or messages per session kept, None - all
+    keep_last: Optional[int] = None
+
+class CheckpointEncodingConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # json - langgraph's JSON documents, compact - msgpack compressed with zstd (grox[compact]),
+    # list channels (messages) stored as deltas against the previous version
+    format: Literal["json", "compact"] = "json"
+    zstd_level: int = 3
+    # smaller payloads are not worth compressing
+    min_compress_size: int = 256
+    # a full copy of a list channel every N versions, bounds the reads to rebuild one
+    snapshot_every: int = 16
+
+class LocalCheckpointCacheConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # threads whose latest checkpoint this process keeps in front of Redis, 0 - no local tier;
+    # a cached checkpoint is served only while the thread's version in Redis is the one written here
+    max_threads: int = 0
+    # seconds a cached checkpoint is kept after it was written, None - until evicted
+    ttl: Optional[float] = 600
+
 class BackendConfig(BaseModel):
     name: str
     backend: str
+    # redis checkpoint_saver: a sync project.checkpoint_saver, the graph still gets an async one
     sync: bool = False
     url: SecretStr = None
     ttl: Optional[str] = None
+    # redis only: connection pool of the client
+    pool: RedisPoolConfig = Field(default_factory=RedisPoolConfig)
+    # memory only: bounds of the in-process store, entries also expire after ttl
+    limits: MemoryLimitsConfig = Field(default_factory=MemoryLimitsConfig)
+    # redis checkpoint_saver only: when buffered checkpoint writes are sent
+    write_flush: WriteFlushConfig = Field(default_factory=WriteFlushConfig)
+    # redis checkpoint_saver only: how checkpoint values are stored
+    encoding: CheckpointEncodingConfig = Field(default_factory=CheckpointEncodingConfig)
+    # redis checkpoint_saver only: in-process tier of the latest checkpoints
+    local_cache: LocalCheckpointCacheConfig = Field(default_factory=LocalCheckpointCacheConfig)
+    # vector_store only: path of the local SQLite embedding cache, relative to the backends file
+    embedding_cache: Optional[str] = None
 
 # === Project Config ===
 class GroxProjectConfig(BaseModel):
@@ -88,16 +208,29 @@ class GroxProjectConfig(BaseModel):
                     str((base_dir / model_path).resolve())
                     for model_path in infra.get("models", [])
                 ]
+                # langfabric pulls in every provider SDK, only projects with models pay for it
+                from langfabric import load_model_configs
+
+                infra["models"] = model_paths
                 infra["model_configs"] = load_model_configs(model_paths, secrets=secrets)
             if "backends" in infra:
                 backend_paths = [
                     str((base_dir / backend_path).resolve())
                     for backend_path in infra.get("backends", [])
                 ]
+                infra["backends"] = backend_paths
                 infra["backend_configs"] = load_backend_configs(backend_paths, secrets=secrets)
 
         return cls(**root)
 
+    def source_files(self) -> List[str]:
+        """Document, model and backend files referenced by the project (absolute after load_yaml)."""
+        files = list((self.orchestration and self.orchestration.documents) or [])
+        if self.infrastructure:
+            files += self.infrastructure.models or []
+            files += self.infrastructure.backends or []
+        return files
+
 def load_backend_configs(paths: List[str], secrets: dict = None) -> Dict[str, BackendConfig]:
     configs: Dict[str, BackendConfig] = {}
 
@@ -113,6 +246,10 @@ def load_backend_configs(paths: List[str], secrets: dict = None) -> Dict[str, Ba
                 raise ValueError(f"Each backend entry must be a mapping")
             if "name" not in item:
                 raise ValueError("Each backend config must include a 'name' field")
+            embedding_cache = item.get("embedding_cache")
+            if embedding_cache and embedding_cache != ":memory:":
+                # relative to the backends file, like every other path of the config
+                item["embedding_cache"] = str((full_path.parent / embedding_cache).resolve())
             config = BackendConfig(**item)
             configs[config.name] = config
 
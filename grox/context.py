@@ -1,18 +1,38 @@
+import asyncio
 import contextvars
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, List, Tuple
 import threading
+import time
 import traceback
 import structlog
+from .cache import TTLCache
 from .config import GroxAppConfig, GroxProjectConfig
+from .factory import parse_ttl
+from .reload import ProjectSource
+from .model_pool import model_pool
+from .graph_cache import graph_cache
+from .factory_cache import redis_pool_stats
 from .project import GroxProject
+from .documents.indexer import IndexingPipeline
 from .logger import setup_logging, register_log_callback
 
 class GroxExecutionContext:
     """
     Per-request container holding the active Project plus
-    request identifiers and infrastructure references
+    request identifiers and infrastructure references.
+
+    Public project attributes (graph, document_store, models, ...) are read
+    through from the project instead of being copied per request, and the
+    request logger is bound on first use from the project's logger.
+    Other attributes can be set on the context per request, they shadow the project's.
     """
 
+    # __dict__ keeps arbitrary attributes working, it is only allocated once one is set
+    __slots__ = ("project", "input", "correlation_id", "user_id", "_logger", "__dict__")
+
     def __init__(self, project: GroxProject,
                 input: dict = None,
                 correlation_id: Optional[str] = None,
@@ -23,35 +43,75 @@ class GroxExecutionContext:
         correlation_id usually comes from request headers
         user_id usially comes from auth components
         """
-        # Copy all project attributes into self
-        for key, value in project.__dict__.items():
-            if not key.startswith("_"):
-                setattr(self, key, value)
-
-        if not input:
-            input = {}
-        self.input = input
-
+        self.project = project
+        self.input = input or {}
         self.correlation_id = correlation_id
         self.user_id = user_id
+        self._logger = None
+
+    def __getattr__(self, name: str):
+        # only called for names not set on the context, private project state stays private
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return getattr(self.project, name)
+        except AttributeError:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from None
+
+    @property
+    def logger(self):
+        if self._logger is None:
+            # the project logger already carries tenant, project and service metadata
+            request_metadata = {"correlation_id": self.correlation_id, "user_id": self.user_id}
+            self._logger = self.project.logger.bind(**{k: v for k, v in request_metadata.items() if v is not None})
+        return self._logger
+
+def _task_loop(loop):
+    """Loop for background tasks of a project built in the current thread."""
+    try:
+        asyncio.get_running_loop()
+        return None  # built on the loop, tasks go to it directly
+    except RuntimeError:
+        return loop
 
-        logger_metadata = {
-            "tenant_id": project.tenant_id,
-            "project_code": project.project_code,
-            "correlation_id": correlation_id,
-            "user_id": user_id,
-            "service": project.app.service,
-            "version": project.app.version,
-            "environment": project.app.environment,
-        }
 
-        # Filter out None values
-        filtered_metadata = {k: v for k, v in logger_metadata.items() if v is not None}
+class _LazyProject:
+    """
+    Registered config stub, the GroxProject is built on first use.
+    Concurrent first requests wait for a single build.
+    """
 
-        # Bind to logger
-        self.logger = structlog.get_logger().bind(**filtered_metadata)
+    def __init__(self, app: GroxAppConfig, tenant_id: str, config: GroxProjectConfig, loop=None,
+                 project: Optional[GroxProject] = None):
+        """
+        project - already built project, e.g. a hot reloaded one
+        """
+        self.app = app
+        self.tenant_id = tenant_id
+        self.config = config
+        self.project_code = config.metadata.project
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._project: Optional[GroxProject] = project
+
+    def get(self) -> GroxProject:
+        if self._project is None:
+            with self._lock:
+                if self._project is None:
+                    self._project = GroxProject(self.app, self.tenant_id, self.config, loop=_task_loop(self.loop))
+        return self._project
+
+    @property
+    def built(self) -> Optional[GroxProject]:
+        """The built project or None, never triggers a build."""
+        return self._project
+
+    def release(self) -> Optional[GroxProject]:
+        """Forget the built project, the next get() builds a new one."""
+        with self._lock:
+            project, self._project = self._project, None
+        return project
 
-        self.logger.debug("available context properties", data=self.__dict__.keys())
 
 """
 Singelton instance that could be created with GroxAppConfig on startup
@@ -68,8 +128,10 @@ class GroxContext:
         if cls._instance is None:
             with cls._instance_lock:
                 if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance.__init_singleton__(app)
+                    # published only when fully initialized, readers do not take the lock
+                    instance = super().__new__(cls)
+                    instance.__init_singleton__(app)
+                    cls._instance = instance
         return cls._instance
 
     def __init_singleton__(self, app: GroxAppConfig = None):
@@ -79,9 +141,25 @@ class GroxContext:
             print("Warning: GroxContext initialized with empty config")
             app = GroxAppConfig()
 
-        self._projects = {}
+        # copy-on-write: writers swap in a new read-only mapping under _projects_lock,
+        # readers use whatever mapping is current without locking
+        self._projects: Mapping[Tuple[str, str], Any] = MappingProxyType({})
         self._projects_lock = threading.Lock()
         self.app = app
+        # where registered projects were loaded from, for hot reload
+        self._sources: Dict[Tuple[str, str], ProjectSource] = {}
+
+        # built projects that can be evicted, the registry keeps their config stubs
+        self._active_projects: Optional[TTLCache] = None
+        self._eviction_hooks: List[Callable[[GroxProject], None]] = []
+        self._idle_ttl = parse_ttl(app.eviction.idle_ttl)
+        self._next_idle_sweep = 0.0
+        if app.eviction.enabled:
+            self._active_projects = TTLCache(
+                max_size=app.eviction.max_projects or sys.maxsize,
+                ttl=self._idle_ttl,
+                on_evict=self._evict_project,
+            )
 
         # Automatically setup logging
         setup_logging(app.log_level, app.log_format)
@@ -89,39 +167,261 @@ class GroxContext:
             # register log callback if needed
             register_log_callback(app.log_callback)
 
-    def register_all_projects(self, secrets: dict = None):
-        for tenant_id, project_paths in self.app.tenants.items():
-            for project_path in project_paths:
-                try:
-                    cfg = GroxProjectConfig.load_yaml(project_path, secrets=secrets)
-                    project = GroxProject(self.app, tenant_id, cfg)
-                    self.register_project(project)
-                except Exception as e:
-                    structlog.get_logger().error(f"Project init failed {e}", stack=traceback.format_exc(),tenant_id=tenant_id,project_path=project_path)
+    def register_all_projects(self, secrets: dict = None, mode: Optional[str] = None):
+        """
+        mode - serial, parallel or lazy, defaults to GroxAppConfig.registration.mode
+        """
+        mode = mode or self.app.registration.mode
+        if mode not in ("serial", "parallel", "lazy"):
+            raise ValueError(f"Unknown registration mode: {mode}")
+
+        items: List[Tuple[str, str]] = [
+            (tenant_id, project_path)
+            for tenant_id, project_paths in self.app.tenants.items()
+            for project_path in project_paths
+        ]
+
+        # background tasks of projects built in the pool or reloaded later go to the caller's loop
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        # the registry is copied and published once for the whole batch
+        batch: Dict[Tuple[str, str], Any] = {}
+        if mode == "serial":
+            for tenant_id, project_path in items:
+                self._register_from_path(tenant_id, project_path, secrets, loop, batch=batch)
+        else:
+            lazy = mode == "lazy"
+            max_workers = max(1, min(self.app.registration.max_workers, len(items) or 1))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grox-register") as executor:
+                for tenant_id, project_path in items:
+                    executor.submit(self._register_from_path, tenant_id, project_path, secrets, loop, lazy, batch)
+        self._update_projects(lambda projects: projects.update(batch))
+
+    def _register_from_path(
+        self, tenant_id: str, project_path: str, secrets: dict = None, loop=None, lazy: bool = False,
+        batch: Optional[Dict[Tuple[str, str], Any]] = None,
+    ):
+        """batch - collects the registered entries instead of publishing each one"""
+        try:
+            cfg = GroxProjectConfig.load_yaml(project_path, secrets=secrets)
+            source = ProjectSource(tenant_id, project_path, secrets=secrets, loop=loop)
+            source.snapshot(cfg)
+            with self._projects_lock:
+                self._sources[(tenant_id, cfg.metadata.project)] = source
+
+            if lazy or self._active_projects is not None:
+                # evictable projects are registered as stubs so they can be rebuilt
+                stub = _LazyProject(self.app, tenant_id, cfg, loop=loop)
+                key = (tenant_id, stub.project_code)
+                self._register_entry(key, stub, batch)
+                if not lazy:
+                    stub.get()
+                    self._touch_project(key, stub)
+                return
+            project = GroxProject(self.app, tenant_id, cfg, loop=_task_loop(loop))
+            self._register_entry((project.tenant_id, project.project_code), project, batch)
+        except Exception as e:
+            structlog.get_logger().error(f"Project init failed {e}", stack=traceback.format_exc(),tenant_id=tenant_id,project_path=project_path)
 
 
+    async def index_all_projects(self, progress=None):
+        """
+        Index the document collections of all registered projects in one pipeline,
+        sharing the process-wide embedding concurrency limit from GroxAppConfig.indexing
+        """
+        entries = list(self._projects.values())
+
+        # lazy projects index their documents when they are built, unbuilt ones are skipped
+        projects = [entry.built if isinstance(entry, _LazyProject) else entry for entry in entries]
+
+        stores = [project.document_store for project in projects if project is not None and hasattr(project, "document_store")]
+        pipeline = IndexingPipeline.from_config(self.app.indexing, progress=progress, logger=structlog.get_logger())
+        return await pipeline.run(stores)
+
     def register_project(self, project: GroxProject):
-        key = (project.tenant_id, project.project_code)
+        self._register_entry((project.tenant_id, project.project_code), project)
+
+    def _register_entry(self, key: Tuple[str, str], entry: Any, batch: Optional[Dict[Tuple[str, str], Any]] = None):
+        if batch is None:
+            self._update_projects(lambda projects: projects.__setitem__(key, entry))
+            return
         with self._projects_lock:
-            self._projects[key] = project
+            batch[key] = entry
 
     def unregister_project(self, tenant_id: str, project_code: str):
         key = (tenant_id, project_code)
+        project = self._update_projects(lambda projects: projects.pop(key, None))
+        with self._projects_lock:
+            self._sources.pop(key, None)
+        if isinstance(project, _LazyProject) and self._active_projects is not None:
+            if self._active_projects.pop(key) is not None:
+                self._evict_project(key, project)
+
+    def reload_project(self, tenant_id: str, project_code: str) -> Optional[GroxProject]:
+        """
+        Reload the project config from its files and swap in a project that takes over
+        every part whose config did not change (models, backends, document store, graph).
+        Requests already running keep the old instance. A project that was not built
+        yet (lazy) only gets the new config. Returns the new project, if built.
+        """
+        key = (tenant_id, project_code)
+        source = self._sources.get(key)
+        if source is None:
+            raise RuntimeError(f"GroxProject source not known: {tenant_id}/{project_code}")
+
+        try:
+            cfg = GroxProjectConfig.load_yaml(source.path, secrets=source.secrets)
+        except Exception:
+            # keep the running project, the next change of the files retries
+            source.refresh()
+            raise
+        # taken before building, files changed meanwhile trigger another reload
+        source.snapshot(cfg)
+        new_key = (tenant_id, cfg.metadata.project)
+
+        entry = self._projects.get(key)
+        current = entry.built if isinstance(entry, _LazyProject) else entry
+        project = None
+        if current is not None:
+            project = GroxProject(self.app, tenant_id, cfg, loop=_task_loop(source.loop), previous=current)
+
+        if isinstance(entry, _LazyProject) or current is None:
+            new_entry = _LazyProject(self.app, tenant_id, cfg, loop=source.loop, project=project)
+        else:
+            new_entry = project
+
+        def swap(projects: Dict[Tuple[str, str], Any]):
+            projects.pop(key, None)
+            projects[new_key] = new_entry
+
+        self._update_projects(swap)
         with self._projects_lock:
-            self._projects.pop(key, None)
+            self._sources.pop(key, None)
+            self._sources[new_key] = source
+
+        if self._active_projects is not None and project is not None:
+            # not an eviction, the old project stays usable for running requests
+            self._active_projects.pop(key)
+            self._touch_project(new_key, new_entry)
+
+        structlog.get_logger().info(
+            "Project reloaded", tenant_id=tenant_id, project_code=new_key[1],
+            changes=sorted(project.reload_changes) if project is not None else None,
+        )
+        return project
+
+    def reload_changed_projects(self) -> List[Tuple[str, str]]:
+        """Reload the projects whose grox.yaml or referenced files changed, returns their keys."""
+        with self._projects_lock:
+            sources = list(self._sources.items())
+
+        reloaded = []
+        for key, source in sources:
+            if not source.changed():
+                continue
+            try:
+                self.reload_project(*key)
+                reloaded.append(key)
+            except Exception as e:
+                structlog.get_logger().error(f"Project reload failed {e}", stack=traceback.format_exc(), tenant_id=key[0], project_code=key[1])
+        return reloaded
+
+    def watched_files(self) -> List[str]:
+        """Files of all registered projects that trigger a reload when changed."""
+        with self._projects_lock:
+            sources = list(self._sources.values())
+        return sorted({path for source in sources for path in source.files()})
 
     def get_project(self, tenant_id: str, project_code: str) -> Optional[GroxProject]:
         key = (tenant_id, project_code)
+        project = self._projects.get(key)
+        if not isinstance(project, _LazyProject):
+            return project
+
+        try:
+            built = project.get()
+        except Exception as e:
+            structlog.get_logger().error(f"Project init failed {e}", stack=traceback.format_exc(), tenant_id=tenant_id, project_code=project_code)
+            raise
+
+        if self._active_projects is not None:
+            self._touch_project(key, project)
+            return built
+
+        # replace the stub unless the project was unregistered or re-registered meanwhile
+        def replace(projects: Dict[Tuple[str, str], Any]):
+            if projects.get(key) is project:
+                projects[key] = built
+
+        self._update_projects(replace)
+        return built
+
+    def _update_projects(self, update: Callable[[Dict[Tuple[str, str], Any]], Any]) -> Any:
+        """Apply update to a copy of the registry and publish the copy, returns update's result."""
         with self._projects_lock:
-            return self._projects.get(key)
+            projects = dict(self._projects)
+            result = update(projects)
+            self._projects = MappingProxyType(projects)
+        return result
+
+    def _touch_project(self, key: Tuple[str, str], stub: _LazyProject):
+        """
+        Mark a built project as used now, this may evict the least recently used ones.
+        Idle projects are swept when a project is added and at most once per idle_ttl
+        on lookups; a process without lookups keeps them until evict_idle_projects().
+        """
+        is_new = key not in self._active_projects
+        self._active_projects.set(key, stub)
+        if is_new or (self._idle_ttl is not None and time.monotonic() >= self._next_idle_sweep):
+            self.evict_idle_projects()
+
+    def _evict_project(self, key: Tuple[str, str], stub: _LazyProject):
+        project = stub.release()
+        if project is None:
+            return
+        structlog.get_logger().info("Project evicted", tenant_id=key[0], project_code=key[1])
+        # requests still running keep using the project, its shared state is only dropped by GC
+        for hook in [GroxProject.cancel_tasks, *self._eviction_hooks]:
+            try:
+                hook(project)
+            except Exception as e:
+                structlog.get_logger().error(f"Project eviction hook failed {e}", stack=traceback.format_exc(), tenant_id=key[0], project_code=key[1])
+
+    def add_eviction_hook(self, hook: Callable[[GroxProject], None]):
+        """Called with every evicted project, e.g. to close connections it owns."""
+        self._eviction_hooks.append(hook)
+
+    def evict_idle_projects(self) -> int:
+        """
+        Evict projects idle longer than eviction.idle_ttl now, returns the number evicted.
+        Lookups sweep on their own, call this periodically (e.g. from a scheduler) to
+        release idle projects of a process that serves no requests.
+        """
+        if self._active_projects is None:
+            return 0
+        if self._idle_ttl is not None:
+            self._next_idle_sweep = time.monotonic() + self._idle_ttl
+        return self._active_projects.purge_expired()
+
+    def project_stats(self) -> dict:
+        stats = {
+            "registered": len(self._projects),
+            "model_pool": model_pool.stats(),
+            "graph_cache": graph_cache.stats(),
+            "redis_pools": redis_pool_stats(),
+        }
+        if self._active_projects is not None:
+            stats["active"] = self._active_projects.stats()
+        return stats
 
     def has_project(self, tenant_id: str, project_code: str) -> bool:
-        with self._projects_lock:
-            return (tenant_id, project_code) in self._projects
+        return (tenant_id, project_code) in self._projects
 
     def list_projects(self):
-        with self._projects_lock:
-            return list(self._projects.keys())
+        return list(self._projects.keys())
 
     def create_execution_context(
         self,
@@ -143,10 +443,10 @@ class GroxContext:
 
     @staticmethod
     def get_instance() -> "GroxContext":
-        with GroxContext._instance_lock:
-            if GroxContext._instance is None:
-                raise RuntimeError("GroxContext not initialized")
-            return GroxContext._instance
+        instance = GroxContext._instance
+        if instance is None:
+            raise RuntimeError("GroxContext not initialized")
+        return instance
 
     @staticmethod
     def get_current_context() -> Optional[GroxExecutionContext]:
@@ -1,23 +1,36 @@
-from grox.documents.schema import (
-    Document,
-    Collection,
-    DataEntry,
-    CollectionIndexSchema,
-)
+import importlib
 
-from grox.documents.store import (
-    DocumentStore,
-)
+# Names are resolved on first access: the vector store backends pull in numpy,
+# langchain_redis and redisvl, which a deployment may never use.
+_EXPORTS = {
+    "Document": "grox.documents.schema",
+    "Collection": "grox.documents.schema",
+    "DataEntry": "grox.documents.schema",
+    "CollectionIndexSchema": "grox.documents.schema",
+    "IndexSummary": "grox.documents.schema",
+    "IndexManifest": "grox.documents.manifest",
+    "RedisIndexManifest": "grox.documents.manifest",
+    "DocumentStore": "grox.documents.store",
+    "DocumentRetriever": "grox.documents.retriever",
+    "NumpyVectorStore": "grox.documents.numpy_store",
+    "AsyncRedisVectorStore": "grox.documents.redis_store",
+    "IndexingPipeline": "grox.documents.indexer",
+    "EmbeddingCache": "grox.documents.embedding_cache",
+    "CachedEmbeddings": "grox.documents.embedding_cache",
+    "QueryCachedEmbeddings": "grox.documents.embedding_cache",
+}
 
-from grox.documents.retriever import (
-    DocumentRetriever,
-)
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    "Document",
-    "Collection",
-    "DataEntry",
-    "CollectionIndexSchema",
-    "DocumentStore",
-    "DocumentRetriever",
-]
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,112 @@
+from typing import Optional
+
+import numpy as np
+
+
+class IVFIndex:
+    """
+    IVF-flat approximate index over the rows of a NumpyVectorStore matrix.
+
+    Rows are clustered with k-means into `nlist` inverted lists; a query scores
+    the centroids first and then scans only the rows of the `nprobe` closest lists.
+    Recall/speed is tuned with nprobe (more lists scanned - higher recall).
+
+    The index only keeps the list assignment of every row, the vectors stay
+    in the store matrix, so adds and deletes are cheap and do not retrain.
+    Not thread-safe on its own, the owning store serializes access.
+    """
+
+    def __init__(
+        self,
+        distance_metric: str = "cosine",
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        self.distance_metric = distance_metric
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def _centroid_scores(self, vectors: np.ndarray, centroids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Higher is closer, same convention as the store."""
+        centroids = self.centroids if centroids is None else centroids
+        products = vectors @ centroids.T
+        if self.distance_metric == "l2":
+            return 2 * products - np.einsum("ij,ij->i", centroids, centroids)[None, :]
+        return products
+
+    def train(self, matrix: np.ndarray) -> None:
+        """Run k-means on a sample of the rows and assign every row to a list."""
+        size = len(matrix)
+        nlist = min(self.nlist or max(1, int(np.sqrt(size))), size)
+        rng = np.random.default_rng(self.seed)
+
+        sample_size = min(size, nlist * 64)
+        sample = matrix[rng.choice(size, sample_size, replace=False)] if sample_size < size else np.asarray(matrix)
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            labels = np.argmax(self._centroid_scores(sample, centroids), axis=1)
+            for i in range(nlist):
+                members = sample[labels == i]
+                if len(members):
+                    centroids[i] = members.mean(axis=0)
+            if self.distance_metric == "cosine":
+                # spherical k-means, the rows are unit length
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                centroids /= norms
+
+        self.centroids = centroids
+        self.trained_size = size
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = None
+        self.assign(np.arange(size), matrix)
+
+    def assign(self, positions: np.ndarray, vectors: np.ndarray) -> None:
+        """Assign the rows at the given store positions to their closest list."""
+        if not self.is_trained or len(vectors) == 0:
+            return
+        labels = np.argmax(self._centroid_scores(vectors), axis=1).astype(np.int32)
+        end = int(positions.max()) + 1
+        if end > len(self._assignments):
+            grown = np.zeros(max(end, len(self._assignments) * 2), dtype=np.int32)
+            grown[:len(self._assignments)] = self._assignments
+            self._assignments = grown
+        self._assignments[positions] = labels
+        self._lists = None
+
+    def move(self, source: int, target: int) -> None:
+        """Mirror the swap-remove of the store: row `source` now lives at `target`."""
+        if not self.is_trained:
+            return
+        self._assignments[target] = self._assignments[source]
+        self._lists = None
+
+    def _inverted_lists(self, size: int):
+        if self._lists is None or self._lists[0] != size:
+            assignments = self._assignments[:size]
+            order = np.argsort(assignments, kind="stable")
+            bounds = np.searchsorted(assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = (size, order, bounds)
+        return self._lists[1], self._lists[2]
+
+    def candidates(self, query: np.ndarray, size: int, nprobe: Optional[int] = None) -> np.ndarray:
+        """Row positions of the nprobe lists closest to a single prepared query vector."""
+        order, bounds = self._inverted_lists(size)
+        scores = self._centroid_scores(query.reshape(1, -1))[0]
+        nprobe = min(nprobe or self.nprobe, len(scores))
+        probes = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.concatenate([order[bounds[i]:bounds[i + 1]] for i in probes])
@@ -0,0 +1,141 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def default_tokenizer(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a whole collection.
+
+    Built once at indexing time and updated by incremental indexing, so term
+    statistics (IDF, average length) come from the full corpus instead of the
+    few re-ranked candidates. Postings are compiled into a pair of NumPy arrays
+    per term (document positions and term frequencies), scoring a query is a
+    handful of vectorized ops per query term.
+    k1/b/epsilon are applied at query time, the same index serves any params.
+    """
+
+    def __init__(self, tokenizer: Optional[Callable[[str], List[str]]] = None) -> None:
+        self.tokenizer = tokenizer or default_tokenizer
+        self._lock = threading.Lock()
+        self._documents: Dict[str, Counter] = {}
+        self._compiled = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def add(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Add or replace (doc_id, text) pairs."""
+        tokenized = [(doc_id, Counter(self.tokenizer(text))) for doc_id, text in items]
+        with self._lock:
+            for doc_id, counts in tokenized:
+                self._documents[doc_id] = counts
+            self._compiled = None
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in doc_ids:
+                self._documents.pop(doc_id, None)
+            self._compiled = None
+
+    def _compile(self):
+        """Flatten the documents into per-term postings, done lazily after changes."""
+        with self._lock:
+            if self._compiled is not None:
+                return self._compiled
+
+            doc_ids = list(self._documents)
+            lengths = np.zeros(len(doc_ids), dtype=np.float32)
+            postings: Dict[str, Tuple[List[int], List[int]]] = {}
+            for position, doc_id in enumerate(doc_ids):
+                counts = self._documents[doc_id]
+                lengths[position] = sum(counts.values())
+                for term, tf in counts.items():
+                    docs, tfs = postings.setdefault(term, ([], []))
+                    docs.append(position)
+                    tfs.append(tf)
+
+            terms = {
+                term: (np.asarray(docs, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+                for term, (docs, tfs) in postings.items()
+            }
+            size = len(doc_ids)
+            # BM25Okapi idf with negative values floored to epsilon * average idf
+            idf = {term: math.log((size - len(docs) + 0.5) / (len(docs) + 0.5)) for term, (docs, _) in terms.items()}
+            average_idf = sum(idf.values()) / len(idf) if idf else 0.0
+
+            self._compiled = {
+                "doc_ids": doc_ids,
+                "positions": {doc_id: i for i, doc_id in enumerate(doc_ids)},
+                "lengths": lengths,
+                "avgdl": float(lengths.mean()) if size else 0.0,
+                "terms": terms,
+                "idf": idf,
+                "average_idf": average_idf,
+            }
+            return self._compiled
+
+    def score(
+        self,
+        query: str,
+        doc_ids: Sequence[str],
+        k1: float = 1.2,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> np.ndarray:
+        """BM25 scores of the query for the given documents, unknown ids score 0."""
+        compiled = self._compile()
+        if not len(compiled["lengths"]):
+            return np.zeros(len(doc_ids), dtype=np.float32)
+
+        scores = self._score_all(compiled, query, k1, b, epsilon)
+        lookup = np.array([compiled["positions"].get(doc_id, -1) for doc_id in doc_ids], dtype=np.int64)
+        return np.where(lookup >= 0, scores[np.maximum(lookup, 0)], 0.0).astype(np.float32)
+
+    def _score_all(self, compiled: dict, query: str, k1: float, b: float, epsilon: float) -> np.ndarray:
+        lengths = compiled["lengths"]
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        norm = k1 * (1 - b + b * lengths / (compiled["avgdl"] or 1.0))
+        for term in set(self.tokenizer(query)):
+            posting = compiled["terms"].get(term)
+            if posting is None:
+                continue
+            idf = compiled["idf"][term]
+            if idf < 0:
+                idf = epsilon * compiled["average_idf"]
+            docs, tfs = posting
+            scores[docs] += idf * tfs * (k1 + 1) / (tfs + norm[docs])
+        return scores
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        k1: float = 1.2,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) over the whole collection, documents without matches are skipped."""
+        compiled = self._compile()
+        if not len(compiled["lengths"]) or k <= 0:
+            return []
+
+        scores = self._score_all(compiled, query, k1, b, epsilon)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(compiled["doc_ids"][i], float(scores[i])) for i in order]
@@ -0,0 +1,204 @@
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from ..cache import TTLCache
+
+
+def embedding_model_key(model: Any) -> str:
+    """
+    Build a stable identity for an embeddings object.
+    Vectors produced by different providers/models must never be mixed,
+    so the key includes the class and the configured model/deployment name.
+    """
+    # caching wrappers already carry the identity of the wrapped model
+    if isinstance(getattr(model, "model_key", None), str):
+        return model.model_key
+    parts = [type(model).__module__, type(model).__qualname__]
+    for attr in ("model", "model_name", "deployment", "base_url", "dimensions"):
+        value = getattr(model, attr, None)
+        if value is not None:
+            parts.append(f"{attr}={value}")
+    return "|".join(parts)
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache stored in a local SQLite file.
+    Vectors are kept as float32 blobs keyed by (model key, text hash).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, hash))"
+            )
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Hash the exact text, embeddings are case and whitespace sensitive."""
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def get_many(self, model_key: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for the given hashes, misses are omitted."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        # stay well below SQLITE_MAX_VARIABLE_NUMBER
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    (model_key, *chunk),
+                ).fetchall()
+            for text_hash, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[text_hash] = vector.tolist()
+        return found
+
+    def put_many(self, model_key: str, items: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        rows = [
+            (model_key, text_hash, array("f", vector).tobytes())
+            for text_hash, vector in items
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves document vectors from an EmbeddingCache
+    and calls the underlying model only for cache misses.
+    """
+
+    def __init__(self, model: Embeddings, cache: EmbeddingCache, model_key: str = None) -> None:
+        self.model = model
+        self.cache = cache
+        self.model_key = model_key or embedding_model_key(model)
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _lookup(self, texts: List[str]):
+        hashes = [self.cache.hash_text(text) for text in texts]
+        cached = self.cache.get_many(self.model_key, hashes)
+
+        missing: Dict[str, str] = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+
+        with self._stats_lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return hashes, cached, missing
+
+    def _store(self, cached: dict, missing: Dict[str, str], vectors: List[List[float]]) -> None:
+        # rounded to float32 like the stored vectors, a text embeds the same whether cached or not
+        computed = [(text_hash, array("f", vector).tolist()) for text_hash, vector in zip(missing.keys(), vectors)]
+        self.cache.put_many(self.model_key, computed)
+        cached.update(computed)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._lookup(texts)
+        if missing:
+            self._store(cached, missing, self.model.embed_documents(list(missing.values())))
+        return [list(cached[text_hash]) for text_hash in hashes]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._lookup(texts)
+        if missing:
+            self._store(cached, missing, await self.model.aembed_documents(list(missing.values())))
+        return [list(cached[text_hash]) for text_hash in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.model.aembed_query(text)
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+class QueryCachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that memoizes query embeddings in a TTLCache,
+    keyed by (embedding model identity, normalized query).
+    The cache can be shared by every document store of a project and replaced
+    at any time, without one (None) queries are passed through.
+    """
+
+    def __init__(self, model: Embeddings, cache: Optional[TTLCache], model_key: str = None) -> None:
+        self.model = model
+        self.cache = cache
+        self.model_key = model_key or embedding_model_key(model)
+
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        """Unicode and whitespace normalization, the case is kept as embeddings are case sensitive."""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.model.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        cache = self.cache
+        if cache is None:
+            return self.model.embed_query(text)
+        key = (self.model_key, self.normalize_query(text))
+        vector = cache.get(key)
+        if vector is None:
+            vector = self.model.embed_query(key[1])
+            cache.set(key, vector)
+        return list(vector)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        cache = self.cache
+        if cache is None:
+            return await self.model.aembed_query(text)
+        key = (self.model_key, self.normalize_query(text))
+        vector = cache.get(key)
+        if vector is None:
+            vector = await self.model.aembed_query(key[1])
+            cache.set(key, vector)
+        return list(vector)
+
+    def stats(self) -> Dict[str, int]:
+        return self.cache.stats() if self.cache is not None else {}
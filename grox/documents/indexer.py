@@ -0,0 +1,137 @@
+import asyncio
+import random
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from .schema import Collection, IndexSummary
+from .store import DocumentStore
+
+# progress(collection_name, indexed, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class IndexingPipeline:
+    """
+    Async indexing of many collections (of one or many projects) at once.
+
+    Texts of a collection are regrouped into fixed-size embedding batches
+    regardless of how they are split into DataEntry blocks, and the number of
+    batches in flight is capped by a semaphore shared by all collections,
+    so provider rate limits are respected during startup indexing.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        progress: Optional[ProgressCallback] = None,
+        logger=None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.progress = progress
+        self.logger = logger
+
+    @classmethod
+    def from_config(cls, config, progress: Optional[ProgressCallback] = None, logger=None) -> "IndexingPipeline":
+        """Build a pipeline from IndexingConfig."""
+        return cls(
+            batch_size=config.batch_size,
+            max_concurrency=config.max_concurrency,
+            max_retries=config.max_retries,
+            retry_backoff=config.retry_backoff,
+            progress=progress,
+            logger=logger,
+        )
+
+    def _batches(self, store: DocumentStore, collection: Collection) -> List[Tuple[List[str], List[dict], List[str]]]:
+        entries = list(store._collection_entries(collection).items())
+        batches = []
+        for start in range(0, len(entries), self.batch_size):
+            chunk = entries[start:start + self.batch_size]
+            batches.append((
+                [text for _, (text, _) in chunk],
+                [meta for _, (_, meta) in chunk],
+                [doc_id for doc_id, _ in chunk],
+            ))
+        return batches
+
+    async def _add_batch(self, semaphore: asyncio.Semaphore, vector_store: Any, batch) -> int:
+        texts, metadatas, ids = batch
+        attempt = 0
+        while True:
+            async with semaphore:
+                try:
+                    inserted = await vector_store.aadd_texts(texts, metadatas, ids=ids)
+                    return len(inserted)
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    error = e
+            # back off outside of the semaphore, so other batches can proceed
+            delay = self.retry_backoff * (2 ** attempt) * (1 + random.random())
+            attempt += 1
+            if self.logger:
+                self.logger.warning("embedding batch failed, retrying", attempt=attempt, delay=round(delay, 3), error=str(error))
+            await asyncio.sleep(delay)
+
+    async def _index_collection(self, semaphore: asyncio.Semaphore, store: DocumentStore, collection: Collection) -> IndexSummary:
+        vector_store = store._get_vector_store(collection)
+        batches = self._batches(store, collection)
+        total = sum(len(batch[2]) for batch in batches)
+        indexed = 0
+
+        async def _run(batch):
+            nonlocal indexed
+            count = await self._add_batch(semaphore, vector_store, batch)
+            indexed += count
+            if self.progress:
+                self.progress(collection.name, indexed, total)
+            return count
+
+        await asyncio.gather(*(_run(batch) for batch in batches))
+        # manifest writes may go to Redis
+        await asyncio.to_thread(store.record_indexed, collection)
+
+        if self.logger:
+            self.logger.info("Indexed documents", collection_name=collection.name, total=indexed, batches=len(batches))
+        return IndexSummary(collection_name=collection.name, added=indexed)
+
+    async def run(self, stores: Iterable[DocumentStore]) -> List[IndexSummary]:
+        """
+        Index every collection of the given document stores, collections removed
+        from the document files are dropped from the index first.
+        A failing collection is logged and skipped, it does not cancel the others.
+        """
+        stores = list(stores)
+        for store in stores:
+            # manifest and vector deletes may go to Redis
+            removed = await asyncio.to_thread(store.drop_removed_collections)
+            if removed and self.logger:
+                self.logger.info("Dropped removed collections", collections=removed)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        jobs = [
+            (collection_name, self._index_collection(semaphore, store, store.find_collection(collection_name)))
+            for store in stores
+            for collection_name in store.list_collections()
+        ]
+
+        results = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+
+        summaries = []
+        for (collection_name, _), result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                if self.logger:
+                    self.logger.error("Indexing collection failed", collection_name=collection_name, error=str(result))
+                continue
+            summaries.append(result)
+        return summaries
@@ -0,0 +1,77 @@
+import re
+import threading
+from typing import Any, Dict, List
+
+
+class IndexManifest:
+    """
+    Per-collection manifest of what is currently indexed: document id -> metadata hash.
+    The document id is already the content hash, so comparing manifests gives
+    added/removed texts and metadata-only changes without touching the vector store.
+
+    The default implementation lives in process memory, which matches the
+    lifetime of in-memory vector stores.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, str]] = {}
+
+    def load(self, collection_name: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._entries.get(collection_name, {}))
+
+    def update(self, collection_name: str, upserts: Dict[str, str], removed: list) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(collection_name, {})
+            for doc_id in removed:
+                entries.pop(doc_id, None)
+            entries.update(upserts)
+
+    def collections(self) -> List[str]:
+        """Names of the collections with manifest entries."""
+        with self._lock:
+            return [name for name, entries in self._entries.items() if entries]
+
+    def drop(self, collection_name: str) -> None:
+        with self._lock:
+            self._entries.pop(collection_name, None)
+
+
+class RedisIndexManifest(IndexManifest):
+    """Manifest persisted in a Redis hash per collection, next to the vector index."""
+
+    def __init__(self, redis_client: Any, key_prefix: str) -> None:
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+
+    def _key(self, collection_name: str) -> str:
+        return f"{self.key_prefix}:{collection_name}"
+
+    def load(self, collection_name: str) -> Dict[str, str]:
+        raw = self.redis_client.hgetall(self._key(collection_name))
+        return {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+
+    def update(self, collection_name: str, upserts: Dict[str, str], removed: list) -> None:
+        key = self._key(collection_name)
+        pipe = self.redis_client.pipeline(transaction=True)
+        if removed:
+            pipe.hdel(key, *removed)
+        if upserts:
+            pipe.hset(key, mapping=upserts)
+        pipe.execute()
+
+    def collections(self) -> List[str]:
+        # glob characters in tenant or project codes match literally
+        pattern = re.sub(r"([*?\[\]\\])", r"\\\1", self.key_prefix) + ":*"
+        start = len(self.key_prefix) + 1
+        return [
+            (key.decode() if isinstance(key, bytes) else key)[start:]
+            for key in self.redis_client.scan_iter(match=pattern)
+        ]
+
+    def drop(self, collection_name: str) -> None:
+        self.redis_client.delete(self._key(collection_name))
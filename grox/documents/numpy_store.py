@@ -0,0 +1,442 @@
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+from .ann import IVFIndex
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector store backed by one contiguous float32 matrix.
+
+    Queries are a single matmul over all rows plus argpartition top-k.
+    Scores follow the collection distance metric:
+      cosine - rows are L2-normalized on insert, score is the cosine similarity
+      ip     - raw rows, score is the inner product
+      l2     - raw rows, score is the euclidean distance (lower is closer)
+
+    With algorithm 'ivf' (or 'hnsw', which the in-process backend serves with
+    the same IVF-flat index) searches over at least `min_train_size` rows are
+    approximate, see IVFIndex; smaller collections are always scanned exactly.
+    """
+
+    _initial_capacity = 256
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        distance_metric: str = "cosine",
+        algorithm: str = "flat",
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        min_train_size: int = 1024,
+    ) -> None:
+        if distance_metric not in ("cosine", "ip", "l2"):
+            raise ValueError(f"Unsupported distance_metric: '{distance_metric}'")
+        if algorithm not in ("flat", "ivf", "hnsw"):
+            raise ValueError(f"Unsupported algorithm: '{algorithm}'")
+
+        self.embedding = embedding
+        self.distance_metric = distance_metric
+        self.algorithm = algorithm
+        self.min_train_size = min_train_size
+        self._ivf = (
+            IVFIndex(distance_metric, nlist=nlist, nprobe=nprobe or 8)
+            if algorithm != "flat" else None
+        )
+
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._sq_norms: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._positions: dict = {}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ----------------
+    # Writes
+    # ----------------
+
+    def _prepare(self, vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if self.distance_metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        return matrix
+
+    def _ensure_capacity(self, dims: int, required: int) -> None:
+        if self._matrix is None:
+            capacity = max(self._initial_capacity, required)
+            self._matrix = np.zeros((capacity, dims), dtype=np.float32)
+            self._sq_norms = np.zeros(capacity, dtype=np.float32)
+            return
+
+        if self._matrix.shape[1] != dims:
+            raise ValueError(f"Embedding dims mismatch: expected {self._matrix.shape[1]}, got {dims}")
+
+        # a memory-mapped matrix from load() is read-only, copy on first write
+        if required > self._matrix.shape[0] or not self._matrix.flags.writeable:
+            capacity = max(required, self._matrix.shape[0] * 2)
+            matrix = np.zeros((capacity, dims), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            sq_norms = np.zeros(capacity, dtype=np.float32)
+            sq_norms[:self._size] = self._sq_norms[:self._size]
+            self._matrix, self._sq_norms = matrix, sq_norms
+
+    def add_vectors(
+        self,
+        vectors: Any,
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[dict]] = None,
+        ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """Insert or replace precomputed vectors."""
+        matrix = self._prepare(vectors)
+        if len(matrix) != len(texts):
+            raise ValueError("The length of 'vectors' must match the number of 'texts'.")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+
+        with self._lock:
+            self._ensure_capacity(matrix.shape[1], self._size + len(texts))
+            positions = np.empty(len(texts), dtype=np.int64)
+            for n, (row, text, metadata, doc_id) in enumerate(zip(matrix, texts, metadatas, ids)):
+                position = self._positions.get(doc_id)
+                if position is None:
+                    position = self._size
+                    self._size += 1
+                    self._positions[doc_id] = position
+                    self._ids.append(doc_id)
+                    self._texts.append(text)
+                    self._metadatas.append(dict(metadata))
+                else:
+                    self._texts[position] = text
+                    self._metadatas[position] = dict(metadata)
+                self._matrix[position] = row
+                self._sq_norms[position] = float(row @ row)
+                positions[n] = position
+            if self._ivf is not None:
+                self._ivf.assign(positions, matrix)
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = await self.embedding.aembed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    def delete(self, ids: Optional[Sequence[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Delete rows by id, the last row is moved into the freed slot."""
+        if not ids:
+            return False
+        deleted = 0
+        with self._lock:
+            for doc_id in ids:
+                position = self._positions.pop(doc_id, None)
+                if position is None:
+                    continue
+                last = self._size - 1
+                if position != last:
+                    if not self._matrix.flags.writeable:
+                        self._ensure_capacity(self._matrix.shape[1], self._size)
+                    self._matrix[position] = self._matrix[last]
+                    self._sq_norms[position] = self._sq_norms[last]
+                    self._ids[position] = self._ids[last]
+                    self._texts[position] = self._texts[last]
+                    self._metadatas[position] = self._metadatas[last]
+                    self._positions[self._ids[position]] = position
+                    if self._ivf is not None:
+                        self._ivf.move(last, position)
+                self._ids.pop()
+                self._texts.pop()
+                self._metadatas.pop()
+                self._size -= 1
+                deleted += 1
+        return deleted > 0
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[dict]) -> List[str]:
+        """Replace metadata in place, returns the ids that were not found."""
+        missing = []
+        with self._lock:
+            for doc_id, metadata in zip(ids, metadatas):
+                position = self._positions.get(doc_id)
+                if position is None:
+                    missing.append(doc_id)
+                else:
+                    self._metadatas[position] = dict(metadata)
+        return missing
+
+    # ----------------
+    # Search
+    # ----------------
+
+    def _document(self, position: int) -> Document:
+        return Document(
+            id=self._ids[position],
+            page_content=self._texts[position],
+            metadata=self._metadatas[position],
+        )
+
+    def _scores(self, queries: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score matrix (num_queries x rows), higher is always closer."""
+        if positions is None:
+            matrix = self._matrix[:self._size]
+            sq_norms = self._sq_norms[:self._size]
+        else:
+            matrix = self._matrix[positions]
+            sq_norms = self._sq_norms[positions]
+        products = queries @ matrix.T
+        if self.distance_metric == "l2":
+            # -||x - q||^2 = 2 x.q - ||x||^2 - ||q||^2
+            q_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+            return 2 * products - sq_norms[None, :] - q_norms
+        return products
+
+    def _to_score(self, value: float) -> float:
+        if self.distance_metric == "l2":
+            return float(np.sqrt(max(-value, 0.0)))
+        return float(value)
+
+    def _top_k(
+        self,
+        scores: np.ndarray,
+        k: int,
+        filter: Optional[Callable[[Document], bool]] = None,
+        positions: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        size = scores.shape[0]
+        if size == 0 or k <= 0:
+            return []
+
+        if filter is None:
+            if k < size:
+                candidates = np.argpartition(-scores, k - 1)[:k]
+            else:
+                candidates = np.arange(size)
+            order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+
+        hits = []
+        for i in order:
+            position = int(i) if positions is None else int(positions[i])
+            if filter is not None and not filter(self._document(position)):
+                continue
+            hits.append((position, float(scores[i])))
+            if len(hits) == k:
+                break
+        return hits
+
+    def _use_ivf(self, exact: bool) -> bool:
+        if self._ivf is None or exact or self._size < self.min_train_size:
+            return False
+        # (re)train lazily, once at first use and whenever the collection doubled
+        if not self._ivf.is_trained or self._size > 2 * self._ivf.trained_size:
+            self._ivf.train(self._matrix[:self._size])
+        return True
+
+    def _search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        filter: Optional[Callable[[Document], bool]] = None,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        if not self._use_ivf(exact):
+            return [self._top_k(row, k, filter) for row in self._scores(queries)]
+
+        results = []
+        for query in queries:
+            positions = self._ivf.candidates(query, self._size, nprobe)
+            scores = self._scores(query.reshape(1, -1), positions)[0]
+            results.append(self._top_k(scores, k, filter, positions))
+        return results
+
+    def similarity_search_with_score_by_vectors(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int = 4,
+        filter: Optional[Callable[[Document], bool]] = None,
+        exact: bool = False,
+        nprobe: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Batched search, one matmul for all the query vectors.
+        exact - bypass the IVF index, nprobe - override the number of scanned lists
+        """
+        with self._lock:
+            if self._size == 0:
+                return [[] for _ in embeddings]
+            queries = self._prepare(embeddings)
+            return [
+                [(self._document(i), self._to_score(score)) for i, score in hits]
+                for hits in self._search(queries, k, filter, exact, nprobe)
+            ]
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Callable[[Document], bool]] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vectors([embedding], k, filter=filter, **kwargs)[0]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        embedding = self.embedding.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        embedding = await self.embedding.aembed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def batch_similarity_search_with_score(
+        self, queries: Sequence[str], k: int = 4, **kwargs: Any
+    ) -> List[List[Tuple[Document, float]]]:
+        embeddings = [self.embedding.embed_query(query) for query in queries]
+        return self.similarity_search_with_score_by_vectors(embeddings, k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k, **kwargs)]
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[Callable[[Document], bool]] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        with self._lock:
+            if self._size == 0:
+                return []
+            query = self._prepare([embedding])
+            hits = self._search(query, fetch_k, filter)[0]
+            documents = [self._document(i) for i, _ in hits]
+            vectors = self._matrix[[i for i, _ in hits]].copy()
+
+        chosen = maximal_marginal_relevance(query[0], vectors, k=k, lambda_mult=lambda_mult)
+        return [documents[i] for i in chosen]
+
+    def max_marginal_relevance_search(
+        self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs: Any
+    ) -> List[Document]:
+        embedding = self.embedding.embed_query(query)
+        return self.max_marginal_relevance_search_by_vector(embedding, k, fetch_k, lambda_mult, **kwargs)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        if self.distance_metric == "l2":
+            return self._euclidean_relevance_score_fn
+        # cosine and ip scores are already similarities
+        return lambda score: score
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        with self._lock:
+            return [self._document(self._positions[i]) for i in ids if i in self._positions]
+
+    # ----------------
+    # Persistence
+    # ----------------
+
+    def save(self, path: str) -> None:
+        """Write '<path>.npy' with the vectors and '<path>.json' with ids, texts and metadata."""
+        base = Path(path)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            dims = self._matrix.shape[1] if self._matrix is not None else 0
+            matrix = self._matrix[:self._size] if self._matrix is not None else np.zeros((0, dims), dtype=np.float32)
+            np.save(base.with_suffix(".npy"), matrix)
+            with open(base.with_suffix(".json"), "w") as f:
+                json.dump({
+                    "distance_metric": self.distance_metric,
+                    "ids": self._ids,
+                    "texts": self._texts,
+                    "metadatas": self._metadatas,
+                }, f)
+
+    @classmethod
+    def load(cls, path: str, embedding: Embeddings, mmap: bool = True, **kwargs: Any) -> "NumpyVectorStore":
+        """
+        Load a saved store, memory-mapping the vectors unless mmap=False.
+        kwargs are passed to the constructor (algorithm, nlist, nprobe ...).
+        """
+        base = Path(path)
+        with open(base.with_suffix(".json"), "r") as f:
+            data = json.load(f)
+
+        store = cls(embedding, distance_metric=data["distance_metric"], **kwargs)
+        matrix = np.load(base.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        if len(matrix):
+            store._matrix = matrix
+            store._sq_norms = np.einsum("ij,ij->i", matrix, matrix).astype(np.float32)
+        store._size = len(data["ids"])
+        store._ids = data["ids"]
+        store._texts = data["texts"]
+        store._metadatas = data["metadatas"]
+        store._positions = {doc_id: i for i, doc_id in enumerate(store._ids)}
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        distance_metric: str = "cosine",
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(embedding, distance_metric=distance_metric, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,122 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_redis import RedisVectorStore, RedisConfig
+from redisvl.index import AsyncSearchIndex
+from redisvl.redis.utils import array_to_buffer, convert_bytes
+from redisvl.schema import StorageType
+
+
+class AsyncRedisVectorStore(RedisVectorStore):
+    """
+    RedisVectorStore with native async search, lookups and inserts.
+
+    RedisVectorStore only has sync I/O, so its async methods hop to a thread.
+    Here they go through an AsyncSearchIndex on the async Redis client, so a
+    search issued from the event loop never blocks it.
+    """
+
+    def __init__(self, embeddings: Any, config: RedisConfig, async_redis_client: Any, **kwargs: Any) -> None:
+        super().__init__(embeddings=embeddings, config=config, **kwargs)
+        self.async_redis_client = async_redis_client
+        self._async_index = AsyncSearchIndex(self._index.schema, redis_client=async_redis_client)
+
+    def _return_fields(self, return_metadata: bool) -> List[str]:
+        fields = [self.config.content_field]
+        if return_metadata:
+            fields += [
+                field.name
+                for field in self._index.schema.fields.values()
+                if field.name not in (self.config.embedding_field, self.config.content_field)
+            ]
+        return fields
+
+    def _records(self, texts: List[str], embeddings: List[List[float]], metadatas: Optional[List[dict]]) -> List[dict]:
+        """Same record layout as RedisVectorStore.add_texts."""
+        records = []
+        for text, embedding, metadata in zip(texts, embeddings, metadatas or [{}] * len(texts)):
+            record = {
+                self.config.content_field: text,
+                self.config.embedding_field: (
+                    embedding
+                    if self.config.storage_type == StorageType.JSON.value
+                    else array_to_buffer(embedding, dtype=self.config.vector_datatype)
+                ),
+                "_index_name": self.config.index_name,
+                "_metadata_json": json.dumps(metadata),
+            }
+            for name, value in metadata.items():
+                if value is None:
+                    continue
+                if isinstance(value, list):
+                    value = self.config.default_tag_separator.join(value)
+                record[name] = value
+            records.append(record)
+        return records
+
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        keys: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        keys = keys or kwargs.get("ids")
+        embeddings = await self._embeddings.aembed_documents(texts)
+        records = self._records(texts, embeddings, metadatas)
+        if keys:
+            record_keys = [f"{self.config.key_prefix}:{key}" for key in keys]
+            result = await self._async_index.load(records, keys=record_keys, ttl=self.ttl)
+        else:
+            result = await self._async_index.load(records, ttl=self.ttl)
+        return list(result) if result is not None else []
+
+    async def asimilarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Any] = None,
+        sort_by: Optional[str] = None,
+        **kwargs: Any,
+    ) -> List[Any]:
+        return_metadata = kwargs.get("return_metadata", True)
+        query = self._query_builder(
+            embedding=embedding,
+            k=k,
+            distance_threshold=kwargs.get("distance_threshold"),
+            sort_by=sort_by,
+            filter=filter,
+            return_fields=self._return_fields(return_metadata),
+        )
+        results = await self._async_index.query(query)
+        return list(self._prepare_docs(False, results, return_metadata, with_scores=True))
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Any]:
+        embedding = await self._embeddings.aembed_query(query)
+        return await self.asimilarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k, **kwargs)]
+
+    async def aget_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        prefix = self.config.key_prefix
+        keys = [f"{prefix}:{doc_id}" if prefix else doc_id for doc_id in ids]
+        if self.config.storage_type == StorageType.JSON.value:
+            values = await self.async_redis_client.json().mget(keys, ".")
+        else:
+            pipe = self.async_redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            values = [convert_bytes(value) for value in await pipe.execute()]
+
+        documents = []
+        for doc_id, value in zip(ids, values):
+            if not value:
+                continue
+            metadata: Dict[str, Any] = json.loads(value["_metadata_json"]) if "_metadata_json" in value else {}
+            documents.append(Document(id=doc_id, page_content=value.get(self.config.content_field, ""), metadata=metadata))
+        return documents
@@ -1,15 +1,32 @@
-from typing import List, Tuple, Optional, Any
-from langchain_community.retrievers import BM25Retriever
-from langchain.schema import Document
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Tuple, Optional, Any
+from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStore
 
+from .bm25 import BM25Index
+
 
 class DocumentRetriever:
     """Handles vector similarity search with optional score filtering and BM25 re-ranking."""
 
-    def __init__(self, vector_store: VectorStore, logger) -> None:
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        logger,
+        bm25_index: Optional[BM25Index] = None,
+        dense_executor: Optional[Callable[[], Executor]] = None,
+    ) -> None:
+        """
+        bm25_index - prebuilt index of the whole collection used for re-ranking,
+                     without it a BM25Retriever is built over the candidates per query
+        dense_executor - returns the executor running the dense search of hybrid_rrf
+                         next to BM25, without it the two searches run one after the other
+        """
         self.vector_store = vector_store
         self.logger = logger
+        self.bm25_index = bm25_index
+        self.dense_executor = dense_executor
 
     def get_relevant_documents(
         self,
@@ -36,6 +53,45 @@ class DocumentRetriever:
         if search_type == "similarity_search_with_score_bm25_ranked":
             return self._search_with_score_bm25_ranked(query, num_results, score_threshold, **kwargs)
 
+        if search_type == "hybrid_rrf":
+            return self._search_hybrid_rrf(query, num_results, **kwargs)
+
+        raise ValueError(f"Unsupported search_type: {search_type}")
+
+    async def aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        search_type: str = "similarity",
+        num_results: int = 5,
+        score_threshold: Optional[float] = 0.8,
+        **kwargs: Any,
+    ) -> List[Document]:
+        """Async counterpart of get_relevant_documents, the vector store I/O runs on the event loop."""
+        if search_type in {"similarity", "mmr", "similarity_score_threshold"}:
+            retriever = self.vector_store.as_retriever(
+                search_type=search_type,
+                search_kwargs={
+                    "k": num_results,
+                    "score_threshold": score_threshold,
+                },
+            )
+            return await retriever.ainvoke(query)
+
+        if search_type == "similarity_search_with_score":
+            return await self._asearch_with_score(query, num_results, score_threshold)
+
+        if search_type == "similarity_search_with_score_bm25_ranked":
+            candidate_docs = await self._asearch_with_score(query, num_results, score_threshold)
+            if not candidate_docs:
+                return []
+            if self.bm25_index is None:
+                return await asyncio.to_thread(self._rank_bm25, query, candidate_docs, num_results, **kwargs)
+            return self._rank_bm25(query, candidate_docs, num_results, **kwargs)
+
+        if search_type == "hybrid_rrf":
+            return await self._asearch_hybrid_rrf(query, num_results, **kwargs)
+
         raise ValueError(f"Unsupported search_type: {search_type}")
 
     def _search_with_score(
@@ -47,8 +103,28 @@ class DocumentRetriever:
         results = self.vector_store.similarity_search_with_score(
             query, k=num_results, return_metadata=True
         )
+        return self._filter_scored(results, num_results, score_threshold)
+
+    async def _asearch_with_score(
+        self,
+        query: str,
+        num_results: int,
+        score_threshold: Optional[float],
+    ) -> List[Document]:
+        results = await self.vector_store.asimilarity_search_with_score(
+            query, k=num_results, return_metadata=True
+        )
+        return self._filter_scored(results, num_results, score_threshold)
+
+    def _filter_scored(
+        self,
+        results: List[Tuple[Document, float]],
+        num_results: int,
+        score_threshold: Optional[float],
+    ) -> List[Document]:
         filtered = [
-            (doc, score) for doc, score in results if score_threshold is None or score >= score_threshold
+            (doc, score) for doc, score in results
+            if score_threshold is None or self._similarity(score) >= score_threshold
         ]
 
         self.logger.info(
@@ -59,6 +135,12 @@ class DocumentRetriever:
         )
         return [doc for doc, _ in filtered[:num_results]]
 
+    def _similarity(self, score: float) -> float:
+        """The score as a similarity (higher is closer), l2 stores return euclidean distances."""
+        if getattr(self.vector_store, "distance_metric", None) == "l2":
+            return 1.0 / (1.0 + score)
+        return score
+
     def _search_with_score_bm25_ranked(
         self,
         query: str,
@@ -69,12 +151,33 @@ class DocumentRetriever:
         candidate_docs = self._search_with_score(query, num_results, score_threshold)
         if not candidate_docs:
             return []
+        return self._rank_bm25(query, candidate_docs, num_results, **kwargs)
 
-        bm25_params = {
-            "k1": float(kwargs.get("k1", 1.2)),
-            "b": float(kwargs.get("b", 0.75)),
-            "epsilon": float(kwargs.get("epsilon", 0.25)),
-        }
+    def _rank_bm25(
+        self,
+        query: str,
+        candidate_docs: List[Document],
+        num_results: int,
+        **kwargs: Any,
+    ) -> List[Document]:
+        bm25_params = self._bm25_params(kwargs)
+
+        if self.bm25_index is not None:
+            doc_ids = [self._doc_id(doc) for doc in candidate_docs]
+            scores = self.bm25_index.score(query, doc_ids, **bm25_params)
+            # stable sort keeps the vector order between equal BM25 scores
+            order = sorted(range(len(candidate_docs)), key=lambda i: -scores[i])
+            ranked = [candidate_docs[i] for i in order[:num_results]]
+
+            self.logger.info(
+                "similarity_search_with_score_bm25_ranked",
+                initial_candidates=len(candidate_docs),
+                ranked_results=len(ranked),
+                bm25_params=bm25_params,
+            )
+            return ranked
+
+        from langchain_community.retrievers import BM25Retriever
 
         retriever = BM25Retriever.from_documents(
             candidate_docs,
@@ -90,3 +193,111 @@ class DocumentRetriever:
             bm25_params=bm25_params,
         )
         return ranked
+
+    @staticmethod
+    def _doc_id(doc: Document) -> Optional[str]:
+        return doc.metadata.get("id") or doc.id
+
+    def _bm25_params(self, kwargs: dict) -> Dict[str, float]:
+        return {
+            "k1": float(kwargs.get("k1", 1.2)),
+            "b": float(kwargs.get("b", 0.75)),
+            "epsilon": float(kwargs.get("epsilon", 0.25)),
+        }
+
+    def _search_hybrid_rrf(self, query: str, num_results: int, **kwargs: Any) -> List[Document]:
+        """
+        Dense and BM25 retrieval over the whole collection, run concurrently and
+        fused with weighted reciprocal rank fusion: sum(weight / (rrf_k + rank)).
+        Scores of the two searches are not comparable, so score_threshold is not applied.
+        """
+        if self.bm25_index is None:
+            raise ValueError("hybrid_rrf search requires a BM25 index")
+
+        candidate_k = int(kwargs.get("candidate_k") or max(num_results * 4, 20))
+        bm25_params = self._bm25_params(kwargs)
+
+        if self.dense_executor is not None:
+            # dense search waits on the embedding provider, BM25 runs meanwhile in the caller thread
+            dense_future = self.dense_executor().submit(
+                self.vector_store.similarity_search_with_score, query, k=candidate_k
+            )
+            sparse_hits = self.bm25_index.search(query, candidate_k, **bm25_params)
+            dense_hits = dense_future.result()
+        else:
+            dense_hits = self.vector_store.similarity_search_with_score(query, k=candidate_k)
+            sparse_hits = self.bm25_index.search(query, candidate_k, **bm25_params)
+
+        top, documents = self._fuse_rrf(dense_hits, sparse_hits, num_results, **kwargs)
+
+        # documents found only by BM25 are loaded from the vector store
+        missing = [doc_id for doc_id in top if doc_id not in documents]
+        if missing:
+            for doc in self.vector_store.get_by_ids(missing):
+                documents[self._doc_id(doc)] = doc
+
+        return self._rrf_results(top, documents, dense_hits, sparse_hits)
+
+    async def _asearch_hybrid_rrf(self, query: str, num_results: int, **kwargs: Any) -> List[Document]:
+        if self.bm25_index is None:
+            raise ValueError("hybrid_rrf search requires a BM25 index")
+
+        candidate_k = int(kwargs.get("candidate_k") or max(num_results * 4, 20))
+        bm25_params = self._bm25_params(kwargs)
+
+        dense_task = asyncio.ensure_future(
+            self.vector_store.asimilarity_search_with_score(query, k=candidate_k)
+        )
+        # BM25 is in-process and cheap, it runs while the query embedding is in flight
+        sparse_hits = self.bm25_index.search(query, candidate_k, **bm25_params)
+        dense_hits = await dense_task
+
+        top, documents = self._fuse_rrf(dense_hits, sparse_hits, num_results, **kwargs)
+
+        missing = [doc_id for doc_id in top if doc_id not in documents]
+        if missing:
+            for doc in await self.vector_store.aget_by_ids(missing):
+                documents[self._doc_id(doc)] = doc
+
+        return self._rrf_results(top, documents, dense_hits, sparse_hits)
+
+    def _fuse_rrf(
+        self,
+        dense_hits: List[Tuple[Document, float]],
+        sparse_hits: List[Tuple[str, float]],
+        num_results: int,
+        **kwargs: Any,
+    ) -> Tuple[List[str], Dict[str, Document]]:
+        """Return the fused top doc ids and the documents already known from the dense hits."""
+        rrf_k = float(kwargs.get("rrf_k", 60))
+        dense_weight = float(kwargs.get("dense_weight", 1.0))
+        sparse_weight = float(kwargs.get("sparse_weight", 1.0))
+
+        fused: Dict[str, float] = {}
+        documents: Dict[str, Document] = {}
+        for rank, (doc, _) in enumerate(dense_hits, start=1):
+            doc_id = self._doc_id(doc)
+            documents[doc_id] = doc
+            fused[doc_id] = fused.get(doc_id, 0.0) + dense_weight / (rrf_k + rank)
+        for rank, (doc_id, _) in enumerate(sparse_hits, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + sparse_weight / (rrf_k + rank)
+
+        top = sorted(fused, key=lambda doc_id: -fused[doc_id])[:num_results]
+        return top, documents
+
+    def _rrf_results(
+        self,
+        top: List[str],
+        documents: Dict[str, Document],
+        dense_hits: list,
+        sparse_hits: list,
+    ) -> List[Document]:
+        results = [documents[doc_id] for doc_id in top if doc_id in documents]
+
+        self.logger.info(
+            "hybrid_rrf",
+            dense_candidates=len(dense_hits),
+            sparse_candidates=len(sparse_hits),
+            fused_results=len(results),
+        )
+        return results
@@ -1,8 +1,6 @@
 import yaml
 from pydantic import BaseModel, Field, constr, conlist, StringConstraints
 from typing import List, Optional, Literal, Dict, Any, Annotated, Union
-from redisvl.schema import IndexSchema, IndexInfo, BaseField
-from redisvl.utils.utils import model_to_dict
 
 
 # ----------------
@@ -15,27 +13,51 @@ class DocumentSearchParams(BaseModel):
     search_type: str = Field(
         default="similarity",
         description="Search strategy: one of 'similarity', 'mmr', 'similarity_score_threshold', "
-                    "'similarity_search_with_score', or 'similarity_search_with_score_bm25_ranked'"
+                    "'similarity_search_with_score', 'similarity_search_with_score_bm25_ranked', "
+                    "or 'hybrid_rrf' (dense and BM25 over the whole collection, fused by rank)"
     )
     num_results: int = Field(default=5, description="Maximum number of documents to return")
-    score_threshold: float = Field(default=0.8, description="Minimum similarity score to include")
+    score_threshold: float = Field(default=0.8, description="Minimum similarity score to include, an l2 distance d counts as 1 / (1 + d)")
 
     # Optional BM25 parameters
     k1: Optional[float] = Field(default=None, description="BM25 term frequency saturation")
     b: Optional[float] = Field(default=None, description="BM25 length normalization")
     epsilon: Optional[float] = Field(default=None, description="BM25 small constant for smoothing")
 
+    # Optional hybrid_rrf parameters
+    candidate_k: Optional[int] = Field(default=None, description="Candidates taken from each of the dense and BM25 searches")
+    rrf_k: Optional[int] = Field(default=None, description="Reciprocal rank fusion constant, higher flattens rank differences")
+    dense_weight: Optional[float] = Field(default=None, description="Weight of the dense ranking in the fusion")
+    sparse_weight: Optional[float] = Field(default=None, description="Weight of the BM25 ranking in the fusion")
+
+
+# ----------------
+# Indexing
+# ----------------
+
+class IndexSummary(BaseModel):
+    collection_name: str
+    added: int = 0
+    removed: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
 
 # ----------------
 # Field Definitions
 # ----------------
 
 class VectorAttrs(BaseModel):
-    algorithm: Literal['flat', 'hnsw'] = 'flat'
+    algorithm: Literal['flat', 'hnsw', 'ivf'] = 'flat'
     dims: int = 1536
     distance_metric: Literal['cosine', 'l2', 'ip'] = 'cosine'
     datatype: Literal['float32', 'float64'] = 'float32'
 
+    # Approximate search of the in-process 'numpy' backend ('hnsw' or 'ivf'); 'ivf', nlist
+    # and nprobe are numpy only, the redis backend rejects them
+    nlist: Optional[int] = Field(default=None, description="Number of IVF lists, defaults to sqrt(rows)")
+    nprobe: Optional[int] = Field(default=None, description="Number of IVF lists scanned per query")
+
 
 class FieldDef(BaseModel):
     name: str
@@ -91,6 +113,9 @@ class Collection(BaseModel):
         Returns:
             Dict[str, Any]: The index schema as a dictionary.
         """
+        # redis backend only, loaded on first use
+        from redisvl.utils.utils import model_to_dict
+
         # Manually serialize to ensure all field attributes are preserved
         dict_schema = {
             "index": model_to_dict(self.index),
@@ -111,6 +136,17 @@ class Collection(BaseModel):
             default
         )
 
+    def get_vector_attrs(self) -> VectorAttrs:
+        """
+        Returns the attrs of the first vector field in the schema.
+        Falls back to the VectorAttrs defaults if none found.
+        """
+        if self.collection_schema:
+            for field in self.collection_schema.fields:
+                if field.type == "vector" and field.attrs:
+                    return field.attrs
+        return VectorAttrs()
+
     def get_content_field_name(self, default: str = "text") -> str:
         """
         Returns a primary text field name based on common conventions.
@@ -1,16 +1,28 @@
 import abc
+import asyncio
 import hashlib
+import json
 import threading
 import logging
-from typing import Any, List, Dict, Optional, Sequence, Callable
-from langchain.tools import Tool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional, Sequence, Callable, Tuple
+from langchain_core.tools import StructuredTool
+from langchain_core.runnables import RunnableConfig
 
 import yaml
+from ..cache import TTLCache
+from .bm25 import BM25Index
+from .manifest import IndexManifest
 from .retriever import DocumentRetriever
-from .schema import Document, Collection, DocumentSearchParams
+from .schema import Document, Collection, DocumentSearchParams, IndexSummary
 
 logger = logging.getLogger(__name__)
 
+# search types that rank with the collection-wide BM25 index
+BM25_SEARCH_TYPES = frozenset({"similarity_search_with_score_bm25_ranked", "hybrid_rrf"})
+
+DOCUMENT_SEARCH_DESCRIPTION = "Search documents from a specific collection using vector similarity, BM25 re-ranking or hybrid rank fusion."
+
 
 class DocumentStore(abc.ABC):
     """
@@ -22,15 +34,36 @@ class DocumentStore(abc.ABC):
         model: Any,
         document_paths: List[str],
         vector_store_factory: Callable[[Any, Collection], Any],
-        logger
+        logger,
+        manifest: Optional[IndexManifest] = None,
+        metadata_updater: Optional[Callable[[Any, List[str], List[str], List[dict]], None]] = None,
+        result_cache: Optional[TTLCache] = None,
     ) -> None:
+        """
+        manifest - keeps the indexed content hashes per collection for incremental indexing
+        metadata_updater - backend specific update of metadata without re-embedding,
+                           falls back to add_texts when not provided
+        result_cache - DocumentSearch results keyed by the search params and collection version
+        """
         self.model = model
         self.document_paths = document_paths
         self.vector_store_factory = vector_store_factory
         self.logger = logger
+        self.manifest = manifest or IndexManifest()
+        self.metadata_updater = metadata_updater
+        self.result_cache = result_cache
+
+        # bumped on every (re)index, so cached search results of older data never match
+        self._collection_versions: Dict[str, int] = {}
+        self._collection_versions_lock = threading.Lock()
 
         self._vector_stores: Dict[str, Any] = {}
         self._vector_stores_lock = threading.Lock()
+        self._bm25_indexes: Dict[str, BM25Index] = {}
+        self._bm25_indexes_lock = threading.Lock()
+        # runs the dense half of hybrid searches, created by the first one
+        self._dense_executor: Optional[ThreadPoolExecutor] = None
+        self._dense_executor_lock = threading.Lock()
         self.collections: Dict[str, Collection] = self._load_collections()
 
     def _load_collections(self) -> Dict[str, Collection]:
@@ -50,6 +83,33 @@ class DocumentStore(abc.ABC):
 
         return collections
 
+    def collection_version(self, collection_name: str) -> int:
+        with self._collection_versions_lock:
+            return self._collection_versions.get(collection_name, 0)
+
+    def bump_collection_version(self, collection_name: str) -> int:
+        with self._collection_versions_lock:
+            version = self._collection_versions.get(collection_name, 0) + 1
+            self._collection_versions[collection_name] = version
+            return version
+
+    def reload_collections(self) -> None:
+        """Re-read the document YAML files, used before incremental reindexing."""
+        self.collections = self._load_collections()
+
+    def close(self) -> None:
+        """Drop the vector stores, BM25 indexes and search threads, they are rebuilt on next use."""
+        with self._vector_stores_lock:
+            self._vector_stores.clear()
+        with self._bm25_indexes_lock:
+            self._bm25_indexes.clear()
+        with self._dense_executor_lock:
+            executor, self._dense_executor = self._dense_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
     def find_collection(self, collection_name: str) -> Optional[Collection]:
         """Return the Collection definition by name, if it exists."""
         return self.collections.get(collection_name)
@@ -64,11 +124,44 @@ class DocumentStore(abc.ABC):
                 self._vector_stores[collection.name] = self.vector_store_factory(self.model, collection)
             return self._vector_stores[collection.name]
 
+    def get_bm25_index(self, collection: Collection) -> BM25Index:
+        """
+        Return the BM25 index of the whole collection. It is built from the
+        collection documents by the first BM25 search after a full indexing
+        (or in a process serving an index populated by another worker) and
+        then maintained by incremental reindexing.
+        """
+        with self._bm25_indexes_lock:
+            index = self._bm25_indexes.get(collection.name)
+            if index is None:
+                index = BM25Index()
+                index.add((doc_id, text) for doc_id, (text, _) in self._collection_entries(collection).items())
+                self._bm25_indexes[collection.name] = index
+            return index
+
+    def _drop_bm25_index(self, collection: Collection) -> None:
+        with self._bm25_indexes_lock:
+            self._bm25_indexes.pop(collection.name, None)
+
     @staticmethod
     def _hash_text(text: str) -> str:
         """Create a stable hash for a piece of text."""
         return hashlib.blake2b(text.strip().lower().encode(), digest_size=16).hexdigest()
 
+    @staticmethod
+    def _hash_metadata(metadata: dict) -> str:
+        payload = json.dumps(metadata, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _collection_entries(self, collection: Collection) -> Dict[str, Tuple[str, dict]]:
+        """Flatten the collection into doc_id -> (text, metadata), the last duplicate wins."""
+        entries = {}
+        for data in collection.data:
+            for text in data.documents:
+                doc_id = self._hash_text(text)
+                entries[doc_id] = (text, {"id": doc_id, **data.metadata})
+        return entries
+
     def index_documents(self, collection_name: str) -> int:
         """
         Index documents from a collection into the associated vector store.
@@ -94,33 +187,191 @@ class DocumentStore(abc.ABC):
             inserted_keys = vector_store.add_texts(texts, metadata, ids=ids)
             total_indexed += len(inserted_keys)
 
+        self.record_indexed(collection)
         return total_indexed
 
-    def get_retriever(self, collection_name: str) -> DocumentRetriever:
-        """Build a DocumentRetriever instance for the given collection name."""
+    def record_indexed(self, collection: Collection) -> None:
+        """
+        Record a completed full indexing of the collection in the manifest.
+        Nothing is deleted in the full mode, so stale ids stay in the manifest
+        and are removed by the next incremental run. The BM25 index is rebuilt
+        by the next search that needs it.
+        """
+        self._drop_bm25_index(collection)
+        self.bump_collection_version(collection.name)
+        self.manifest.update(
+            collection.name,
+            {
+                doc_id: self._hash_metadata(meta)
+                for doc_id, (_, meta) in self._collection_entries(collection).items()
+            },
+            [],
+        )
+
+    def drop_removed_collections(self) -> List[str]:
+        """
+        Delete the vectors and manifest entries of the indexed collections that are
+        no longer in the document files, returns their names.
+        """
+        removed = [name for name in self.manifest.collections() if name not in self.collections]
+        for name in removed:
+            with self._vector_stores_lock:
+                vector_store = self._vector_stores.pop(name, None)
+            doc_ids = list(self.manifest.load(name))
+            if doc_ids:
+                if vector_store is None:
+                    # indexed by an earlier process, e.g. into Redis
+                    vector_store = self.vector_store_factory(self.model, Collection(name=name, data=[]))
+                vector_store.delete(ids=doc_ids)
+            self.manifest.drop(name)
+            with self._bm25_indexes_lock:
+                self._bm25_indexes.pop(name, None)
+            self.bump_collection_version(name)
+        return removed
+
+    def reindex_documents(self, collection_name: str) -> IndexSummary:
+        """
+        Incrementally index a collection: compare the current documents with the
+        manifest and issue only adds, deletes and metadata updates for the changes.
+        """
         collection = self.find_collection(collection_name)
         if not collection:
             raise ValueError(f"Collection '{collection_name}' not found")
+
         vector_store = self._get_vector_store(collection)
-        return DocumentRetriever(vector_store, self.logger)
+        current = self._collection_entries(collection)
+        current_hashes = {doc_id: self._hash_metadata(meta) for doc_id, (_, meta) in current.items()}
+        previous = self.manifest.load(collection.name)
+
+        added = [doc_id for doc_id in current if doc_id not in previous]
+        removed = [doc_id for doc_id in previous if doc_id not in current]
+        updated = [
+            doc_id for doc_id in current
+            if doc_id in previous and previous[doc_id] != current_hashes[doc_id]
+        ]
+
+        if removed:
+            vector_store.delete(ids=removed)
+
+        if added:
+            vector_store.add_texts(
+                [current[doc_id][0] for doc_id in added],
+                [current[doc_id][1] for doc_id in added],
+                ids=added,
+            )
+
+        if updated:
+            texts = [current[doc_id][0] for doc_id in updated]
+            metadatas = [current[doc_id][1] for doc_id in updated]
+            if self.metadata_updater:
+                self.metadata_updater(vector_store, updated, texts, metadatas)
+            else:
+                vector_store.add_texts(texts, metadatas, ids=updated)
+
+        self.manifest.update(
+            collection.name,
+            {doc_id: current_hashes[doc_id] for doc_id in added + updated},
+            removed,
+        )
+        if added or removed or updated:
+            bm25_index = self._bm25_indexes.get(collection.name)
+            if bm25_index is not None:
+                bm25_index.remove(removed)
+                bm25_index.add((doc_id, current[doc_id][0]) for doc_id in added + updated)
+            self.bump_collection_version(collection.name)
+
+        return IndexSummary(
+            collection_name=collection.name,
+            added=len(added),
+            removed=len(removed),
+            updated=len(updated),
+            unchanged=len(current) - len(added) - len(updated),
+        )
+
+    def get_retriever(self, collection_name: str, search_type: Optional[str] = None) -> DocumentRetriever:
+        """
+        Build a DocumentRetriever instance for the given collection name.
+        search_type - the search the retriever is used for, the BM25 index is only
+                      built for BM25_SEARCH_TYPES; None - any search
+        """
+        collection = self.find_collection(collection_name)
+        if not collection:
+            raise ValueError(f"Collection '{collection_name}' not found")
+        vector_store = self._get_vector_store(collection)
+        bm25_index = self.get_bm25_index(collection) if search_type is None or search_type in BM25_SEARCH_TYPES else None
+        return DocumentRetriever(vector_store, self.logger, bm25_index=bm25_index, dense_executor=self._get_dense_executor)
+
+    def _get_dense_executor(self) -> ThreadPoolExecutor:
+        with self._dense_executor_lock:
+            if self._dense_executor is None:
+                self._dense_executor = ThreadPoolExecutor(thread_name_prefix="grox-dense-search")
+            return self._dense_executor
 
     def _tool_fn(self, params: DocumentSearchParams):
-        retriever = self.get_retriever(params.collection_name)
+        if self.result_cache is None:
+            return self._search(params)
 
-        bm25_kwargs = {
-            "k1": params.k1,
-            "b": params.b,
-            "epsilon": params.epsilon,
-        }
+        key = (params.model_dump_json(), self.collection_version(params.collection_name))
+        documents = self.result_cache.get(key)
+        if documents is None:
+            documents = self._search(params)
+            self.result_cache.set(key, documents)
+        return list(documents)
+
+    async def _atool_fn(self, params: DocumentSearchParams):
+        if self.result_cache is None:
+            return await self._asearch(params)
 
+        key = (params.model_dump_json(), self.collection_version(params.collection_name))
+        documents = self.result_cache.get(key)
+        if documents is None:
+            documents = await self._asearch(params)
+            self.result_cache.set(key, documents)
+        return list(documents)
+
+    def _search(self, params: DocumentSearchParams):
+        retriever = self.get_retriever(params.collection_name, params.search_type)
         return retriever.get_relevant_documents(
             query=params.query,
             search_type=params.search_type,
             num_results=params.num_results,
             score_threshold=params.score_threshold,
-            **{k: v for k, v in bm25_kwargs.items() if v is not None},
+            **self._search_kwargs(params),
+        )
+
+    def _retriever_ready(self, collection_name: str, search_type: str) -> bool:
+        """True when get_retriever only looks up the vector store and BM25 index, without building them."""
+        if collection_name not in self._vector_stores:
+            return False
+        return search_type not in BM25_SEARCH_TYPES or collection_name in self._bm25_indexes
+
+    async def _asearch(self, params: DocumentSearchParams):
+        if self._retriever_ready(params.collection_name, params.search_type):
+            retriever = self.get_retriever(params.collection_name, params.search_type)
+        else:
+            # building the vector store (client, index) or the BM25 index blocks
+            retriever = await asyncio.to_thread(self.get_retriever, params.collection_name, params.search_type)
+        return await retriever.aget_relevant_documents(
+            query=params.query,
+            search_type=params.search_type,
+            num_results=params.num_results,
+            score_threshold=params.score_threshold,
+            **self._search_kwargs(params),
         )
 
+    @staticmethod
+    def _search_kwargs(params: DocumentSearchParams) -> Dict[str, Any]:
+        search_kwargs = {
+            "k1": params.k1,
+            "b": params.b,
+            "epsilon": params.epsilon,
+            "candidate_k": params.candidate_k,
+            "rrf_k": params.rrf_k,
+            "dense_weight": params.dense_weight,
+            "sparse_weight": params.sparse_weight,
+        }
+        return {k: v for k, v in search_kwargs.items() if v is not None}
+
     """
     Sample Agent Action Input
     {
@@ -138,10 +389,38 @@ class DocumentStore(abc.ABC):
     }
     """
     @property  # or use @cached_property if you want it cached
-    def tool(self) -> Tool:
-        return Tool(
+    def tool(self) -> StructuredTool:
+        # the coroutine is used by ainvoke, so agents on the event loop do not block on retrieval
+        return StructuredTool.from_function(
+            func=lambda **kwargs: self._tool_fn(DocumentSearchParams(**kwargs)),
+            coroutine=lambda **kwargs: self._atool_fn(DocumentSearchParams(**kwargs)),
             name="DocumentSearch",
-            func=self._tool_fn,
-            description="Search documents from a specific collection using vector similarity or BM25 re-ranking.",
-            args_schema=DocumentSearchParams
+            description=DOCUMENT_SEARCH_DESCRIPTION,
+            args_schema=DocumentSearchParams,
         )
+
+
+def _configured_store(config: Optional[RunnableConfig]) -> DocumentStore:
+    store = ((config or {}).get("configurable") or {}).get("document_store")
+    if store is None:
+        raise ValueError("DocumentSearch requires configurable['document_store'], see GroxProject.graph_config")
+    return store
+
+
+def _search_configured_store(config: RunnableConfig, **kwargs):
+    return _configured_store(config)._tool_fn(DocumentSearchParams(**kwargs))
+
+
+async def _asearch_configured_store(config: RunnableConfig, **kwargs):
+    return await _configured_store(config)._atool_fn(DocumentSearchParams(**kwargs))
+
+
+# Same tool as DocumentStore.tool, but the store comes from the run config instead of
+# being bound, so one compiled graph can serve the projects of many tenants.
+document_search_tool = StructuredTool.from_function(
+    func=_search_configured_store,
+    coroutine=_asearch_configured_store,
+    name="DocumentSearch",
+    description=DOCUMENT_SEARCH_DESCRIPTION,
+    args_schema=DocumentSearchParams,
+)
@@ -1,16 +1,25 @@
 import re
+import json
 from typing import Optional
-from .config import BackendConfig
-from langgraph.checkpoint.redis import RedisSaver, AsyncRedisSaver
-from langgraph.checkpoint.memory import MemorySaver
-
-from langchain_core.vectorstores.in_memory import InMemoryVectorStore
-from langchain_redis import RedisVectorStore, RedisConfig
-from redisvl.schema import IndexSchema, IndexInfo, TextField
+from .config import BackendConfig, CacheConfig
+from .cache import TTLCache
 from langchain_core.vectorstores import VectorStore
 
-from .factory_cache import *
-from .documents import *
+# backend libraries (langgraph savers, langchain_redis, redisvl, numpy) are imported
+# in the branch of the backend that needs them, see `grox profile-startup`
+from .factory_cache import (
+    create_async_redis_instance,
+    create_async_redis_saver,
+    create_chat_history_memory_manager,
+    create_embedding_cache,
+    create_memory_saver,
+    create_redis_instance,
+    create_redis_saver,
+)
+from .documents.embedding_cache import CachedEmbeddings, QueryCachedEmbeddings
+from .documents.manifest import IndexManifest, RedisIndexManifest
+from .documents.schema import Collection, CollectionIndexSchema, IndexSettings
+from .documents.store import DocumentStore
 
 def parse_ttl(ttl: Optional[str]) -> Optional[int]:
     if not ttl:
@@ -34,13 +43,19 @@ def build_checkpoint_saver(config: BackendConfig):
     ttl_seconds = parse_ttl(config.ttl)
 
     if config.backend == "memory":
-        return create_memory_saver()
+        return create_memory_saver(ttl_seconds, config.limits)
 
     elif config.backend == "redis":
         if config.sync:
-            return create_redis_saver(config.url.get_secret_value(), ttl_seconds)
+            return create_redis_saver(
+                config.url.get_secret_value(), ttl_seconds, config.pool,
+                config.write_flush, config.encoding, config.local_cache,
+            )
         else:
-            return create_async_redis_saver(config.url.get_secret_value(), ttl_seconds)
+            return create_async_redis_saver(
+                config.url.get_secret_value(), ttl_seconds, config.pool,
+                config.write_flush, config.encoding, config.local_cache,
+            )
 
     else:
         raise ValueError(f"Unsupported backend for checkpoint saver: '{config.backend}'")
@@ -50,15 +65,19 @@ def build_chat_history_factory(tenant_id:str, project_code:str, config: BackendC
     ttl_seconds = parse_ttl(config.ttl)
 
     if config.backend == "memory":
-        return create_chat_history_memory_manager(tenant_id, project_code).get_instance
+        return create_chat_history_memory_manager(tenant_id, project_code, ttl_seconds, config.limits).get_instance
 
     elif config.backend == "redis":
-        redis_client = create_redis_instance(config.url.get_secret_value())
+        from .checkpoints.redis_history import PipelinedRedisChatMessageHistory
+
+        redis_client = create_redis_instance(config.url.get_secret_value(), config.pool)
         def _factory(session_id:str):
-            chat_history = RedisChatMessageHistory(
+            chat_history = PipelinedRedisChatMessageHistory(
                 session_id,
                 redis_client=redis_client,
                 key_prefix=f"chat_history:{tenant_id}:{project_code}",
+                # one index per prefix, a shared index only covers the prefix of its creator
+                index_name=f"idx:chat_history:{tenant_id}:{project_code}",
                 ttl=ttl_seconds
             )
             return chat_history
@@ -68,8 +87,92 @@ def build_chat_history_factory(tenant_id:str, project_code:str, config: BackendC
         raise ValueError(f"Unsupported backend for checkpoint saver: '{config.backend}'")
 
 
-def build_document_store(model, tenant_id:str, project_code: str, document_paths: list, config: BackendConfig, logger):
+def _update_in_memory_metadata(vector_store, ids: list, texts: list, metadatas: list):
+    for doc_id, text, metadata in zip(ids, texts, metadatas):
+        record = vector_store.store.get(doc_id)
+        if record is None:
+            vector_store.add_texts([text], [metadata], ids=[doc_id])
+        else:
+            record["metadata"] = metadata
+
+
+def _update_numpy_metadata(vector_store, ids: list, texts: list, metadatas: list):
+    missing = set(vector_store.update_metadata(ids, metadatas))
+    if missing:
+        pending = [(i, t, m) for i, t, m in zip(ids, texts, metadatas) if i in missing]
+        vector_store.add_texts([t for _, t, _ in pending], [m for _, _, m in pending], ids=[i for i, _, _ in pending])
+
+
+def _make_redis_metadata_updater(redis_client):
+    def _update_redis_metadata(vector_store, ids: list, texts: list, metadatas: list):
+        config = vector_store.config
+        if config.storage_type != "hash":
+            vector_store.add_texts(texts, metadatas, ids=ids)
+            return
+
+        reserved = {config.content_field, config.embedding_field}
+        keys = [f"{config.key_prefix}:{doc_id}" for doc_id in ids]
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hkeys(key)
+        existing = pipe.execute()
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key, fields, metadata in zip(keys, existing, metadatas):
+            fields = [f.decode() if isinstance(f, bytes) else f for f in fields]
+            stale = [
+                f for f in fields
+                if not f.startswith("_") and f not in reserved and f not in metadata
+            ]
+            if stale:
+                pipe.hdel(key, *stale)
+
+            # mirror the record layout written by RedisVectorStore.add_texts
+            mapping = {"_metadata_json": json.dumps(metadata)}
+            for name, value in metadata.items():
+                if value is None:
+                    continue
+                if isinstance(value, list):
+                    value = config.default_tag_separator.join(value)
+                mapping[name] = value
+            pipe.hset(key, mapping=mapping)
+        pipe.execute()
+
+    return _update_redis_metadata
+
+
+def _check_redis_vector_attrs(collection: Collection, project_code: str):
+    """Redis indexes vectors with flat or hnsw, IVF is an in-process (numpy) index."""
+    attrs = collection.get_vector_attrs()
+    unsupported = [name for name in ("nlist", "nprobe") if getattr(attrs, name) is not None]
+    if attrs.algorithm == "ivf":
+        unsupported.insert(0, "algorithm 'ivf'")
+    if unsupported:
+        options = ", ".join(unsupported)
+        raise ValueError(
+            f"Collection '{collection.name}' of the project '{project_code}' uses {options}, "
+            f"only supported by the 'numpy' vector_store backend; use algorithm 'flat' or 'hnsw' with 'redis'"
+        )
+
+
+def build_cache(config: CacheConfig) -> Optional[TTLCache]:
+    if not config.enabled:
+        return None
+    return TTLCache(max_size=config.max_size, ttl=parse_ttl(config.ttl))
+
+
+def build_document_store(model, tenant_id:str, project_code: str, document_paths: list, config: BackendConfig, logger,
+                         query_cache: Optional[TTLCache] = None, result_cache: Optional[TTLCache] = None):
+    if config.embedding_cache:
+        # shared per file, so every tenant using the same model reuses the vectors
+        model = CachedEmbeddings(model, create_embedding_cache(config.embedding_cache))
+
+    # always wrapped, so a reloaded project can swap the query cache without rebuilding the store
+    model = QueryCachedEmbeddings(model, query_cache)
+
     if config.backend == "memory":
+        from langchain_core.vectorstores.in_memory import InMemoryVectorStore
 
         def _factory(model, collection: Collection) -> VectorStore:
             return InMemoryVectorStore(model)
@@ -78,14 +181,47 @@ def build_document_store(model, tenant_id:str, project_code: str, document_paths
             model=model,
             document_paths=document_paths,
             vector_store_factory=_factory,
-            logger=logger
+            logger=logger,
+            manifest=IndexManifest(),
+            metadata_updater=_update_in_memory_metadata,
+            result_cache=result_cache,
         )
 
         return store
 
+    if config.backend == "numpy":
+        from .documents.numpy_store import NumpyVectorStore
+
+        def _factory(model, collection: Collection) -> VectorStore:
+            attrs = collection.get_vector_attrs()
+            return NumpyVectorStore(
+                model,
+                distance_metric=attrs.distance_metric,
+                algorithm=attrs.algorithm,
+                nlist=attrs.nlist,
+                nprobe=attrs.nprobe,
+            )
+
+        return DocumentStore(
+            model=model,
+            document_paths=document_paths,
+            vector_store_factory=_factory,
+            logger=logger,
+            manifest=IndexManifest(),
+            metadata_updater=_update_numpy_metadata,
+            result_cache=result_cache,
+        )
+
     if config.backend == "redis":
-        redis_client = create_redis_instance(config.url.get_secret_value())
+        from langchain_redis import RedisConfig
+        from redisvl.schema import IndexSchema
+        from .documents.redis_store import AsyncRedisVectorStore
+
+        redis_client = create_redis_instance(config.url.get_secret_value(), config.pool)
+        async_redis_client = create_async_redis_instance(config.url.get_secret_value(), config.pool)
         def new_redis_vector_store_factory(model, collection: Collection) -> VectorStore:
+            # collections added by a reload of the document files are checked here
+            _check_redis_vector_attrs(collection, project_code)
 
             prefix = f"vector:{tenant_id}:{project_code}:{collection.name}"
             if collection.index:
@@ -94,7 +230,7 @@ def build_document_store(model, tenant_id:str, project_code: str, document_paths
             else:
                 collection.index=IndexSettings(name=collection.name,prefix=prefix)
 
-            if not collection.shema:
+            if not collection.collection_schema:
                 default_schema = {
                     "fields": [
                         {"name": "id", "type": "text"},
@@ -102,7 +238,7 @@ def build_document_store(model, tenant_id:str, project_code: str, document_paths
                         {"name": "content_vector", "type": "vector", "attrs": {"dims": 1536, "algorithm": "flat", "distance_metric": "cosine"}}
                     ]
                 }
-                collection.shema=CollectionIndexSchema.from_dict(default_schema)
+                collection.collection_schema=CollectionIndexSchema.from_dict(default_schema)
 
             schema = IndexSchema.from_dict(collection.to_schema_dict())
 
@@ -114,15 +250,22 @@ def build_document_store(model, tenant_id:str, project_code: str, document_paths
                 embedding_field=collection.get_embedding_field_name("content_vector"),
                 content_field=collection.get_content_field_name("content"),
             )
-            return RedisVectorStore(
+            return AsyncRedisVectorStore(
                 embeddings=model,
-                config=config
+                config=config,
+                async_redis_client=async_redis_client,
             )
 
-        return DocumentStore(
+        store = DocumentStore(
             model=model,
             document_paths=document_paths,
             vector_store_factory=new_redis_vector_store_factory,
-            logger=logger
+            logger=logger,
+            manifest=RedisIndexManifest(redis_client, f"manifest:{tenant_id}:{project_code}"),
+            metadata_updater=_make_redis_metadata_updater(redis_client),
+            result_cache=result_cache,
         )
-    raise ValueError(f"unknown backend type '{backend}' for the vector_store in the project '{project_code}'")
+        for collection in store.collections.values():
+            _check_redis_vector_attrs(collection, project_code)
+        return store
+    raise ValueError(f"unknown backend type '{config.backend}' for the vector_store in the project '{project_code}'")
@@ -1,76 +1,188 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 from functools import lru_cache
-import asyncio
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.checkpoint.redis import RedisSaver, AsyncRedisSaver
-
-from langchain_core.chat_history import InMemoryChatMessageHistory
+from urllib.parse import urlsplit, urlunsplit
 import threading
+import weakref
+from .config import (
+    CheckpointEncodingConfig,
+    LocalCheckpointCacheConfig,
+    MemoryLimitsConfig,
+    RedisPoolConfig,
+    WriteFlushConfig,
+)
+from .documents.embedding_cache import EmbeddingCache
+
+if TYPE_CHECKING:
+    from .checkpoints.memory import BoundedMemorySaver, ChatHistoryMemoryManager
+    from .checkpoints.redis_saver import AsyncPipelinedRedisSaver, PipelinedRedisSaver
 
-class ChatHistoryMemoryManager:
-    def __init__(self):
-        self._memory_lock = threading.Lock()
-        self._memory_buckets = {}
+@lru_cache(maxsize=None)
+def create_chat_history_memory_manager(thread_id: str, project_code: str, ttl: Optional[int] = None,
+                                       limits: Optional[MemoryLimitsConfig] = None) -> "ChatHistoryMemoryManager":
+    from .checkpoints.memory import ChatHistoryMemoryManager
 
-    def get_intance(self, session_id: str) -> InMemoryChatMessageHistory:
-        with self._memory_lock:
-            if session_id not in self._memory_buckets:
-                self._memory_buckets[session_id] = InMemoryChatMessageHistory()
-            return self._memory_buckets[session_id]
+    return ChatHistoryMemoryManager(ttl=ttl, limits=limits)
 
 @lru_cache(maxsize=None)
-def create_chat_history_memory_manager(thread_id: str, project_code: str) -> ChatHistoryMemoryManager:
-    return ChatHistoryMemoryManager()
+def create_embedding_cache(path: str) -> EmbeddingCache:
+    return EmbeddingCache(path)
 
 @lru_cache(maxsize=None)
-def create_memory_saver() -> MemorySaver:
-    return MemorySaver()
+def create_memory_saver(ttl: Optional[int] = None, limits: Optional[MemoryLimitsConfig] = None) -> "BoundedMemorySaver":
+    """Shared by the projects with the same bounds, their thread ids are prefixed by tenant and project."""
+    from .checkpoints.memory import BoundedMemorySaver
+
+    return BoundedMemorySaver(ttl=ttl, limits=limits)
+
+def _saver_ttl(ttl: Optional[int]) -> Dict[str, Any]:
+    # ttl is in seconds (parse_ttl), the redis savers expect minutes
+    return {"default_ttl": ttl / 60 if ttl else None}
 
 @lru_cache(maxsize=None)
-def create_redis_saver(redis_url: str, ttl: Optional[int] = None) -> RedisSaver:
-    redis_client = create_redis_instance(redis_url)
-    saver = RedisSaver(
+def create_redis_saver(redis_url: str, ttl: Optional[int] = None, pool: Optional[RedisPoolConfig] = None,
+                       flush: Optional[WriteFlushConfig] = None,
+                       encoding: Optional[CheckpointEncodingConfig] = None,
+                       local_cache: Optional[LocalCheckpointCacheConfig] = None) -> "PipelinedRedisSaver":
+    from .checkpoints.redis_saver import PipelinedRedisSaver
+
+    redis_client = create_redis_instance(redis_url, pool)
+    saver = PipelinedRedisSaver(
         redis_client=redis_client,
-        ttl={"default_ttl": ttl},
+        ttl=_saver_ttl(ttl),
+        flush=flush,
+        encoding=encoding,
+        local_cache=local_cache,
     )
     saver.setup()
     return saver
 
 @lru_cache(maxsize=None)
-def create_async_redis_saver(redis_url: str, ttl: Optional[int] = None) -> RedisSaver:
-    redis_client = create_async_redis_instance(redis_url)
-    saver = AsyncRedisSaver(
+def create_async_redis_saver(redis_url: str, ttl: Optional[int] = None, pool: Optional[RedisPoolConfig] = None,
+                             flush: Optional[WriteFlushConfig] = None,
+                             encoding: Optional[CheckpointEncodingConfig] = None,
+                             local_cache: Optional[LocalCheckpointCacheConfig] = None) -> "AsyncPipelinedRedisSaver":
+    """The indexes are created by setup_async_redis_saver, awaited by the project before the first request."""
+    from .checkpoints.redis_saver import AsyncPipelinedRedisSaver
+
+    redis_client = create_async_redis_instance(redis_url, pool)
+    return AsyncPipelinedRedisSaver(
         redis_client=redis_client,
-        ttl={"default_ttl": ttl},
+        ttl=_saver_ttl(ttl),
+        flush=flush,
+        encoding=encoding,
+        local_cache=local_cache,
     )
-    asyncio.gather(
-        saver.checkpoints_index.create(overwrite=False),
-        saver.checkpoint_blobs_index.create(overwrite=False),
-        saver.checkpoint_writes_index.create(overwrite=False),
-    )
-    return saver
 
-@lru_cache(maxsize=None)
-def create_redis_instance(url: str, **kwargs: Any) -> "redis.Redis":
+_saver_setup_done: "weakref.WeakSet" = weakref.WeakSet()
+
+async def setup_async_redis_saver(saver: "AsyncPipelinedRedisSaver") -> None:
+    # creating the indexes is idempotent, concurrent first setups are harmless
+    if saver in _saver_setup_done:
+        return
+    await saver.asetup()
+    _saver_setup_done.add(saver)
+
+
+# one client, and so one connection pool, per (url, pool settings) shared by every
+# backend and project pointing at the same Redis
+_redis_clients: Dict[Tuple[str, str, RedisPoolConfig], Any] = {}
+_redis_clients_lock = threading.Lock()
+
+def _redis_client_kwargs(pool: RedisPoolConfig, retry_class, backoff_class, errors: tuple) -> Dict[str, Any]:
+    return {
+        "max_connections": pool.max_connections,
+        "timeout": pool.pool_timeout,
+        "socket_timeout": pool.socket_timeout,
+        "socket_connect_timeout": pool.socket_connect_timeout,
+        "socket_keepalive": pool.socket_keepalive,
+        "health_check_interval": pool.health_check_interval,
+        "retry": retry_class(backoff_class(cap=pool.retry_backoff_cap, base=pool.retry_backoff_base), pool.retry_attempts),
+        "retry_on_error": list(errors),
+    }
+
+def _get_redis_client(kind: str, url: str, pool: Optional[RedisPoolConfig], build):
+    pool = pool or RedisPoolConfig()
+    key = (kind, url, pool)
+    client = _redis_clients.get(key)
+    if client is not None:
+        return client
+    with _redis_clients_lock:
+        client = _redis_clients.get(key)
+        if client is None:
+            client = _redis_clients[key] = build(pool)
+        return client
+
+def create_redis_instance(url: str, pool: Optional[RedisPoolConfig] = None) -> "redis.Redis":
     try:
         import redis
+        from redis.backoff import ExponentialBackoff
+        from redis.retry import Retry
     except ImportError:
         raise ImportError("Missing 'redis' package. Install it with `pip install redis`.")
 
-    try:
-        return redis.Redis.from_url(url, **kwargs)
-    except redis.exceptions.RedisError as error:
-        raise ValueError(f"Redis connection error: {error}")
+    def build(pool: RedisPoolConfig) -> "redis.Redis":
+        kwargs = _redis_client_kwargs(
+            pool, Retry, ExponentialBackoff,
+            (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError),
+        )
+        try:
+            return redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(url, **kwargs))
+        except redis.exceptions.RedisError as error:
+            raise ValueError(f"Redis connection error: {error}")
 
+    return _get_redis_client("sync", url, pool, build)
 
-@lru_cache(maxsize=None)
-def create_async_redis_instance(url: str, **kwargs: Any) -> "redis.asyncio.Redis":
+
+def create_async_redis_instance(url: str, pool: Optional[RedisPoolConfig] = None) -> "redis.asyncio.Redis":
     try:
         import redis.asyncio as async_redis
+        from redis.asyncio.retry import Retry
+        from redis.backoff import ExponentialBackoff
     except ImportError:
         raise ImportError("Missing 'redis[asyncio]' package. Install it with `pip install redis`.")
 
-    try:
-        return async_redis.from_url(url, **kwargs)
-    except async_redis.exceptions.RedisError as error:
-        raise ValueError(f"Async Redis connection error: {error}")
+    def build(pool: RedisPoolConfig) -> "redis.asyncio.Redis":
+        kwargs = _redis_client_kwargs(
+            pool, Retry, ExponentialBackoff,
+            (async_redis.ConnectionError, async_redis.TimeoutError),
+        )
+        try:
+            return async_redis.Redis(connection_pool=async_redis.BlockingConnectionPool.from_url(url, **kwargs))
+        except async_redis.RedisError as error:
+            raise ValueError(f"Async Redis connection error: {error}")
+
+    return _get_redis_client("async", url, pool, build)
+
+
+def _redact(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.password:
+        netloc = parts.netloc.replace(f":{parts.password}@", ":***@")
+        parts = parts._replace(netloc=netloc)
+    return urlunsplit(parts)
+
+def _pool_usage(pool) -> Tuple[int, int]:
+    """Connections (created, in use) of a sync or async connection pool."""
+    if hasattr(pool, "_in_use_connections"):
+        in_use = len(pool._in_use_connections)
+        return in_use + len(pool._available_connections), in_use
+    # sync BlockingConnectionPool: a queue of idle connections and None placeholders
+    created = len(pool._connections)
+    idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    return created, created - idle
+
+def redis_pool_stats() -> List[Dict[str, Any]]:
+    """Utilisation of every Redis connection pool created by the backends."""
+    stats = []
+    for (kind, url, _), client in list(_redis_clients.items()):
+        pool = client.connection_pool
+        created, in_use = _pool_usage(pool)
+        stats.append({
+            "url": _redact(url),
+            "kind": kind,
+            "max_connections": pool.max_connections,
+            "created": created,
+            "in_use": in_use,
+            "utilisation": in_use / pool.max_connections if pool.max_connections else 0.0,
+        })
+    return stats
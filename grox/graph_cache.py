@@ -0,0 +1,62 @@
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+
+def graph_key(model: Any, tools: Sequence[Any], prompt: Optional[str], checkpointer: Any) -> Hashable:
+    """
+    Structural inputs of a ReAct graph. Model clients are shared through the model
+    pool, so identical model configs give the same object; tools and the checkpointer
+    are compared by identity as well. The ids stay valid while the graph is cached,
+    because the graph holds these objects.
+    """
+    return (id(model), tuple(id(tool) for tool in tools), prompt, id(checkpointer))
+
+
+class GraphCache:
+    """
+    Compiled graphs shared by all projects with the same structural inputs.
+    Per-tenant state is isolated by the thread_id of each run, an entry lives
+    as long as some project holds its graph.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._graphs: "weakref.WeakValueDictionary[Hashable, Any]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Any:
+        # compiled under the lock, concurrent projects of one template compile once
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self.hits += 1
+                return graph
+            self.misses += 1
+            graph = builder()
+            self._graphs[key] = graph
+            return graph
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._graphs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._graphs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+graph_cache = GraphCache()
@@ -1,14 +1,68 @@
-from typing import Optional, TypedDict, Callable
+import asyncio
+import contextlib
+import inspect
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Union
+from uuid import UUID
 import structlog
-from colorama import init, Fore, Style
-
-from langgraph.graph import StateGraph, START, END
-from operator import add
+from langchain_core.callbacks import AsyncCallbackHandler
 
+from .config import StreamingConfig
 from .context import GroxExecutionContext
 
 THREAD_ID_SEPARATOR: str = ":"
 
+_DEFAULT_STREAMING = StreamingConfig()
+
+# output produced ahead of the consumer in tokens mode
+_STREAM_BUFFER = 1
+_END = object()
+
+
+def _token_text(content: Union[str, list]) -> str:
+    if isinstance(content, str):
+        return content
+    # content blocks, e.g. [{"type": "text", "text": "..."}]
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+
+class _TokenStream(AsyncCallbackHandler):
+    """
+    Puts the LLM tokens of a graph run on a bounded queue as they are generated,
+    the model waits while the queue is full. Having tap_output_* makes chat models
+    stream (langchain's streaming handler protocol), without buffering the output.
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self._nodes: Dict[UUID, Optional[str]] = {}
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs):
+        self._nodes[run_id] = (metadata or {}).get("langgraph_node")
+
+    async def on_llm_new_token(self, token: str, *, chunk=None, run_id: UUID, **kwargs):
+        message = getattr(chunk, "message", None)
+        text = _token_text(message.content) if message is not None else token
+        if text:
+            await self.queue.put({"token": text, "node": self._nodes.get(run_id)})
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._nodes.pop(run_id, None)
+
+    async def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self._nodes.pop(run_id, None)
+
+    def tap_output_aiter(self, run_id: UUID, output: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        return output
+
+    def tap_output_iter(self, run_id: UUID, output: Iterator[Any]) -> Iterator[Any]:
+        return output
+
+
 class Grox:
     """
     Per-request action class holding the active flows and executions
@@ -24,23 +78,113 @@ class Grox:
     def _make_thread_id(self, session_id: str) -> str:
         return f"{self.context.tenant_id}{THREAD_ID_SEPARATOR}{self.context.project_code}{THREAD_ID_SEPARATOR}{session_id}"
 
-    async def handle_event(self, data: dict, output_stream: Callable):
-        # Invoke the graph with a thread_id
+    def _streaming(self) -> StreamingConfig:
+        orchestration = self.context.config.orchestration
+        return orchestration.streaming if orchestration is not None else _DEFAULT_STREAMING
+
+    async def stream_event(self, data: dict, mode: Optional[str] = None) -> AsyncIterator[dict]:
+        """
+        Run the graph on an event and yield its output as it is produced.
+
+        A slow consumer slows the run down instead of piling up output (backpressure):
+        in tokens mode the model waits for every token to be taken, the node updates
+        of both modes are produced one superstep ahead at most.
+
+        mode - "updates" yields {node: update} once a node finished, "tokens" also
+        {"token": text, "node": node} for every LLM token as it is generated;
+        defaults to orchestration.streaming.mode of the project
+        """
         self.logger.info("event_received", data=data)
         prompt = data.get("prompt")
         if not prompt:
             raise ValueError("empty prompt")
+        streaming = self._streaming()
+        mode = mode or streaming.mode
+        if mode not in ("updates", "tokens"):
+            raise ValueError(f"Unsupported streaming mode: '{mode}'")
+
         inputs = {"messages": [{"role": "user", "content": prompt}]}
-        config = {"configurable": {"thread_id": self._make_thread_id(data["session_id"])}}
+        config = self.context.graph_config(self._make_thread_id(data["session_id"]))
+        await self.context.wait_ready()
 
-        async for chunk in self.context.graph.astream(inputs, config=config, stream_mode="updates"):
-            self.print("chunk", chunk)
-            output_stream(chunk)
-        #result = await self.context.graph.ainvoke({"foo": ""}, config)
-        #await self._process(result)
+        debug = streaming.debug
+        started = time.perf_counter()
+        first_output = None
+        try:
+            if mode == "tokens":
+                async for chunk in self._stream_tokens(inputs, config):
+                    if first_output is None:
+                        first_output = time.perf_counter()
+                    if debug:
+                        self.print("token" if "token" in chunk else "chunk", chunk)
+                    yield chunk
+            else:
+                async for chunk in self.context.graph.astream(inputs, config=config, stream_mode="updates"):
+                    if first_output is None:
+                        first_output = time.perf_counter()
+                    if debug:
+                        self.print("chunk", chunk)
+                    yield chunk
+        finally:
+            await self.context.flush_checkpoints()
+            self.logger.info(
+                "event_streamed",
+                mode=mode,
+                first_output_ms=round((first_output - started) * 1000, 1) if first_output is not None else None,
+                total_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+
+    async def _stream_tokens(self, inputs: dict, config: dict) -> AsyncIterator[dict]:
+        """
+        The LLM tokens and node updates of a run through one bounded queue. langgraph's
+        messages stream mode is not used, it buffers the tokens without a limit.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_BUFFER)
+        config = {**config, "callbacks": [*(config.get("callbacks") or []), _TokenStream(queue)]}
+
+        async def run():
+            try:
+                async for update in self.context.graph.astream(inputs, config=config, stream_mode="updates"):
+                    await queue.put(update)
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(_END)
+
+        producer = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # the consumer stopped early, stop the run
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+
+    async def handle_event(
+        self,
+        data: dict,
+        output_stream: Callable[[dict], Optional[Awaitable[None]]],
+        mode: Optional[str] = None,
+    ):
+        """
+        Run the graph on an event and pass its output to output_stream (see stream_event).
+        An async output_stream is awaited before the graph continues.
+        """
+        async for chunk in self.stream_event(data, mode):
+            result = output_stream(chunk)
+            if inspect.isawaitable(result):
+                await result
 
     @staticmethod
     def print(*args, sep=" ", end="\n"):
+        from colorama import Fore, Style
+
         message = sep.join(str(arg) for arg in args)
         colored_message = f"{Fore.YELLOW}{message}{Style.RESET_ALL}"
         print(colored_message, end=end)
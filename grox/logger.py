@@ -2,9 +2,6 @@ import logging
 import sys
 import structlog
 from typing import Callable, Optional
-from colorama import init, Fore, Style
-
-init(autoreset=True)
 
 # This will hold the callback if registered
 _log_callback_handler: Optional[Callable[[dict], None]] = None
@@ -39,11 +36,14 @@ def setup_logging(log_level: str, log_format: str):
         format="%(message)s",  # Let structlog handle rendering
     )
 
-    log_renderer = (
-        structlog.dev.ConsoleRenderer(colors=True)
-        if log_format == "console"
-        else structlog.processors.JSONRenderer()
-    )
+    if log_format == "console":
+        # only the console format is colored, JSON logging never loads colorama
+        from colorama import init
+
+        init(autoreset=True)
+        log_renderer = structlog.dev.ConsoleRenderer(colors=True)
+    else:
+        log_renderer = structlog.processors.JSONRenderer()
 
     structlog.configure(
         processors=[
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import SecretStr
+
+
+def model_config_key(kind: str, config: Any, **options: Any) -> str:
+    """
+    Canonical hash of a model config, secrets included, so that identical configs
+    of different tenants map to one client. The config name is only a label and
+    is left out; build options (temperature, streaming, ...) are part of the key.
+    """
+    data = config.model_dump(exclude={"name"}) if hasattr(config, "model_dump") else dict(config)
+
+    def _default(value):
+        if isinstance(value, SecretStr):
+            return value.get_secret_value()
+        return repr(value)
+
+    payload = json.dumps(
+        {"kind": kind, "type": type(config).__name__, "config": data, "options": options},
+        sort_keys=True,
+        default=_default,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ModelPool:
+    """
+    Process-wide, reference-counted pool of chat model and embedding clients.
+
+    Every holder acquires a client and releases it when done; the pool drops
+    its reference once the count reaches zero, the client itself lives on
+    while someone still uses it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Any]] = {}  # key -> [future of the client, refs]
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, key: str, builder: Callable[[], Any]) -> Any:
+        # the client is built outside of the lock, concurrent first uses of the same
+        # key wait for that build, clients of other keys are built meanwhile
+        with self._lock:
+            entry = self._entries.get(key)
+            building = entry is None
+            if building:
+                self.misses += 1
+                entry = self._entries[key] = [Future(), 0]
+            else:
+                self.hits += 1
+            entry[1] += 1
+        future = entry[0]
+        if building:
+            try:
+                future.set_result(builder())
+            except BaseException as e:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                future.set_exception(e)
+                raise
+        return future.result()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[key]
+
+    def release_all(self, keys: List[str]) -> None:
+        for key in keys:
+            self.release(key)
+        keys.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "references": sum(refs for _, refs in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+model_pool = ModelPool()
+
+
+class PooledModelManager:
+    """
+    Drop-in for langfabric's ModelManager whose chat models and embeddings come from
+    the shared ModelPool. Its references are released by close() or when the manager
+    is garbage collected. langfabric is imported on the first client build.
+    """
+
+    def __init__(self, model_configs: Dict[str, Any], pool: Optional[ModelPool] = None):
+        self.model_configs = model_configs
+        self._cache: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        self.pool = pool if pool is not None else model_pool
+        self._keys: List[str] = []
+        self._finalizer = weakref.finalize(self, self.pool.release_all, self._keys)
+
+    def _acquire(self, cache_key: tuple, kind: str, config: Any, builder: Callable[[], Any], options: dict) -> Any:
+        with self._lock:
+            if cache_key in self._cache:
+                return self._cache[cache_key]
+
+        key = model_config_key(kind, config, **options)
+        client = self.pool.acquire(key, builder)
+        with self._lock:
+            if cache_key in self._cache:
+                # another thread of this manager got there first
+                self.pool.release(key)
+                return self._cache[cache_key]
+            self._cache[cache_key] = client
+            self._keys.append(key)
+        return client
+
+    def load(self, model_name: str, *,
+            temperature: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+            max_retries: Optional[int] = None,
+            json_response: bool = False,
+            streaming: Optional[bool] = None) -> Any:
+        config = self.model_configs.get(model_name)
+        if not config:
+            raise ValueError(f"Model config '{model_name}' not found")
+
+        options = {
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "max_retries": max_retries,
+            "json_response": json_response,
+            "streaming": streaming,
+        }
+        def build():
+            from langfabric import build_model
+            return build_model(config, **options)
+
+        return self._acquire((model_name, *options.values()), "chat", config, build, options)
+
+    def load_embeddings(self, model_name: str) -> Any:
+        config = self.model_configs.get(model_name)
+        if not config:
+            raise ValueError(f"Model config '{model_name}' not found")
+        def build():
+            from langfabric import build_embeddings
+            return build_embeddings(config)
+
+        return self._acquire(("embeddings", model_name), "embeddings", config, build, {})
+
+    def contains(self, model_name: str) -> bool:
+        return model_name in self.model_configs
+
+    def __contains__(self, model_name: str) -> bool:
+        return self.contains(model_name)
+
+    def active(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def close(self) -> None:
+        """Release the pooled clients of this manager."""
+        self._finalizer()
+        with self._lock:
+            self._cache.clear()
@@ -1,53 +1,182 @@
-from typing import Dict, Any
-from types import SimpleNamespace
-from langfabric import ModelManager, build_embeddings
-from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import create_react_agent
-from operator import add
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Set
 import structlog
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from langchain.tools import Tool
+import concurrent.futures
+import time
 
-from .config import GroxAppConfig, GroxProjectConfig, DefaultsConfig
-from .factory import build_checkpoint_saver, build_chat_history_factory, build_document_store
-from .state import GroxState
+from .config import BackendConfig, CacheConfig, GroxAppConfig, GroxProjectConfig, DefaultsConfig
+from .factory import build_checkpoint_saver, build_chat_history_factory, build_document_store, build_cache
+from .factory_cache import setup_async_redis_saver
+from .documents.indexer import IndexingPipeline
+from .model_pool import PooledModelManager
+from .graph_cache import graph_cache, graph_key
+from .documents.store import document_search_tool
 
+AGENT_PROMPT = "You are a helpful assistant"
+
+
+def check_weather(location: str) -> str:
+    '''Return the weather forecast for the specified location.'''
+
+    return f"It's always sunny in {location}"
+
+
+
+# parts of the orchestration config rebuilding different things on reload
+_ORCHESTRATION_SECTIONS = {
+    "documents": ("documents", "document_configs"),
+    "caches": ("query_embedding_cache", "search_result_cache"),
+    "indexing": ("indexing",),
+    "streaming": ("streaming",),
+}
+
+
+def config_changes(old: GroxProjectConfig, new: GroxProjectConfig) -> Set[str]:
+    """
+    Config sections that differ between two configs of a project: metadata,
+    documents, caches, indexing, streaming (parts of orchestration), models and
+    the names of changed backends. A metadata change counts as a change of
+    every backend, they are scoped by the project (e.g. Redis key prefixes).
+    """
+    changes = set()
+    if old.metadata != new.metadata:
+        changes.add("metadata")
+    for section, fields in _ORCHESTRATION_SECTIONS.items():
+        if any(getattr(old.orchestration, field, None) != getattr(new.orchestration, field, None) for field in fields):
+            changes.add(section)
+
+    old_infra = old.infrastructure
+    new_infra = new.infrastructure
+    if (old_infra and old_infra.model_configs, old_infra and old_infra.defaults) != \
+            (new_infra and new_infra.model_configs, new_infra and new_infra.defaults):
+        changes.add("models")
+
+    old_backends = (old_infra and old_infra.backend_configs) or {}
+    new_backends = (new_infra and new_infra.backend_configs) or {}
+    for name in set(old_backends) | set(new_backends):
+        if "metadata" in changes or old_backends.get(name) != new_backends.get(name):
+            changes.add(name)
+    return changes
+
+
+def search_result_cache_config(config: GroxProjectConfig, vector_store: BackendConfig) -> CacheConfig:
+    """
+    The configured search_result_cache, by default on only for the in-process vector
+    backends: the collection versions invalidating it are not shared between workers.
+    """
+    configured = config.orchestration and config.orchestration.search_result_cache
+    if configured is not None:
+        return configured
+    if vector_store.backend in ("memory", "numpy"):
+        return CacheConfig(max_size=256, ttl="5m")
+    return CacheConfig(enabled=False)
+
+
+_MODEL_ATTRS = ("model_manager", "defaults", "chat_model", "chat_model_with_tools", "embedding_model")
 
 
 class GroxProject:
 
-    def __init__(self, app: GroxAppConfig, tenant_id:str, config: GroxProjectConfig, extra_tools=None):
+    def __init__(self, app: GroxAppConfig, tenant_id:str, config: GroxProjectConfig, extra_tools=None, loop=None,
+                 previous: Optional["GroxProject"] = None):
+        """
+        loop - event loop for background tasks when the project is built outside of it
+               (worker thread), by default tasks go to the running loop
+        previous - project built from an older config of the same project (hot reload),
+                   parts whose config did not change are taken over instead of rebuilt
+        """
         self.app = app
+        self._loop = loop
         self.debug = app.log_level == "DEBUG"
         self.tenant_id = tenant_id
         self.config = config
         self.project_code = config.metadata.project
+        self._extra_tools = extra_tools if extra_tools is not None else getattr(previous, "_extra_tools", None)
+        self._previous = previous
+        self.reload_changes = config_changes(previous.config, config) if previous is not None else None
+        # seconds spent per startup phase, reported by `grox profile-startup`
+        self.startup_timings: Dict[str, float] = {}
 
         self._initialize_logger()
-        self._initialize_models()
-        self._initialize_backends()
+        with self._phase("model_init"):
+            if self._reusable("models"):
+                self._reuse(_MODEL_ATTRS)
+            else:
+                self._initialize_models()
+        with self._phase("backend_init"):
+            self._initialize_backends()
         #self._initialize_workflow()
+        with self._phase("graph_compile"):
+            self._initialize_graph()
+        # the old project must not be kept alive by the new one
+        self._previous = None
+
+    @contextmanager
+    def _phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[name] = time.perf_counter() - started
+
+    def _reusable(self, *sections: str) -> bool:
+        """True when reloading and none of the config sections changed."""
+        return self._previous is not None and not (set(sections) & self.reload_changes)
+
+    def _reuse(self, attrs):
+        for attr in attrs:
+            if hasattr(self._previous, attr):
+                setattr(self, attr, getattr(self._previous, attr))
+
+    def _initialize_graph(self):
+        if self._reusable("models", "vector_store", "documents", "checkpoint_saver"):
+            self._reuse(("graph",))
+            return
 
         if hasattr(self, 'chat_model_with_tools'):
-
-            tools=[self.check_weather]
+            # project-independent tools only, the document store is passed per run (graph_config)
+            tools=[check_weather]
             if hasattr(self, 'document_store'):
-                tools.append(self.document_store.tool)
-
-            if extra_tools:
-                tools.extend(extra_tools)
-
-            self.graph = create_react_agent(
-                self.chat_model_with_tools,
-                tools=tools,
-                prompt="You are a helpful assistant",
+                tools.append(document_search_tool)
+
+            if self._extra_tools:
+                tools.extend(self._extra_tools)
+
+            checkpointer = getattr(self, 'graph_checkpoint_saver', None)
+            # with a checkpointer every run needs the thread_id of graph_config()
+            agent_options = {"checkpointer": checkpointer} if checkpointer is not None else {}
+            from langchain_core.runnables import RunnableBinding
+            from langgraph.prebuilt import create_react_agent
+
+            # projects with the same model, tools and checkpointer share one compiled graph
+            graph = graph_cache.get_or_build(
+                graph_key(self.chat_model_with_tools, tools, AGENT_PROMPT, checkpointer),
+                lambda: create_react_agent(
+                    self.chat_model_with_tools,
+                    tools=tools,
+                    prompt=AGENT_PROMPT,
+                    **agent_options,
+                ),
             )
+            if hasattr(self, 'document_store'):
+                # runs with a plain {"configurable": {"thread_id": ...}} still search this project's
+                # documents, the binding merges the store into the config of every graph method
+                # (the graph's own with_config would be replaced by the configurable of a run)
+                graph = RunnableBinding(bound=graph, config={"configurable": {"document_store": self.document_store}})
+            self.graph = graph
+
+    def graph_config(self, thread_id: str) -> Dict[str, Any]:
+        """Run config of the project graph, carries the per-project state of the shared graph."""
+        configurable = {"thread_id": thread_id}
+        if hasattr(self, 'document_store'):
+            configurable["document_store"] = self.document_store
+        return {"configurable": configurable}
 
     def check_weather(self, location: str) -> str:
         '''Return the weather forecast for the specified location.'''
 
-        return f"It's always sunny in {location}"
+        return check_weather(location)
 
     def _initialize_logger(self):
         logger_metadata = {
@@ -69,25 +198,25 @@ class GroxProject:
 
         infra = self.config.infrastructure
         if not infra:
-            self.model_manager = ModelManager({})
+            self.model_manager = PooledModelManager({})
             self.defaults = DefaultsConfig()
             return
 
-        self.model_manager = ModelManager(infra.model_configs)
+        # identical model configs of all projects share their clients
+        self.model_manager = PooledModelManager(infra.model_configs or {})
         self.defaults = infra.defaults or DefaultsConfig()
 
         #
         # chat_model
         #
-        if self.defaults.chat_model and self.defaults.chat_model not in infra.model_configs:
+        if self.defaults.chat_model and self.defaults.chat_model not in (infra.model_configs or {}):
             raise ValueError(
                 f"Chat model '{self.defaults.chat_model}' not found in model config for "
                 f"{self.tenant_id}:{self.project_code}"
             )
 
-        self.chat_model = self.model_manager.load(self.defaults.chat_model)
-
         if self.defaults.chat_model:
+            self.chat_model = self.model_manager.load(self.defaults.chat_model)
             if self.debug:
                 self.logger.info("using chat model", model=self.defaults.chat_model)
         else:
@@ -96,15 +225,14 @@ class GroxProject:
         #
         # chat_model_with_tools
         #
-        if self.defaults.chat_model_with_tools and self.defaults.chat_model_with_tools not in infra.model_configs:
+        if self.defaults.chat_model_with_tools and self.defaults.chat_model_with_tools not in (infra.model_configs or {}):
             raise ValueError(
                 f"Chat model with tools '{self.defaults.chat_model_with_tools}' not found in model config for "
                 f"{self.tenant_id}:{self.project_code}"
             )
 
-        self.chat_model_with_tools = self.model_manager.load(self.defaults.chat_model_with_tools)
-
         if self.defaults.chat_model_with_tools:
+            self.chat_model_with_tools = self.model_manager.load(self.defaults.chat_model_with_tools)
             if self.debug:
                 self.logger.info("using chat model with tools", model=self.defaults.chat_model_with_tools)
         else:
@@ -113,7 +241,7 @@ class GroxProject:
         #
         # embedding_model
         #
-        if self.defaults.embedding_model and self.defaults.embedding_model not in infra.model_configs:
+        if self.defaults.embedding_model and self.defaults.embedding_model not in (infra.model_configs or {}):
             raise ValueError(
                 f"Embedding model '{self.defaults.embedding_model}' not found in model config for "
                 f"{self.tenant_id}:{self.project_code}"
@@ -136,7 +264,7 @@ class GroxProject:
                 f"{self.tenant_id}:{self.project_code}"
             )
 
-        self.embedding_model = build_embeddings(model_config)
+        self.embedding_model = self.model_manager.load_embeddings(self.defaults.embedding_model)
 
     def _initialize_backends(self):
         self.logger.debug("_initialize_backends")
@@ -148,17 +276,34 @@ class GroxProject:
         backend_configs = infra.backend_configs or {}
 
         checkpoint_cfg = backend_configs.get("checkpoint_saver")
-        if checkpoint_cfg:
+        if checkpoint_cfg and self._reusable("checkpoint_saver"):
+            self._reuse(("checkpoint_saver", "graph_checkpoint_saver"))
+        elif checkpoint_cfg:
             self.checkpoint_saver = build_checkpoint_saver(checkpoint_cfg)
+            self.graph_checkpoint_saver = self.checkpoint_saver
+            if checkpoint_cfg.backend == "redis":
+                if checkpoint_cfg.sync:
+                    # the graph runs with astream, a sync-only saver would fail every request
+                    self.graph_checkpoint_saver = build_checkpoint_saver(checkpoint_cfg.model_copy(update={"sync": False}))
+                # the async saver creates its indexes on the loop, awaited by wait_ready()
+                self._backend_setup_task = self._setup_backends()
 
         chat_history_cfg = backend_configs.get("chat_history")
-        if chat_history_cfg:
+        if chat_history_cfg and self._reusable("chat_history"):
+            self._reuse(("chat_history_factory",))
+        elif chat_history_cfg:
             self.chat_history_factory = build_chat_history_factory(
                 self.tenant_id, self.project_code, chat_history_cfg
             )
 
         vector_store_cfg = backend_configs.get("vector_store")
-        if vector_store_cfg:
+        if vector_store_cfg and self._reusable("models", "vector_store", "documents"):
+            # same store and collections, only the contents of the document files may differ
+            self._reuse(("document_store", "_query_embedding_cache", "_search_result_cache"))
+            if "caches" in self.reload_changes:
+                self._replace_caches()
+            self._indexing_task = self._create_task(self.index_all_collections(incremental=True))
+        elif vector_store_cfg:
 
             if not hasattr(self, 'embedding_model'):
                 raise ValueError(
@@ -172,33 +317,162 @@ class GroxProject:
                     f"{self.tenant_id}:{self.project_code}"
                 )
 
+            # query embeddings are shared by all the collections of the project
+            self._query_embedding_cache = build_cache(self.config.orchestration.query_embedding_cache)
+            self._search_result_cache = build_cache(search_result_cache_config(self.config, vector_store_cfg))
+
             self.document_store = build_document_store(
-                self.embedding_model, self.tenant_id, self.project_code, self.config.orchestration.documents, vector_store_cfg, self.logger
+                self.embedding_model, self.tenant_id, self.project_code, self.config.orchestration.documents, vector_store_cfg, self.logger,
+                query_cache=self._query_embedding_cache,
+                result_cache=self._search_result_cache,
             )
 
-            if vector_store_cfg.backend == "memory":
-                asyncio.create_task(self.index_all_collections())
+            if vector_store_cfg.backend in ("memory", "numpy"):
+                self._indexing_task = self._create_task(self.index_all_collections())
+
+    def _replace_caches(self):
+        """Swap new query and search result caches into the reused document store, its vectors stay."""
+        orchestration = self.config.orchestration
+        self._query_embedding_cache = build_cache(orchestration.query_embedding_cache)
+        self._search_result_cache = build_cache(
+            search_result_cache_config(self.config, self.config.infrastructure.backend_configs["vector_store"])
+        )
+        self.document_store.model.cache = self._query_embedding_cache
+        self.document_store.result_cache = self._search_result_cache
+
+    def _setup_backends(self):
+        return self._create_task(setup_async_redis_saver(self.graph_checkpoint_saver))
+
+    def _create_task(self, coro):
+        """
+        Schedule a background coroutine on the project loop or the running one.
+        Built without any loop, the coroutine is deferred to the first wait_ready().
+        """
+        if self._loop is not None:
+            return asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            return coro
+
+    def _start_deferred_tasks(self):
+        for name in ("_backend_setup_task", "_indexing_task"):
+            task = getattr(self, name, None)
+            if asyncio.iscoroutine(task):
+                setattr(self, name, asyncio.get_running_loop().create_task(task))
+
+    async def wait_ready(self):
+        """
+        Wait for the asynchronous backend setup, e.g. the Redis checkpoint indexes.
+        Starts the background tasks of a project built without an event loop.
+        A failed setup raises once and is retried by the next call.
+        """
+        if getattr(self, "_backend_setup_failed", False):
+            self._backend_setup_failed = False
+            self._backend_setup_task = self._setup_backends()
+        self._start_deferred_tasks()
+        task = getattr(self, "_backend_setup_task", None)
+        if task is None:
+            return
+        try:
+            if isinstance(task, concurrent.futures.Future):
+                # scheduled on another loop by run_coroutine_threadsafe
+                await asyncio.wrap_future(task)
+            else:
+                await task
+        except Exception:
+            if self._backend_setup_task is task:
+                self._backend_setup_task = None
+                self._backend_setup_failed = True
+            raise
+        if self._backend_setup_task is task:
+            self._backend_setup_task = None
+
+    async def flush_checkpoints(self):
+        """Send the checkpoint writes buffered under the step flush policy."""
+        saver = getattr(self, "graph_checkpoint_saver", None)
+        if hasattr(saver, "aflush"):
+            await saver.aflush()
+        elif hasattr(saver, "flush"):
+            await asyncio.to_thread(saver.flush)
+
+    def cancel_tasks(self):
+        """
+        Cancel the background indexing and backend setup, e.g. when the project is evicted.
+        Everything else is left to garbage collection: running requests, reloaded
+        projects and other projects may still use the stores, caches and clients.
+        """
+        for name in ("_indexing_task", "_backend_setup_task"):
+            task = getattr(self, name, None)
+            if asyncio.iscoroutine(task):
+                # deferred, never started
+                task.close()
+            elif task is not None and not task.done():
+                task.cancel()
+
+    def close(self):
+        """
+        Release what the project holds in memory at shutdown. Only for a project nothing
+        uses anymore, the document store and caches may be shared with a reloaded project
+        (see cancel_tasks for eviction). Redis clients and savers are shared between
+        projects (factory_cache) and stay open.
+        """
+        self.cancel_tasks()
+        if hasattr(self, "document_store"):
+            self.document_store.close()
+        if getattr(self, "_query_embedding_cache", None) is not None:
+            self._query_embedding_cache.clear()
+        if hasattr(self, "model_manager"):
+            self.model_manager.close()
+        self.logger.info("Project closed")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the project caches."""
+        stats = {}
+        if getattr(self, "_query_embedding_cache", None) is not None:
+            stats["query_embedding_cache"] = self._query_embedding_cache.stats()
+        if getattr(self, "_search_result_cache", None) is not None:
+            stats["search_result_cache"] = self._search_result_cache.stats()
+        saver = getattr(self, "graph_checkpoint_saver", None)
+        if hasattr(saver, "cache_stats"):
+            stats["checkpoint_cache"] = saver.cache_stats()
+        return stats
+
+    def _index_documents(self, collection_name:str, incremental: bool = False):
+        if incremental:
+            summary = self.document_store.reindex_documents(collection_name)
+            self.logger.info("Reindexed documents", **summary.model_dump())
+            return
 
-    def _index_documents(self, collection_name:str):
         total = self.document_store.index_documents(collection_name)
         self.logger.info("Indexed documents", collection_name=collection_name, total=total)
 
 
-    async def index_all_collections(self):
-        self.logger.info("Indexing all documents")
+    async def index_all_collections(self, incremental: bool = False):
+        """
+        incremental - reload the document files and apply only the changes
+                      recorded against the index manifest
+        """
+        self.logger.info("Indexing all documents", incremental=incremental)
 
         if not hasattr(self, 'document_store'):
             self.logger.error("Document store not initialized.")
             return
 
-        executor = ThreadPoolExecutor()  # optionally: limit max_workers
-        loop = asyncio.get_running_loop()
-
-        tasks = []
-        for collection_name in self.document_store.list_collections():
-            self.logger.info("Indexing collection", collection_name=collection_name)
-            task = loop.run_in_executor(executor, self._index_documents, collection_name)
-            tasks.append(task)
+        if incremental:
+            self.document_store.reload_collections()
+            removed = await asyncio.to_thread(self.document_store.drop_removed_collections)
+            if removed:
+                self.logger.info("Dropped removed collections", collections=removed)
+            for collection_name in self.document_store.list_collections():
+                await asyncio.to_thread(self._index_documents, collection_name, True)
+            return
 
-        await asyncio.gather(*tasks)
+        with self._phase("indexing"):
+            await self.create_indexing_pipeline().run([self.document_store])
         self.logger.info("All in-memory indexes initialized.")
+
+    def create_indexing_pipeline(self, progress=None) -> IndexingPipeline:
+        orchestration = self.config.orchestration
+        indexing = (orchestration and orchestration.indexing) or self.app.indexing
+        return IndexingPipeline.from_config(indexing, progress=progress, logger=self.logger)
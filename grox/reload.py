@@ -0,0 +1,130 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import structlog
+
+from .config import GroxProjectConfig
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ProjectSource:
+    """
+    Where a registered project was loaded from, with the modification times of
+    its grox.yaml and every document/model/backend file it references.
+    """
+
+    def __init__(self, tenant_id: str, path: str, secrets: dict = None, loop=None) -> None:
+        self.tenant_id = tenant_id
+        self.path = str(Path(path).resolve())
+        self.secrets = secrets
+        self.loop = loop
+        self.mtimes: Dict[str, Optional[int]] = {}
+
+    def snapshot(self, config: GroxProjectConfig) -> None:
+        self.mtimes = {path: _mtime(path) for path in [self.path, *config.source_files()]}
+
+    def refresh(self) -> None:
+        """Accept the current state of the known files without a new config, e.g. after a failed reload."""
+        self.mtimes = {path: _mtime(path) for path in self.mtimes}
+
+    def files(self) -> List[str]:
+        return list(self.mtimes)
+
+    def changed(self) -> bool:
+        return any(_mtime(path) != mtime for path, mtime in self.mtimes.items())
+
+
+class ProjectWatcher:
+    """
+    Background thread reloading the projects of a GroxContext whose files changed.
+
+    Uses file system events from `watchfiles` when it is installed
+    (pip install grox[watch]) and falls back to polling modification times.
+    Either way the reload itself is GroxContext.reload_changed_projects.
+    """
+
+    def __init__(self, context, interval: float = 2.0, use_events: Optional[bool] = None) -> None:
+        """
+        context - GroxContext with projects registered by register_all_projects
+        interval - polling period in seconds, also the event timeout
+        use_events - force (True) or disable (False) watchfiles, None - use it when installed
+        """
+        self.context = context
+        self.interval = interval
+        self.use_events = use_events
+        self.logger = structlog.get_logger().bind(component="project_watcher")
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ProjectWatcher":
+        if self._thread is not None:
+            return self
+        run = self._run_polling
+        if self.use_events is not False:
+            try:
+                import watchfiles  # noqa: F401
+                run = self._run_events
+            except ImportError:
+                if self.use_events:
+                    raise ImportError("Missing 'watchfiles' package. Install it with `pip install watchfiles`.")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="grox-project-watcher", daemon=True)
+        self._thread.start()
+        self.logger.info("Project watcher started", mode="events" if run == self._run_events else "polling")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "ProjectWatcher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _reload(self) -> None:
+        try:
+            self.context.reload_changed_projects()
+        except Exception as e:
+            self.logger.error(f"Project reload failed {e}")
+
+    def _run_polling(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._reload()
+
+    def _run_events(self) -> None:
+        import watchfiles
+
+        while not self._stop.is_set():
+            # watch directories, editors often replace files instead of writing them in place
+            directories = sorted({str(Path(path).parent) for path in self.context.watched_files()})
+            directories = [directory for directory in directories if os.path.isdir(directory)]
+            if not directories:
+                if self._stop.wait(self.interval):
+                    return
+                continue
+
+            for _ in watchfiles.watch(
+                *directories,
+                stop_event=self._stop,
+                yield_on_timeout=True,
+                rust_timeout=int(self.interval * 1000),
+            ):
+                self._reload()
+                # a reload can reference new files, start over with the new directories
+                current = sorted({str(Path(path).parent) for path in self.context.watched_files()})
+                if [d for d in current if os.path.isdir(d)] != directories:
+                    break
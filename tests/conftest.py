@@ -0,0 +1,11 @@
+import pytest
+
+from grox.context import GroxContext
+
+
+@pytest.fixture
+def fresh_context(monkeypatch):
+    """A new GroxContext singleton for the test, the previous one is restored afterwards."""
+    monkeypatch.setattr(GroxContext, "_instance", None)
+    yield
+    GroxContext._instance = None
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import BackendConfig
+from grox.factory import build_document_store
+
+
+class FillerBiasedEmbeddings(Embeddings):
+    """Dense search always prefers the filler documents."""
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] if "filler" in text else [0.0, 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.1]
+
+
+def test_async_tool_matches_sync_results(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    texts = [f"filler document number {i}" for i in range(30)] + ["xylophone repair"]
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": texts, "metadata": {}}]},
+    ]}))
+
+    store = build_document_store(
+        FillerBiasedEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+    )
+    store.index_documents("faq")
+
+    for search_type in ("similarity_search_with_score", "similarity_search_with_score_bm25_ranked", "hybrid_rrf"):
+        args = {"query": "xylophone", "collection_name": "faq", "num_results": 3,
+                "search_type": search_type, "score_threshold": 0.0}
+        expected = store.tool.invoke(args)
+        assert asyncio.run(store.tool.ainvoke(args)) == expected
+
+
+def test_async_search_builds_the_bm25_index_off_the_event_loop(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["filler document", "xylophone repair"], "metadata": {}}]},
+    ]}))
+
+    store = build_document_store(
+        FillerBiasedEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+    )
+    store.index_documents("faq")
+    threads = []
+    get_bm25_index = store.get_bm25_index
+
+    def recording_get_bm25_index(collection):
+        threads.append(threading.current_thread())
+        return get_bm25_index(collection)
+
+    store.get_bm25_index = recording_get_bm25_index
+    args = {"query": "xylophone", "collection_name": "faq", "num_results": 1, "search_type": "hybrid_rrf"}
+    asyncio.run(store.tool.ainvoke(args))
+    asyncio.run(store.tool.ainvoke(args))
+
+    # built once in a worker thread, the second search finds it ready
+    assert len(threads) == 2 and threads[0] is not threading.main_thread()
+    assert threads[1] is threading.main_thread()
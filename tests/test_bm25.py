@@ -0,0 +1,66 @@
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import BackendConfig
+from grox.factory import build_document_store
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def test_bm25_rerank_uses_collection_wide_index(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": [
+            "rain and umbrella advice",
+            "sunny weather forecast",
+            "weather weather weather",
+            "umbrella shop opening hours",
+            "temperature right now",
+            "is it cold outside",
+        ], "metadata": {}}]},
+    ]}))
+
+    store = build_document_store(
+        LengthEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+    )
+    store.index_documents("faq")
+    retriever = store.get_retriever("faq")
+    assert len(retriever.bm25_index) == 6
+
+    ranked = retriever.get_relevant_documents(
+        "umbrella", search_type="similarity_search_with_score_bm25_ranked",
+        num_results=6, score_threshold=None,
+    )
+    assert [doc.page_content for doc in ranked[:2]] == [
+        "rain and umbrella advice", "umbrella shop opening hours",
+    ]
+
+
+def test_bm25_index_is_built_by_the_first_search_that_needs_it(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["rain and umbrella advice", "sunny weather forecast"], "metadata": {}}]},
+    ]}))
+
+    store = build_document_store(
+        LengthEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+    )
+    store.index_documents("faq")
+    assert store._bm25_indexes == {}
+
+    assert store.get_retriever("faq", "similarity_search_with_score").bm25_index is None
+    assert store._bm25_indexes == {}
+    assert len(store.get_retriever("faq", "hybrid_rrf").bm25_index) == 2
+
+    # a full reindex drops the index, the next BM25 search rebuilds it
+    store.index_documents("faq")
+    assert store._bm25_indexes == {}
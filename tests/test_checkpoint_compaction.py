@@ -0,0 +1,189 @@
+import fnmatch
+import json
+
+import pytest
+import redis
+from click.testing import CliRunner
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import CheckpointTuple, empty_checkpoint
+
+from grox.checkpoints.compaction import compact_checkpoints, thread_prefix
+from grox.checkpoints.redis_saver import PipelinedRedisSaver
+from grox.cli import cli
+from grox.config import CheckpointEncodingConfig
+
+
+class _Redis:
+    """Just enough of a Redis client for the saver and the compaction: JSON documents, SCAN and pipelines."""
+
+    def __init__(self):
+        self.docs = {}
+        self._queued = []
+
+    def pipeline(self, transaction=True):
+        self._queued = []
+        return self
+
+    def json(self):
+        return self
+
+    def set(self, key, path, value, nx=False):
+        self._queued.append(lambda: self.docs.__setitem__(key, value))
+
+    def expire(self, key, seconds):
+        self._queued.append(lambda: True)
+
+    def get(self, key, *paths):
+        self._queued.append(lambda: self.docs.get(key) if not paths else self._get(key, paths))
+
+    def _get(self, key, paths):
+        doc = self.docs.get(key)
+        if doc is None:
+            return None
+        found = {}
+        for path in paths:
+            value = doc
+            for part in path[2:].split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            found[path] = [] if value is None else [value]
+        return found[paths[0]] if len(paths) == 1 else found
+
+    def memory_usage(self, key):
+        self._queued.append(lambda: len(json.dumps(self.docs[key])) if key in self.docs else None)
+
+    def unlink(self, key):
+        self._queued.append(lambda: self.docs.pop(key, None) and 1)
+
+    def execute(self):
+        queued, self._queued = self._queued, []
+        return [command() for command in queued]
+
+    def scan_iter(self, match, count=None):
+        pattern = match.replace("\\", "")
+        return [key.encode() for key in list(self.docs) if fnmatch.fnmatchcase(key, pattern)]
+
+
+def _saver(store, format="json"):
+    saver = PipelinedRedisSaver(
+        redis_client=redis.Redis(),
+        encoding=CheckpointEncodingConfig(format=format, min_compress_size=64),
+    )
+    saver._redis = store
+    return saver
+
+
+def _session(saver, thread_id, turns):
+    """A conversation of `turns` checkpoints, each with a pending write; returns the checkpoint configs."""
+    messages, configs = [], []
+    for turn in range(1, turns + 1):
+        messages = messages + [HumanMessage(f"question {turn} " * 20), AIMessage(f"answer {turn} " * 20)]
+        checkpoint_id = f"00000000-0000-0000-0000-{turn:012d}"
+        checkpoint = empty_checkpoint()
+        checkpoint["id"] = checkpoint_id
+        checkpoint["channel_values"] = {"messages": messages, "topic": "weather"}
+        checkpoint["channel_versions"] = {"messages": str(turn), "topic": "1"}
+        new_versions = {"messages": str(turn), **({"topic": "1"} if turn == 1 else {})}
+        config = saver.put(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": checkpoint_id}},
+            checkpoint, {}, new_versions,
+        )
+        saver.put_writes(config, [("messages", [HumanMessage("next")])], task_id=f"task{turn}")
+        configs.append(config)
+    return configs
+
+
+def _keys(store, kind, thread_id):
+    return sorted(key for key in store.docs if key.startswith(f"{kind}:{thread_id}:"))
+
+
+def test_thread_prefix():
+    assert thread_prefix("t") == "t:"
+    assert thread_prefix("t", "p") == "t:p:"
+    assert thread_prefix("t", "p", "s") == "t:p:s"
+    with pytest.raises(ValueError):
+        thread_prefix("t", session_id="s")
+
+
+def test_keeps_latest_checkpoint_and_ancestors():
+    store = _Redis()
+    saver = _saver(store)
+    configs = _session(saver, "t:p:s1", 5)
+    _session(saver, "t:other:s1", 3)
+
+    report = compact_checkpoints(store, thread_prefix("t", "p"), keep_ancestors=1)
+
+    assert (report.threads, report.checkpoints_kept, report.checkpoints_deleted) == (1, 2, 3)
+    assert report.blobs_deleted == 3  # messages 1-3, the topic blob is still referenced
+    assert report.writes_deleted == 3
+    assert report.bytes_reclaimed > 0
+
+    kept_ids = [config["configurable"]["checkpoint_id"] for config in configs[-2:]]
+    assert [key.rsplit(":", 1)[1] for key in _keys(store, "checkpoint", "t:p:s1")] == sorted(kept_ids)
+    assert _keys(store, "checkpoint_blob", "t:p:s1") == [
+        "checkpoint_blob:t:p:s1:__empty__:messages:4",
+        "checkpoint_blob:t:p:s1:__empty__:messages:5",
+        "checkpoint_blob:t:p:s1:__empty__:topic:1",
+    ]
+    assert len(_keys(store, "checkpoint_write", "t:p:s1")) == 2
+    # other projects are untouched
+    assert len(_keys(store, "checkpoint", "t:other:s1")) == 3
+
+
+def test_dry_run_deletes_nothing():
+    store = _Redis()
+    _session(_saver(store), "t:p:s1", 3)
+    before = dict(store.docs)
+
+    report = compact_checkpoints(store, thread_prefix("t", "p", "s1"), dry_run=True)
+
+    assert report.dry_run and report.checkpoints_deleted == 2 and report.bytes_reclaimed > 0
+    assert store.docs == before
+
+
+def test_single_session_does_not_match_longer_ids():
+    store = _Redis()
+    saver = _saver(store)
+    _session(saver, "t:p:s1", 2)
+    _session(saver, "t:p:s10", 2)
+
+    report = compact_checkpoints(store, thread_prefix("t", "p", "s1"))
+
+    assert report.threads == 1 and report.checkpoints_deleted == 1
+    assert len(_keys(store, "checkpoint", "t:p:s10")) == 2
+
+
+def test_delta_bases_of_kept_checkpoints_survive():
+    store = _Redis()
+    saver = _saver(store, format="compact")
+    _session(saver, "t:p:s1", 4)
+    assert store.docs["checkpoint_blob:t:p:s1:__empty__:messages:4"]["type"].startswith("grox:delta:")
+
+    report = compact_checkpoints(store, thread_prefix("t", "p"))
+
+    # the latest messages value is a delta on 3, 2 and 1
+    assert report.checkpoints_deleted == 3 and report.blobs_deleted == 0
+    assert len(_keys(store, "checkpoint", "t:p:s1")) == 1
+
+    # a fresh saver rebuilds the latest value from the chain
+    reader = _saver(store, format="compact")
+    doc = store.docs["checkpoint_blob:t:p:s1:__empty__:messages:4"]
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": reader.serde.loads_typed((doc["type"], doc["blob"]))}
+    checkpoint["channel_versions"] = {"messages": "4"}
+    loaded = reader._resolve(CheckpointTuple({"configurable": {"thread_id": "t:p:s1", "checkpoint_ns": ""}}, checkpoint, {}, None, []))
+    assert len(loaded.checkpoint["channel_values"]["messages"]) == 8
+
+
+def test_compact_command(monkeypatch):
+    store = _Redis()
+    _session(_saver(store), "t:p:s1", 3)
+    monkeypatch.setattr("grox.factory_cache.create_redis_instance", lambda url: store)
+
+    result = CliRunner().invoke(cli, ["compact", "--redis-url", "redis://localhost", "--tenant", "t", "--project", "p"])
+
+    assert result.exit_code == 0, result.output
+    assert "deleted 2 checkpoints, 2 blobs and 2 writes" in result.output
+    assert len(_keys(store, "checkpoint", "t:p:s1")) == 1
+
+    result = CliRunner().invoke(cli, ["compact", "--redis-url", "redis://localhost", "--tenant", "t", "--session", "s"])
+    assert result.exit_code != 0
@@ -0,0 +1,177 @@
+import sys
+
+import pytest
+import redis
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import CheckpointTuple, empty_checkpoint
+
+from grox.checkpoints.redis_saver import PipelinedRedisSaver
+from grox.checkpoints.serializer import CompactSerializer, ListDelta
+from grox.config import CheckpointEncodingConfig
+
+
+class _Store:
+    """Just enough of a Redis client: pipelined JSON.SET / EXPIRE / JSON.GET."""
+
+    def __init__(self):
+        self.docs = {}
+        self.expires = []
+        self.gets = []
+        self._queued = []
+
+    def pipeline(self, transaction=True):
+        self._queued = []
+        return self
+
+    def json(self):
+        return self
+
+    def set(self, key, path, value, nx=False):
+        self._queued.append(("set", key, value))
+
+    def expire(self, key, seconds):
+        self._queued.append(("expire", key, seconds))
+
+    def execute(self):
+        queued, self._queued = self._queued, []
+        results = []
+        for op, key, value in queued:
+            if op == "set":
+                self.docs[key] = value
+            elif op == "get":
+                self.gets.append(key)
+                results.append(self.docs.get(key))
+            else:
+                self.expires.append(key)
+        return results
+
+    def get(self, key):
+        self._queued.append(("get", key, None))
+
+
+def _saver(store, snapshot_every=16, ttl=None):
+    saver = PipelinedRedisSaver(
+        redis_client=redis.Redis(),
+        ttl={"default_ttl": ttl},
+        encoding=CheckpointEncodingConfig(format="compact", snapshot_every=snapshot_every, min_compress_size=64),
+    )
+    saver._redis = store
+    return saver
+
+
+def _turns(saver, turns):
+    """Writes a growing conversation, returns the messages and the blob key of every version."""
+    messages, keys = [], []
+    for turn in range(1, turns + 1):
+        messages = messages + [HumanMessage(f"question {turn} " * 20), AIMessage(f"answer {turn} " * 20)]
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": messages}
+        checkpoint["channel_versions"] = {"messages": str(turn)}
+        saver.put({"configurable": {"thread_id": "t", "checkpoint_ns": ""}}, checkpoint, {}, {"messages": str(turn)})
+        keys.append(saver._blob_key("t", "__empty__", "messages", str(turn)))
+    return messages, keys
+
+
+def _loaded(saver, store, key, version):
+    """The checkpoint tuple RedisSaver.get_tuple would return for the blob at key."""
+    doc = store.docs[key]
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": saver.serde.loads_typed((doc["type"], doc["blob"]))}
+    checkpoint["channel_versions"] = {"messages": version}
+    return CheckpointTuple({"configurable": {"thread_id": "t", "checkpoint_ns": ""}}, checkpoint, {}, None, [])
+
+
+def test_messages_are_stored_as_deltas_and_rebuilt():
+    store = _Store()
+    messages, keys = _turns(_saver(store), 5)
+
+    types = [store.docs[key]["type"] for key in keys]
+    assert types[0].startswith("grox:msgpack")
+    assert all(t.startswith("grox:delta:") for t in types[1:])
+    # a delta only holds the new turn
+    assert len(store.docs[keys[-1]]["blob"]) < len(store.docs[keys[0]]["blob"]) * 1.5
+
+    # another worker, nothing cached: follows the chain down to the snapshot
+    other = _saver(store)
+    loaded = other._resolve(_loaded(other, store, keys[-1], "5"))
+    assert loaded.checkpoint["channel_values"]["messages"] == messages
+
+    # and continues the chain from what it read
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": messages + [HumanMessage("one more")]}
+    other.put({"configurable": {"thread_id": "t", "checkpoint_ns": ""}}, checkpoint, {}, {"messages": "6"})
+    doc = store.docs[other._blob_key("t", "__empty__", "messages", "6")]
+    delta = other.serde.loads_typed((doc["type"], doc["blob"]))
+    assert delta == ListDelta("5", 10, [HumanMessage("one more")], ("1", "2", "3", "4", "5"))
+
+
+def test_chain_is_fetched_in_one_round_trip():
+    store = _Store()
+    messages, keys = _turns(_saver(store), 5)
+
+    other = _saver(store)
+    loaded = other._resolve(_loaded(other, store, keys[-1], "5"))
+
+    assert loaded.checkpoint["channel_values"]["messages"] == messages
+    assert other.round_trips == 1 and store.gets == keys[:-1]
+
+
+def test_reading_an_older_version_keeps_the_newer_base():
+    store = _Store()
+    saver = _saver(store)
+    messages, keys = _turns(saver, 5)
+
+    loaded = saver._resolve(_loaded(saver, store, keys[2], "3"))
+
+    assert loaded.checkpoint["channel_values"]["messages"] == messages[:6]
+    assert saver._base("t", "__empty__", "messages").version == "5"
+
+
+def test_snapshot_every_bounds_the_chain():
+    store = _Store()
+    _, keys = _turns(_saver(store, snapshot_every=3), 7)
+
+    full = [i + 1 for i, key in enumerate(keys) if not store.docs[key]["type"].startswith("grox:delta:")]
+    assert full == [1, 4, 7]
+
+
+def test_deltas_keep_their_base_alive():
+    store = _Store()
+    _, keys = _turns(_saver(store, ttl=10), 3)
+
+    # the last checkpoint refreshed the ttl of both versions it is built on
+    assert store.expires.count(keys[0]) == 3
+    assert store.expires.count(keys[1]) == 2
+
+
+def test_missing_base_is_an_error():
+    store = _Store()
+    _, keys = _turns(_saver(store), 3)
+    del store.docs[keys[1]]
+
+    other = _saver(store)
+    with pytest.raises(ValueError, match="base version 2 is missing"):
+        other._resolve(_loaded(other, store, keys[2], "3"))
+
+
+def test_compact_serializer_reads_json_values():
+    from langgraph.checkpoint.redis.jsonplus_redis import JsonPlusRedisSerializer
+
+    messages = [HumanMessage("hello " * 100), AIMessage("hi")]
+    serde = CompactSerializer()
+    type_, data = serde.dumps_typed(messages)
+
+    assert type_ == "grox:msgpack+zstd"
+    assert len(data) < len(JsonPlusRedisSerializer().dumps_typed(messages)[1]) / 2
+    assert serde.loads_typed((type_, data)) == messages
+    assert serde.loads_typed(JsonPlusRedisSerializer().dumps_typed(messages)) == messages
+    delta = ListDelta("1", 1, messages[1:])
+    assert serde.loads_typed(serde.dumps_typed(delta)) == delta
+
+
+def test_zstandard_is_only_needed_by_the_compact_format(monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    PipelinedRedisSaver(redis_client=redis.Redis(), encoding=CheckpointEncodingConfig(format="json"))
+    with pytest.raises(ImportError, match="grox\\[compact\\]"):
+        _saver(_Store())
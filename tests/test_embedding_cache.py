@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import GroxProjectConfig
+from grox.documents.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0, 0.5]
+
+
+def test_only_misses_are_embedded(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    model = CountingEmbeddings()
+    cached = CachedEmbeddings(model, EmbeddingCache(path), model_key="test-model")
+
+    first = cached.embed_documents(["alpha", "beta", "alpha"])
+    assert model.embedded == ["alpha", "beta"]
+
+    second = cached.embed_documents(["beta", "gamma"])
+    assert model.embedded == ["alpha", "beta", "gamma"]
+    assert second[0] == first[1]
+
+
+def test_cache_survives_restart_and_is_keyed_by_model(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    CachedEmbeddings(CountingEmbeddings(), EmbeddingCache(path), model_key="a").embed_documents(["text"])
+
+    model = CountingEmbeddings()
+    reopened = CachedEmbeddings(model, EmbeddingCache(path), model_key="a")
+    assert reopened.embed_documents(["text"]) == [[4.0, 1.0, 0.5]]
+    assert model.embedded == []
+
+    other = CountingEmbeddings()
+    CachedEmbeddings(other, EmbeddingCache(path), model_key="b").embed_documents(["text"])
+    assert other.embedded == ["text"]
+
+
+class TenthEmbeddings(Embeddings):
+    """0.1 has no exact float32 value."""
+
+    def embed_documents(self, texts):
+        return [[0.1, float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [0.1, float(len(text))]
+
+
+def test_fresh_vectors_match_cache_hits(tmp_path):
+    cached = CachedEmbeddings(TenthEmbeddings(), EmbeddingCache(str(tmp_path / "cache.sqlite")), model_key="m")
+
+    fresh = cached.embed_documents(["text"])
+    assert cached.embed_documents(["text"]) == fresh
+    assert cached.stats() == {"hits": 1, "misses": 1}
+
+
+def test_stats_count_every_lookup_across_threads(tmp_path):
+    cached = CachedEmbeddings(CountingEmbeddings(), EmbeddingCache(str(tmp_path / "cache.sqlite")), model_key="m")
+    cached.embed_documents(["text"])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: cached.embed_documents(["text"]), range(200)))
+
+    assert cached.stats() == {"hits": 200, "misses": 1}
+
+
+def test_query_embeddings_are_memoized_per_normalized_query():
+    from grox.cache import TTLCache
+    from grox.documents.embedding_cache import QueryCachedEmbeddings
+
+    class CountingQueries(CountingEmbeddings):
+        def __init__(self):
+            super().__init__()
+            self.queries = []
+
+        def embed_query(self, text):
+            self.queries.append(text)
+            return super().embed_query(text)
+
+    model = CountingQueries()
+    cache = TTLCache(max_size=2)
+    cached = QueryCachedEmbeddings(model, cache, model_key="m")
+
+    assert cached.embed_query("weather  today") == cached.embed_query(" weather today\n")
+    assert model.queries == ["weather today"]
+
+    cached.embed_query("second")
+    cached.embed_query("third")
+    cached.embed_query("weather today")
+    assert model.queries == ["weather today", "second", "third", "weather today"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["evictions"] == 2
+
+    expiring = QueryCachedEmbeddings(model, TTLCache(ttl=0), model_key="m")
+    expiring.embed_query("again")
+    expiring.embed_query("again")
+    assert model.queries[-2:] == ["again", "again"]
+
+
+def test_cache_path_is_relative_to_the_backends_file(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "backends.yaml").write_text(yaml.safe_dump([
+        {"name": "vector_store", "backend": "memory", "embedding_cache": ".grox/embeddings.sqlite"},
+    ]))
+    (project / "grox.yaml").write_text(yaml.safe_dump({
+        "version": "1.0.0",
+        "metadata": {"title": "Project", "project": "proj"},
+        "infrastructure": {"backends": ["backends.yaml"]},
+    }))
+    monkeypatch.chdir(tmp_path)
+
+    config = GroxProjectConfig.load_yaml("project/grox.yaml")
+
+    vector_store = config.infrastructure.backend_configs["vector_store"]
+    assert vector_store.embedding_cache == str(project / ".grox" / "embeddings.sqlite")
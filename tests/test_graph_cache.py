@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langfabric import OpenAIModelConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from grox.config import (
+    BackendConfig, DefaultsConfig, GroxAppConfig, GroxProjectConfig, InfrastructureConfig, OrchestrationConfig,
+    ProjectMetadata,
+)
+from grox.documents.store import document_search_tool
+from grox.factory import build_document_store
+from grox.graph_cache import graph_cache
+from grox.model_pool import PooledModelManager
+from grox.project import GroxProject
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class _AnsweringModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class _SyncOnlySaver(InMemorySaver):
+    """Like PipelinedRedisSaver, without the async methods."""
+
+    aget_tuple = BaseCheckpointSaver.aget_tuple
+    aput = BaseCheckpointSaver.aput
+    aput_writes = BaseCheckpointSaver.aput_writes
+
+
+def _project(tenant_id, api_key="sk-test", saver_ttl=None, previous=None, saver=None):
+    saver = saver or BackendConfig(name="checkpoint_saver", backend="memory", ttl=saver_ttl)
+    config = GroxProjectConfig(
+        version="1.0.0",
+        metadata=ProjectMetadata(title=tenant_id, project="proj"),
+        infrastructure=InfrastructureConfig(
+            model_configs={"chat": OpenAIModelConfig(provider="openai", name="chat", model="gpt-4o", api_key=api_key)},
+            defaults=DefaultsConfig(chat_model_with_tools="chat"),
+            backend_configs={"checkpoint_saver": saver},
+        ),
+    )
+    return GroxProject(GroxAppConfig(), tenant_id, config, previous=previous)
+
+
+def test_projects_with_same_structure_share_the_graph():
+    first = _project("tenant_a")
+    second = _project("tenant_b")
+    other = _project("tenant_c", api_key="sk-other")
+
+    assert first.graph is second.graph
+    assert other.graph is not first.graph
+    assert first.graph.checkpointer is first.checkpoint_saver
+    assert graph_cache.stats()["hits"] >= 1
+
+    assert first.graph_config("tenant_a:proj:s1") == {"configurable": {"thread_id": "tenant_a:proj:s1"}}
+
+
+def test_reload_with_another_saver_rebuilds_the_graph():
+    old = _project("tenant_a")
+    new = _project("tenant_a", saver_ttl="1h", previous=old)
+
+    assert new.reload_changes == {"checkpoint_saver"}
+    assert new.checkpoint_saver is not old.checkpoint_saver
+    assert new.graph.checkpointer is new.checkpoint_saver
+
+    same = _project("tenant_a", saver_ttl="1h", previous=new)
+    assert same.graph is new.graph
+
+
+def test_graph_of_a_sync_redis_saver_runs_with_astream(monkeypatch):
+    import grox.project
+
+    async def setup(saver):
+        pass
+
+    monkeypatch.setattr(grox.project, "build_checkpoint_saver", lambda cfg: _SyncOnlySaver() if cfg.sync else InMemorySaver())
+    monkeypatch.setattr(grox.project, "setup_async_redis_saver", setup)
+    monkeypatch.setattr(PooledModelManager, "load", lambda self, name, **kwargs: _AnsweringModel(messages=iter([AIMessage("hi")])))
+    project = _project("tenant_a", saver=BackendConfig(
+        name="checkpoint_saver", backend="redis", sync=True, url="redis://localhost:6379/5",
+    ))
+
+    async def run():
+        await project.wait_ready()
+        config = project.graph_config("tenant_a:proj:s1")
+        return [chunk async for chunk in project.graph.astream({"messages": [("user", "hello")]}, config, stream_mode="updates")]
+
+    assert [list(chunk) for chunk in asyncio.run(run())] == [["agent"]]
+    assert isinstance(project.checkpoint_saver, _SyncOnlySaver)
+    assert project.graph_checkpoint_saver.get_tuple({"configurable": {"thread_id": "tenant_a:proj:s1"}}) is not None
+
+
+def test_graph_searches_the_project_documents_with_a_plain_config(tmp_path, monkeypatch):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["short", "a bit longer"], "metadata": {}}]},
+    ]}))
+    search = AIMessage("", tool_calls=[{
+        "name": "DocumentSearch", "args": {"query": "short", "collection_name": "faq", "num_results": 1}, "id": "call",
+    }])
+    monkeypatch.setattr(PooledModelManager, "load", lambda self, name, **kwargs: _AnsweringModel(messages=iter([search, AIMessage("found")])))
+    monkeypatch.setattr(PooledModelManager, "load_embeddings", lambda self, name: LengthEmbeddings())
+    chat = OpenAIModelConfig(provider="openai", name="chat", model="gpt-4o", api_key="sk-test")
+    project = GroxProject(GroxAppConfig(), "tenant", GroxProjectConfig(
+        version="1.0.0",
+        metadata=ProjectMetadata(title="tenant", project="proj"),
+        orchestration=OrchestrationConfig(documents=[str(documents)]),
+        infrastructure=InfrastructureConfig(
+            model_configs={"chat": chat, "embed": chat.model_copy(update={"name": "embed"})},
+            defaults=DefaultsConfig(chat_model_with_tools="chat", embedding_model="embed"),
+            backend_configs={"vector_store": BackendConfig(name="vector_store", backend="numpy")},
+        ),
+    ))
+    project.cancel_tasks()
+    project.document_store.index_documents("faq")
+
+    async def run():
+        config = {"configurable": {"thread_id": "tenant:proj:s1"}}
+        return [chunk async for chunk in project.graph.astream({"messages": [("user", "hello")]}, config, stream_mode="updates")]
+
+    tool_message = asyncio.run(run())[1]["tools"]["messages"][0]
+    assert isinstance(tool_message, ToolMessage) and tool_message.status == "success"
+    assert "short" in tool_message.content
+
+
+def test_shared_document_search_tool_uses_store_from_run_config(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["short", "a bit longer"], "metadata": {}}]},
+    ]}))
+    store = build_document_store(
+        LengthEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+    )
+    store.index_documents("faq")
+
+    args = {"query": "short", "collection_name": "faq", "num_results": 1}
+    found = document_search_tool.invoke(args, config={"configurable": {"document_store": store}})
+    assert [doc.page_content for doc in found] == ["short"]
+
+    with pytest.raises(ValueError):
+        document_search_tool.invoke(args)
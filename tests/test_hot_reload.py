@@ -0,0 +1,136 @@
+import os
+import time
+
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import GroxAppConfig
+from grox.context import GroxContext
+from grox.model_pool import PooledModelManager
+from grox.reload import ProjectWatcher
+
+
+class LengthEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def _write(path, data):
+    path.write_text(yaml.safe_dump(data))
+    # make sure the modification time moves even on coarse file systems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _write_project(tmp_path, title="Project", history_ttl="1h"):
+    _write(tmp_path / "backends.yaml", [
+        {"name": "checkpoint_saver", "backend": "memory"},
+        {"name": "chat_history", "backend": "memory", "ttl": history_ttl},
+    ])
+    _write(tmp_path / "grox.yaml", {
+        "version": "1.0.0",
+        "metadata": {"title": title, "project": "proj"},
+        "infrastructure": {"backends": ["backends.yaml"]},
+    })
+    return str(tmp_path / "grox.yaml")
+
+
+def test_reload_rebuilds_only_changed_parts(tmp_path, fresh_context):
+    ctx = GroxContext(GroxAppConfig(tenants={"tenant": [_write_project(tmp_path)]}))
+    ctx.register_all_projects()
+    old = ctx.get_project("tenant", "proj")
+    assert str(tmp_path / "backends.yaml") in ctx.watched_files()
+
+    _write_project(tmp_path, title="Renamed")
+    new = ctx.reload_project("tenant", "proj")
+    assert new is ctx.get_project("tenant", "proj") and new is not old
+    # backends are scoped by the project, a metadata change rebuilds them
+    assert new.reload_changes == {"metadata", "checkpoint_saver", "chat_history"}
+    assert new.chat_history_factory is not old.chat_history_factory
+    assert old.config.metadata.title == "Project"  # running requests keep the old instance
+
+    _write_project(tmp_path, title="Renamed", history_ttl="2h")
+    newer = ctx.reload_project("tenant", "proj")
+    assert newer.reload_changes == {"chat_history"}
+    assert newer.checkpoint_saver is new.checkpoint_saver
+    assert newer.chat_history_factory is not new.chat_history_factory
+
+
+def _write_documents_project(tmp_path, orchestration):
+    _write(tmp_path / "models.yaml", [{"name": "embed", "provider": "ollama", "model": "nomic-embed-text"}])
+    _write(tmp_path / "backends.yaml", [{"name": "vector_store", "backend": "numpy"}])
+    _write(tmp_path / "documents.yaml", {"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["first", "second"], "metadata": {}}]},
+    ]})
+    _write(tmp_path / "grox.yaml", {
+        "version": "1.0.0",
+        "metadata": {"title": "Project", "project": "proj"},
+        "orchestration": {"documents": ["documents.yaml"], **orchestration},
+        "infrastructure": {"models": ["models.yaml"], "backends": ["backends.yaml"], "defaults": {"embedding_model": "embed"}},
+    })
+    return str(tmp_path / "grox.yaml")
+
+
+def test_only_a_documents_change_rebuilds_the_document_store(tmp_path, fresh_context, monkeypatch):
+    model = LengthEmbeddings()
+    monkeypatch.setattr(PooledModelManager, "load_embeddings", lambda self, name: model)
+    ctx = GroxContext(GroxAppConfig(tenants={"tenant": [_write_documents_project(tmp_path, {})]}))
+    ctx.register_all_projects()
+    old = ctx.get_project("tenant", "proj")
+    old.cancel_tasks()
+    old.document_store.index_documents("faq")
+    model.embedded.clear()
+
+    _write_documents_project(tmp_path, {"streaming": {"debug": True, "mode": "tokens"}})
+    new = ctx.reload_project("tenant", "proj")
+    new.cancel_tasks()
+    assert new.reload_changes == {"streaming"}
+    assert new.document_store is old.document_store
+
+    _write_documents_project(tmp_path, {"search_result_cache": {"max_size": 8}, "indexing": {"batch_size": 8}})
+    newer = ctx.reload_project("tenant", "proj")
+    newer.cancel_tasks()
+    assert newer.reload_changes == {"streaming", "caches", "indexing"}
+    assert newer.document_store is old.document_store
+    assert newer.document_store.result_cache is newer._search_result_cache
+    assert newer._search_result_cache.max_size == 8
+    assert newer.document_store.reindex_documents("faq").added == 0 and model.embedded == []
+
+    (tmp_path / "more.yaml").write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "more", "data": [{"documents": ["third"], "metadata": {}}]},
+    ]}))
+    _write_documents_project(tmp_path, {"documents": ["documents.yaml", "more.yaml"]})
+    rebuilt = ctx.reload_project("tenant", "proj")
+    rebuilt.cancel_tasks()
+    assert "documents" in rebuilt.reload_changes
+    assert rebuilt.document_store is not old.document_store
+
+
+def test_failed_reload_keeps_running_project(tmp_path, fresh_context):
+    ctx = GroxContext(GroxAppConfig(tenants={"tenant": [_write_project(tmp_path)]}))
+    ctx.register_all_projects(mode="lazy")
+    project = ctx.get_project("tenant", "proj")
+
+    (tmp_path / "grox.yaml").write_text("version: [broken")
+    assert ctx.reload_changed_projects() == []
+    assert ctx.get_project("tenant", "proj") is project
+    assert ctx.reload_changed_projects() == []  # not retried until the files change again
+
+
+def test_polling_watcher_reloads_changed_projects(tmp_path, fresh_context):
+    ctx = GroxContext(GroxAppConfig(tenants={"tenant": [_write_project(tmp_path)]}))
+    ctx.register_all_projects()
+
+    with ProjectWatcher(ctx, interval=0.05, use_events=False):
+        _write_project(tmp_path, title="Watched")
+        deadline = time.monotonic() + 5
+        while ctx.get_project("tenant", "proj").config.metadata.title != "Watched":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
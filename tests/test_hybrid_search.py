@@ -0,0 +1,54 @@
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import BackendConfig
+from grox.documents.schema import DocumentSearchParams
+from grox.factory import build_document_store
+
+
+class FillerBiasedEmbeddings(Embeddings):
+    """Dense search always prefers the filler documents."""
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] if "filler" in text else [0.0, 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.1]
+
+
+def _store(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    texts = [f"filler document number {i}" for i in range(30)] + ["xylophone repair"]
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": texts, "metadata": {}}]},
+    ]}))
+
+    store = build_document_store(
+        FillerBiasedEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+    )
+    store.index_documents("faq")
+    return store
+
+
+def test_hybrid_rrf_recovers_lexical_matches_missed_by_dense(tmp_path):
+    store = _store(tmp_path)
+
+    params = DocumentSearchParams(query="xylophone", collection_name="faq", num_results=3, search_type="hybrid_rrf", candidate_k=3)
+    dense_only = store.get_retriever("faq").vector_store.similarity_search("xylophone", k=3)
+    assert "xylophone repair" not in [doc.page_content for doc in dense_only]
+    assert "xylophone repair" in [doc.page_content for doc in store._tool_fn(params)]
+
+
+def test_dense_search_threads_are_started_by_hybrid_searches_only(tmp_path):
+    store = _store(tmp_path)
+    store._tool_fn(DocumentSearchParams(query="xylophone", collection_name="faq", search_type="similarity"))
+    assert store._dense_executor is None
+
+    store._tool_fn(DocumentSearchParams(query="xylophone", collection_name="faq", search_type="hybrid_rrf"))
+    executor = store._dense_executor
+    assert executor is not None
+
+    store.close()
+    assert store._dense_executor is None and executor._shutdown
@@ -0,0 +1,80 @@
+import asyncio
+
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import BackendConfig
+from grox.documents.indexer import IndexingPipeline
+from grox.factory import build_document_store
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def _write_documents(path, data):
+    path.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [{"name": "faq", "data": data}]}))
+
+
+def test_reindex_applies_only_changes(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    _write_documents(documents, [
+        {"documents": ["first", "second"], "metadata": {"subject": "a"}},
+        {"documents": ["third"], "metadata": {"subject": "b"}},
+    ])
+
+    model = CountingEmbeddings()
+    store = build_document_store(
+        model, "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="memory"), structlog.get_logger(),
+    )
+
+    summary = store.reindex_documents("faq")
+    assert (summary.added, summary.removed, summary.updated, summary.unchanged) == (3, 0, 0, 0)
+
+    _write_documents(documents, [
+        {"documents": ["first", "fourth"], "metadata": {"subject": "a"}},
+        {"documents": ["third"], "metadata": {"subject": "c"}},
+    ])
+    store.reload_collections()
+    model.embedded.clear()
+
+    summary = store.reindex_documents("faq")
+    assert (summary.added, summary.removed, summary.updated, summary.unchanged) == (1, 1, 1, 1)
+    assert model.embedded == ["fourth"]
+
+    vector_store = store._get_vector_store(store.find_collection("faq"))
+    texts = {record["text"]: record["metadata"]["subject"] for record in vector_store.store.values()}
+    assert texts == {"first": "a", "fourth": "a", "third": "c"}
+
+
+def test_collections_removed_from_the_files_are_dropped(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["first"], "metadata": {}}]},
+        {"name": "old", "data": [{"documents": ["second", "third"], "metadata": {}}]},
+    ]}))
+    store = build_document_store(
+        CountingEmbeddings(), "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="memory"), structlog.get_logger(),
+    )
+    asyncio.run(IndexingPipeline().run([store]))
+    old_vectors = store._get_vector_store(store.find_collection("old"))
+    assert len(old_vectors.store) == 2
+
+    _write_documents(documents, [{"documents": ["first"], "metadata": {}}])
+    store.reload_collections()
+    asyncio.run(IndexingPipeline().run([store]))
+
+    assert old_vectors.store == {}
+    assert store.manifest.collections() == ["faq"]
+    assert store.drop_removed_collections() == []
@@ -0,0 +1,64 @@
+import asyncio
+
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import BackendConfig
+from grox.documents.indexer import IndexingPipeline
+from grox.factory import build_document_store
+
+
+class FlakyEmbeddings(Embeddings):
+    """Records batch sizes and peak concurrency, fails the first call."""
+
+    def __init__(self):
+        self.batches = []
+        self.in_flight = 0
+        self.peak = 0
+        self.failed = False
+
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+    async def aembed_documents(self, texts):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if not self.failed:
+                self.failed = True
+                raise RuntimeError("rate limited")
+            self.batches.append(len(texts))
+            return [[float(len(text)), 1.0] for text in texts]
+        finally:
+            self.in_flight -= 1
+
+
+def test_pipeline_batches_across_entries_with_bounded_concurrency(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "one", "data": [{"documents": [f"a{i}"], "metadata": {}} for i in range(7)]},
+        {"name": "two", "data": [{"documents": [f"b{i}" for i in range(5)], "metadata": {}}]},
+    ]}))
+
+    model = FlakyEmbeddings()
+    store = build_document_store(
+        model, "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="memory"), structlog.get_logger(),
+    )
+
+    progress = []
+    pipeline = IndexingPipeline(
+        batch_size=3, max_concurrency=2, retry_backoff=0.001,
+        progress=lambda name, done, total: progress.append((name, done, total)),
+    )
+    summaries = asyncio.run(pipeline.run([store]))
+
+    assert {s.collection_name: s.added for s in summaries} == {"one": 7, "two": 5}
+    assert sorted(model.batches) == [1, 2, 3, 3, 3]
+    assert model.peak <= 2
+    assert ("one", 7, 7) in progress and ("two", 5, 5) in progress
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import re
+
+import redis
+import redis.asyncio
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.redis import AsyncRedisSaver, RedisSaver
+
+from grox.checkpoints.redis_saver import AsyncPipelinedRedisSaver, PipelinedRedisSaver
+from grox.config import LocalCheckpointCacheConfig
+
+THREAD = {"configurable": {"thread_id": "t:p:s", "checkpoint_ns": ""}}
+
+
+class _Redis:
+    """Just enough of a Redis client: pipelined JSON.SET / HSET / EXPIRE, HGET and DEL."""
+
+    def __init__(self):
+        self.docs = {}
+        self.hashes = {}
+        self.hgets = 0
+        self._queued = []
+
+    def pipeline(self, transaction=True):
+        self._queued = []
+        return self
+
+    def json(self):
+        return self
+
+    def set(self, key, path, value, nx=False):
+        self._queued.append(lambda: self.docs.__setitem__(key, value))
+
+    def hset(self, key, mapping):
+        self._queued.append(lambda: self.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        queued, self._queued = self._queued, []
+        for command in queued:
+            command()
+
+    def hget(self, key, field):
+        self.hgets += 1
+        value = self.hashes.get(key, {}).get(field)
+        return value.encode() if value is not None else None
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+
+class _AsyncRedis(_Redis):
+    async def execute(self):
+        super().execute()
+
+    async def hget(self, key, field):
+        return super().hget(key, field)
+
+    async def delete(self, key):
+        super().delete(key)
+
+
+class _Index:
+    """Tag filter searches of a RedisSaver index over the documents of _Redis."""
+
+    def __init__(self, store, prefix):
+        self.store = store
+        self.prefix = prefix + ":"
+
+    def _matches(self, expression, doc):
+        if expression._filter is None:
+            return self._matches(expression._left, doc) and self._matches(expression._right, doc)
+        field, value = re.fullmatch(r"@(\w+):\{(.*)\}", expression._filter).groups()
+        return str(doc.get(field)) == value.replace("\\", "")
+
+    def search(self, query):
+        docs = [doc for key, doc in self.store.docs.items()
+                if key.startswith(self.prefix) and self._matches(query._filter_expression, doc)]
+        if query._sortby is not None:
+            field, order = query._sortby.args
+            docs.sort(key=lambda doc: doc[field], reverse=order == "DESC")
+        return _Results([_Doc(doc, query._return_fields) for doc in docs[:query._num_results]])
+
+
+class _Results:
+    def __init__(self, docs):
+        self.docs = docs
+
+
+class _Doc:
+    """A search result, JSON path fields come back serialized."""
+
+    def __init__(self, doc, fields):
+        self.fields = {}
+        for field in fields:
+            value = doc
+            for part in field.lstrip("$.").split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            self.fields[field] = json.dumps(value) if field.startswith("$.") and isinstance(value, dict) else value
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    def __getattr__(self, field):
+        try:
+            return self.fields[field]
+        except KeyError:
+            raise AttributeError(field) from None
+
+
+def _saver(store, max_threads=10):
+    saver = PipelinedRedisSaver(
+        redis_client=redis.Redis(), local_cache=LocalCheckpointCacheConfig(max_threads=max_threads),
+    )
+    saver._redis = store
+    return saver
+
+
+def _put(saver, turn, thread=THREAD):
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = f"00000000-0000-0000-0000-{turn:012d}"
+    checkpoint["channel_values"] = {"messages": [HumanMessage(f"question {turn}"), AIMessage(f"answer {turn}")]}
+    checkpoint["channel_versions"] = {"messages": str(turn)}
+    config = {"configurable": {**thread["configurable"], "checkpoint_id": checkpoint["id"]}}
+    return saver.put(config, checkpoint, {"source": "loop", "step": turn}, {"messages": str(turn)})
+
+
+def _from_redis(monkeypatch, cls=RedisSaver):
+    """Stands in for the index searches of RedisSaver.get_tuple, records the reads reaching it."""
+    reads = []
+
+    def get_tuple(self, config):
+        reads.append(config)
+        return None
+
+    async def aget_tuple(self, config):
+        reads.append(config)
+        return None
+
+    monkeypatch.setattr(cls, "aget_tuple" if cls is AsyncRedisSaver else "get_tuple",
+                        aget_tuple if cls is AsyncRedisSaver else get_tuple)
+    return reads
+
+
+def test_reads_the_checkpoint_written_here_from_memory(monkeypatch):
+    reads = _from_redis(monkeypatch)
+    store = _Redis()
+    saver = _saver(store)
+    config = _put(saver, 1)
+
+    loaded = saver.get_tuple(THREAD)
+
+    assert reads == [] and store.hgets == 1
+    assert loaded.config["configurable"] == {**THREAD["configurable"], "checkpoint_id": config["configurable"]["checkpoint_id"]}
+    assert loaded.checkpoint["channel_values"]["messages"][1].content == "answer 1"
+    assert loaded.metadata == {"source": "loop", "step": 1}
+    assert loaded.pending_writes == []
+
+    # the graph mutates what it loaded, the cached copy stays as written
+    loaded.checkpoint["channel_versions"]["messages"] = "2"
+    assert saver.get_tuple(THREAD).checkpoint["channel_versions"] == {"messages": "1"}
+    assert saver.cache_stats()["hits"] == 2
+
+
+def test_cache_hit_matches_the_redis_read():
+    store = _Redis()
+    saver = _saver(store)
+    _put(saver, 1)
+    _put(saver, 2)
+    reader = _saver(store, max_threads=0)
+    reader.checkpoints_index = _Index(store, "checkpoint")
+    reader.checkpoint_blobs_index = _Index(store, "checkpoint_blob")
+    reader.checkpoint_writes_index = _Index(store, "checkpoint_write")
+
+    hit = saver.get_tuple(THREAD)
+    read = reader.get_tuple(THREAD)
+
+    assert saver.cache_stats()["hits"] == 1
+    assert hit.config == read.config
+    assert hit.parent_config == read.parent_config == read.config
+    assert hit.metadata == read.metadata
+    # the stored checkpoint record carries its serializer type along
+    assert hit.checkpoint == {key: value for key, value in read.checkpoint.items() if key != "type"}
+    assert hit.pending_writes == read.pending_writes == []
+
+
+def test_write_by_another_worker_is_read_from_redis(monkeypatch):
+    reads = _from_redis(monkeypatch)
+    store = _Redis()
+    saver, other = _saver(store), _saver(store)
+    _put(saver, 1)
+    _put(other, 2)
+
+    assert saver.get_tuple(THREAD) is None
+    assert len(reads) == 1 and saver.cache_stats()["stale"] == 1
+
+    # the stale entry is gone, the next read does not check the version
+    saver.get_tuple(THREAD)
+    assert store.hgets == 1 and saver.cache_stats()["misses"] == 1
+    assert other.get_tuple(THREAD).checkpoint["id"].endswith("2")
+
+
+def test_pending_writes_invalidate(monkeypatch):
+    reads = _from_redis(monkeypatch)
+    store = _Redis()
+    saver, other = _saver(store), _saver(store)
+    config = _put(saver, 1)
+    # another worker resuming the same checkpoint
+    other.put_writes(config, [("messages", [HumanMessage("more")])], task_id="task")
+
+    assert saver.get_tuple(THREAD) is None
+    # and this worker's own writes are not in its cached checkpoint either
+    _put(saver, 2)
+    saver.put_writes(config, [("messages", [HumanMessage("more")])], task_id="task")
+    assert saver.get_tuple(THREAD) is None
+    assert len(reads) == 2
+
+
+def test_other_checkpoints_and_threads_are_read_from_redis(monkeypatch):
+    reads = _from_redis(monkeypatch)
+    saver = _saver(_Redis())
+    _put(saver, 2)
+
+    saver.get_tuple({"configurable": {**THREAD["configurable"], "checkpoint_id": "00000000-0000-0000-0000-000000000001"}})
+    saver.get_tuple({"configurable": {"thread_id": "t:p:other", "checkpoint_ns": ""}})
+    saver.get_tuple({"configurable": {**THREAD["configurable"], "checkpoint_ns": "child"}})
+    assert len(reads) == 3
+
+    assert saver.get_tuple(
+        {"configurable": {**THREAD["configurable"], "checkpoint_id": "00000000-0000-0000-0000-000000000002"}}
+    ).checkpoint["id"].endswith("2")
+
+
+def test_delete_thread_drops_the_version(monkeypatch):
+    reads = _from_redis(monkeypatch)
+    monkeypatch.setattr(RedisSaver, "delete_thread", lambda self, thread_id: None)
+    store = _Redis()
+    saver, other = _saver(store), _saver(store)
+    _put(saver, 1)
+    _put(other, 1)
+
+    saver.delete_thread("t:p:s")
+
+    assert store.hashes == {}
+    assert saver.get_tuple(THREAD) is None
+    assert other.get_tuple(THREAD) is None
+    assert len(reads) == 2
+
+
+def test_disabled_by_default(monkeypatch):
+    reads = _from_redis(monkeypatch)
+    store = _Redis()
+    saver = _saver(store, max_threads=0)
+    _put(saver, 1)
+
+    assert saver.get_tuple(THREAD) is None
+    assert store.hashes == {} and len(reads) == 1
+    assert saver.cache_stats()["enabled"] is False
+
+
+def test_async_saver(monkeypatch):
+    reads = _from_redis(monkeypatch, AsyncRedisSaver)
+
+    async def run():
+        saver = AsyncPipelinedRedisSaver(
+            redis_client=redis.asyncio.Redis(), local_cache=LocalCheckpointCacheConfig(max_threads=10),
+        )
+        saver._redis = _AsyncRedis()
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": [HumanMessage("question")]}
+        config = {"configurable": {**THREAD["configurable"], "checkpoint_id": checkpoint["id"]}}
+        config = await saver.aput(config, checkpoint, {}, {})
+        hit = await saver.aget_tuple(THREAD)
+        await saver.aput_writes(config, [("messages", [AIMessage("answer")])], task_id="task")
+        miss = await saver.aget_tuple(THREAD)
+        return hit, miss
+
+    hit, miss = asyncio.run(run())
+    assert hit.checkpoint["channel_values"]["messages"][0].content == "question"
+    assert miss is None and len(reads) == 1
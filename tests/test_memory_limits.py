@@ -0,0 +1,98 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from grox.checkpoints.memory import BoundedMemorySaver, ChatHistoryMemoryManager
+from grox.config import MemoryLimitsConfig
+from graph_builder import build_graph
+
+
+def _config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _run(saver, thread_id, turns=1):
+    graph = build_graph(saver)
+    for _ in range(turns):
+        result = graph.invoke({"foo": ""}, _config(thread_id))
+    return result
+
+
+def test_keep_last_checkpoints_keeps_the_thread_resumable():
+    saver = BoundedMemorySaver(limits=MemoryLimitsConfig(keep_last=2))
+
+    result = _run(saver, "t", turns=3)
+
+    assert result == _run(MemorySaver(), "t", turns=3)
+    assert len(list(saver.list(_config("t")))) == 2
+    assert saver.get_tuple(_config("t")).checkpoint["channel_values"] == {"foo": "b", "bar": ["b"]}
+
+
+def test_least_recently_used_threads_are_evicted():
+    saver = BoundedMemorySaver(limits=MemoryLimitsConfig(max_threads=2))
+    _run(saver, "t1")
+    _run(saver, "t2")
+    saver.get_tuple(_config("t1"))
+    _run(saver, "t3")
+
+    assert saver.get_tuple(_config("t2")) is None
+    assert saver.get_tuple(_config("t1")) is not None
+    assert set(saver.storage) == {"t1", "t3"}
+
+
+def test_threads_expire_after_ttl():
+    saver = BoundedMemorySaver(ttl=0.05)
+    _run(saver, "t")
+    time.sleep(0.1)
+
+    assert saver.get_tuple(_config("t")) is None
+    assert not saver.storage and not saver.blobs and not saver.writes
+    assert saver.stats()["bytes"] == 0
+
+
+def test_byte_budget():
+    saver = BoundedMemorySaver()
+    _run(saver, "t1")
+    one_thread = saver.stats()["bytes"]
+
+    saver = BoundedMemorySaver(limits=MemoryLimitsConfig(max_bytes=int(one_thread * 2.5)))
+    for thread_id in ("t1", "t2", "t3", "t4"):
+        _run(saver, thread_id)
+
+    assert saver.stats()["bytes"] <= one_thread * 2.5
+    assert [t for t in ("t1", "t2", "t3", "t4") if saver.get_tuple(_config(t))] == ["t3", "t4"]
+
+
+def test_deleted_thread_frees_everything():
+    saver = BoundedMemorySaver(limits=MemoryLimitsConfig(keep_last=1))
+    _run(saver, "t", turns=2)
+    saver.delete_thread("t")
+
+    assert saver.stats()["bytes"] == 0
+    assert not saver.storage and not saver.blobs and not saver.writes
+
+
+def test_chat_history_limits():
+    manager = ChatHistoryMemoryManager(limits=MemoryLimitsConfig(max_threads=2, keep_last=2))
+    history = manager.get_instance("s1")
+    history.add_messages([HumanMessage("one"), AIMessage("two"), HumanMessage("three")])
+    assert [m.content for m in history.messages] == ["two", "three"]
+    assert manager.stats()["bytes"] == len("twothree")
+
+    manager.get_instance("s2")
+    manager.get_instance("s3")
+    assert manager.get_instance("s1").messages == []
+    assert manager.stats()["bytes"] == 0
+
+
+def test_chat_history_byte_budget_and_ttl():
+    manager = ChatHistoryMemoryManager(ttl=0.05, limits=MemoryLimitsConfig(max_bytes=10))
+    manager.get_instance("s1").add_message(HumanMessage("x" * 8))
+    manager.get_instance("s2").add_message(HumanMessage("y" * 8))
+
+    assert len(manager) == 1
+    assert manager.get_instance("s2").messages[0].content == "y" * 8
+
+    time.sleep(0.1)
+    assert manager.get_instance("s2").messages == []
@@ -0,0 +1,75 @@
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langfabric import OpenAIModelConfig
+
+from grox.model_pool import ModelPool, PooledModelManager, model_config_key
+
+
+def _config(name, api_key="sk-test", model="gpt-4o"):
+    return OpenAIModelConfig(provider="openai", name=name, model=model, api_key=api_key)
+
+
+def test_identical_configs_share_one_client():
+    pool = ModelPool()
+    first = PooledModelManager({"chat": _config("chat"), "embed": _config("embed", model="text-embedding-3-small")}, pool=pool)
+    second = PooledModelManager({"gpt4o-chat": _config("gpt4o-chat")}, pool=pool)
+    other_key = PooledModelManager({"chat": _config("chat", api_key="sk-other")}, pool=pool)
+
+    chat = first.load("chat")
+    assert first.load("chat") is chat  # manager cache, no extra reference
+    assert second.load("gpt4o-chat") is chat
+    assert other_key.load("chat") is not chat
+    assert first.load("chat", temperature=0.1) is not chat
+    first.load_embeddings("embed")
+
+    stats = pool.stats()
+    assert stats["size"] == 4
+    assert stats["references"] == 5
+    assert stats["hits"] == 1 and stats["misses"] == 4
+
+    first.close()
+    assert pool.stats()["references"] == 2
+    assert second.load("gpt4o-chat") is chat
+
+    del second, other_key
+    gc.collect()
+    assert len(pool) == 0
+
+
+def test_clients_of_different_configs_are_built_concurrently():
+    pool = ModelPool()
+    # each build waits for the other one, a build under a global lock would time out
+    both_building = threading.Barrier(2, timeout=5)
+
+    def build(name):
+        both_building.wait()
+        return name
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        clients = list(executor.map(lambda key: pool.acquire(key, lambda: build(key)), ["a", "b"]))
+    assert clients == ["a", "b"]
+
+
+def test_concurrent_first_uses_of_one_config_build_once():
+    pool = ModelPool()
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: pool.acquire("key", build), range(8)))
+    assert len(builds) == 1
+    assert all(client is clients[0] for client in clients)
+    assert pool.stats()["references"] == 8
+
+
+def test_config_key_includes_secrets_but_not_names():
+    assert model_config_key("chat", _config("a")) == model_config_key("chat", _config("b"))
+    assert model_config_key("chat", _config("a")) != model_config_key("chat", _config("a", api_key="sk-2"))
+    assert model_config_key("chat", _config("a")) != model_config_key("embeddings", _config("a"))
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.config import BackendConfig
+from grox.documents.numpy_store import NumpyVectorStore
+from grox.documents.retriever import DocumentRetriever
+from grox.factory import build_document_store
+
+
+class TableEmbeddings(Embeddings):
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def _random_store(metric, size=200, dims=16, seed=7):
+    rng = np.random.default_rng(seed)
+    vectors = {f"doc{i}": rng.normal(size=dims).tolist() for i in range(size)}
+    vectors.update({f"query{i}": rng.normal(size=dims).tolist() for i in range(5)})
+    store = NumpyVectorStore(TableEmbeddings(vectors), distance_metric=metric)
+    texts = [f"doc{i}" for i in range(size)]
+    store.add_texts(texts, [{"n": i} for i in range(size)], ids=texts)
+    return store, vectors, texts
+
+
+def _brute_force(metric, vectors, texts, query, k):
+    matrix = np.array([vectors[t] for t in texts])
+    q = np.array(vectors[query])
+    if metric == "cosine":
+        scores = matrix @ q / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(q))
+        order = np.argsort(-scores)
+    elif metric == "ip":
+        scores = matrix @ q
+        order = np.argsort(-scores)
+    else:
+        scores = np.linalg.norm(matrix - q, axis=1)
+        order = np.argsort(scores)
+    return [texts[i] for i in order[:k]], scores[order[:k]]
+
+
+@pytest.mark.parametrize("metric", ["cosine", "ip", "l2"])
+def test_matches_brute_force(metric):
+    store, vectors, texts = _random_store(metric)
+    for i in range(5):
+        expected_ids, expected_scores = _brute_force(metric, vectors, texts, f"query{i}", 10)
+        results = store.similarity_search_with_score(f"query{i}", k=10)
+        assert [doc.id for doc, _ in results] == expected_ids
+        assert np.allclose([score for _, score in results], expected_scores, atol=1e-4)
+
+    batched = store.batch_similarity_search_with_score([f"query{i}" for i in range(5)], k=10)
+    assert [[doc.id for doc, _ in hits] for hits in batched] == [
+        _brute_force(metric, vectors, texts, f"query{i}", 10)[0] for i in range(5)
+    ]
+
+
+def test_delete_upsert_and_mmap_roundtrip(tmp_path):
+    store, vectors, texts = _random_store("cosine", size=20)
+    assert store.delete(ids=["doc3", "doc19", "missing"])
+    store.add_texts(["doc5"], [{"n": "updated"}], ids=["doc5"])
+    assert len(store) == 18
+    assert store.get_by_ids(["doc5"])[0].metadata == {"n": "updated"}
+
+    store.save(str(tmp_path / "index"))
+    loaded = NumpyVectorStore.load(str(tmp_path / "index"), store.embedding)
+    assert len(loaded) == 18
+    expected = [doc.id for doc, _ in store.similarity_search_with_score("query0", k=5)]
+    assert [doc.id for doc, _ in loaded.similarity_search_with_score("query0", k=5)] == expected
+
+    # writes after an mmap load copy the matrix instead of failing
+    loaded.add_texts(["doc3"], ids=["doc3"])
+    assert len(loaded) == 19
+
+
+def test_ivf_recall_and_exact_fallback():
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(32, 24))
+    vectors = (centers[rng.integers(0, 32, size=3000)] + 0.3 * rng.normal(size=(3000, 24))).astype(np.float32)
+    ids = [str(i) for i in range(len(vectors))]
+
+    store = NumpyVectorStore(TableEmbeddings({}), algorithm="ivf", nprobe=8, min_train_size=1000)
+    store.add_vectors(vectors, ids, ids=ids)
+
+    recalls = []
+    for query in vectors[:50] + 0.1:
+        exact = {doc.id for doc, _ in store.similarity_search_with_score_by_vector(query, k=10, exact=True)}
+        approx = {doc.id for doc, _ in store.similarity_search_with_score_by_vector(query, k=10)}
+        recalls.append(len(exact & approx) / 10)
+    assert np.mean(recalls) > 0.8
+
+    # every list scanned is exact again, also after deletes moved rows around
+    store.delete(ids=ids[:500])
+    query = vectors[600]
+    exact = [doc.id for doc, _ in store.similarity_search_with_score_by_vector(query, k=10, exact=True)]
+    full_probe = [doc.id for doc, _ in store.similarity_search_with_score_by_vector(query, k=10, nprobe=10_000)]
+    assert full_probe == exact
+
+
+def test_score_threshold_keeps_near_documents_under_l2():
+    vectors = {"near": [1.0, 0.0], "far": [5.0, 5.0], "query": [1.1, 0.0]}
+    store = NumpyVectorStore(TableEmbeddings(vectors), distance_metric="l2")
+    store.add_texts(["near", "far"], ids=["near", "far"])
+    retriever = DocumentRetriever(store, structlog.get_logger())
+
+    found = retriever.get_relevant_documents("query", search_type="similarity_search_with_score", score_threshold=0.5)
+
+    # distances 0.1 and ~6.3, similarities 1/(1+d) ~0.91 and ~0.14
+    assert [doc.page_content for doc in found] == ["near"]
+
+
+def test_ivf_is_rejected_by_the_redis_backend(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [{
+        "name": "faq",
+        "schema": {"fields": [{"name": "content_vector", "type": "vector", "attrs": {"algorithm": "ivf", "nlist": 8}}]},
+        "data": [{"documents": ["a"], "metadata": {}}],
+    }]}))
+    config = BackendConfig(name="vector_store", backend="redis", url="redis://localhost:6379/0")
+
+    with pytest.raises(ValueError, match="'faq'.*algorithm 'ivf', nlist.*'numpy'"):
+        build_document_store(TableEmbeddings({}), "tenant", "project", [str(documents)], config, structlog.get_logger())
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+import redis
+import redis.asyncio as async_redis
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.redis import RedisSaver
+
+from grox.checkpoints.redis_history import PipelinedRedisChatMessageHistory
+from grox.checkpoints.redis_saver import AsyncPipelinedRedisSaver, PipelinedRedisSaver
+from grox.config import WriteFlushConfig
+
+
+class _Pipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def json(self):
+        return self
+
+    def set(self, key, path, value, nx=False):
+        self.commands.append(("set", key, nx))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    def execute(self):
+        if self.client.fail:
+            self.client.fail -= 1
+            raise redis.exceptions.ConnectionError("connection lost")
+        self.client.executed.append(self.commands)
+        return [True] * len(self.commands)
+
+
+class _AsyncPipeline(_Pipeline):
+    async def execute(self):
+        return super().execute()
+
+
+class _Client:
+    def __init__(self, pipeline_class=_Pipeline):
+        self.pipeline_class = pipeline_class
+        self.executed = []
+        self.fail = 0
+
+    def pipeline(self, transaction=True):
+        return self.pipeline_class(self)
+
+
+def _saver(policy="immediate", ttl=None):
+    saver = PipelinedRedisSaver(
+        redis_client=redis.Redis(),
+        ttl={"default_ttl": ttl},
+        flush=WriteFlushConfig(policy=policy),
+    )
+    saver._redis = _Client()
+    return saver
+
+
+CONFIG = {"configurable": {"thread_id": "tenant:proj:session", "checkpoint_ns": ""}}
+STEP = {"configurable": {"thread_id": "tenant:proj:session", "checkpoint_ns": "", "checkpoint_id": "1"}}
+
+
+def _checkpoint():
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": ["hi"]}
+    return checkpoint
+
+
+def test_checkpoint_is_one_round_trip():
+    saver = _saver(ttl=2)
+
+    saver.put(CONFIG, _checkpoint(), {"source": "loop", "step": 1}, {"messages": "1"})
+
+    assert len(saver._redis.executed) == 1
+    commands = saver._redis.executed[0]
+    assert [op for op, *_ in commands] == ["set", "set", "expire", "expire"]
+    # the saver ttl is in minutes
+    assert {seconds for op, _, seconds in commands if op == "expire"} == {120}
+
+
+def test_step_policy_sends_writes_with_the_checkpoint():
+    immediate, step = _saver(), _saver("step")
+    for saver in (immediate, step):
+        for task in ("a", "b", "c"):
+            saver.put_writes(STEP, [("messages", task)], task)
+        saver.put(CONFIG, _checkpoint(), {}, {})
+
+    assert len(immediate._redis.executed) == 4
+    assert len(step._redis.executed) == 1
+    assert len(step._redis.executed[0]) == 3 + 1
+    # task writes are insert-only, as with RedisSaver
+    assert all(nx for op, _, nx in step._redis.executed[0][:3])
+
+
+def test_reads_flush_buffered_writes(monkeypatch):
+    monkeypatch.setattr(RedisSaver, "get_tuple", lambda self, config: None)
+    saver = _saver("step")
+    saver.put_writes(STEP, [("messages", "a")], "a")
+    assert saver._redis.executed == []
+
+    saver.get_tuple(STEP)
+
+    assert len(saver._redis.executed) == 1
+
+
+def test_failed_flush_keeps_buffered_writes():
+    saver = _saver("step")
+    saver.put_writes(STEP, [("messages", "a")], "a")
+    saver._redis.fail = 1
+
+    with pytest.raises(redis.exceptions.ConnectionError):
+        saver.put(CONFIG, _checkpoint(), {}, {})
+    saver.flush()
+
+    assert len(saver._redis.executed) == 1
+    assert saver._redis.executed[0][0][1].startswith("checkpoint_write:")
+
+
+def test_async_step_policy():
+    async def main():
+        saver = AsyncPipelinedRedisSaver(redis_client=async_redis.Redis(), flush=WriteFlushConfig(policy="step"))
+        saver._redis = _Client(_AsyncPipeline)
+        await saver.aput_writes(STEP, [("messages", "a")], "a")
+        await saver.aput_writes(STEP, [("messages", "b")], "b")
+        await saver.aflush()
+        await saver.aflush()
+        return saver._redis.executed
+
+    executed = asyncio.run(main())
+    assert len(executed) == 1 and len(executed[0]) == 2
+
+
+class _Index:
+    def __init__(self):
+        self.loads = []
+
+    def load(self, data, keys, ttl=None, batch_size=None):
+        self.loads.append((data, keys, ttl))
+
+
+def test_chat_history_writes_a_turn_at_once(monkeypatch):
+    index = _Index()
+    created = []
+
+    def create_index(self):
+        created.append(self.index_name)
+        self.index = index
+    monkeypatch.setattr(PipelinedRedisChatMessageHistory.__bases__[0], "_create_search_index", create_index)
+
+    history = PipelinedRedisChatMessageHistory("session", redis_client=redis.Redis(), key_prefix="chat:", ttl=60,
+                                               index_name="idx:test_pipelined")
+    history.add_messages([HumanMessage("hello"), AIMessage("hi there")])
+    PipelinedRedisChatMessageHistory("other", redis_client=history.redis_client, index_name="idx:test_pipelined")
+
+    # the index is set up once per process, not per session object
+    assert created == ["idx:test_pipelined"]
+    assert len(index.loads) == 1
+    records, keys, ttl = index.loads[0]
+    assert [record["data"]["content"] for record in records] == ["hello", "hi there"]
+    assert records[0]["timestamp"] < records[1]["timestamp"]
+    assert all(key.startswith("chat:session:") for key in keys) and ttl == 60
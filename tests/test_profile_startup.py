@@ -0,0 +1,53 @@
+import subprocess
+import sys
+
+import yaml
+from click.testing import CliRunner
+
+from grox.cli import cli
+
+
+def _write_app(tmp_path):
+    (tmp_path / "backends.yaml").write_text(yaml.safe_dump([
+        {"name": "checkpoint_saver", "backend": "memory"},
+        {"name": "chat_history", "backend": "memory"},
+    ]))
+    (tmp_path / "grox.yaml").write_text(yaml.safe_dump({
+        "version": "1.0.0",
+        "metadata": {"title": "Project", "project": "proj"},
+        "infrastructure": {"backends": ["backends.yaml"]},
+    }))
+    (tmp_path / "app.yaml").write_text(yaml.safe_dump({
+        "service": "svc",
+        "tenants": {"tenant": [str(tmp_path / "grox.yaml")]},
+    }))
+    return str(tmp_path / "app.yaml")
+
+
+def test_profile_startup_reports_phases(tmp_path):
+    result = CliRunner().invoke(cli, ["profile-startup", "--app", _write_app(tmp_path), "--top", "3"])
+
+    assert result.exit_code == 0, result.output
+    assert "import grox:" in result.output
+    assert "import grox.context:" in result.output
+    row = next(line for line in result.output.splitlines() if line.startswith("tenant/proj"))
+    config_load, model_init, backend_init, graph_compile, indexing, total = row.split()[1:]
+    assert all(cell.endswith("s") for cell in (config_load, model_init, backend_init, graph_compile, total))
+    # no documents, nothing indexed
+    assert indexing == "-"
+
+
+IMPORT_GROX = """
+import sys
+import structlog  # structlog.dev loads colorama on its own, if installed
+sys.modules.pop("colorama", None)
+stdout = sys.stdout
+import grox
+assert "colorama" not in sys.modules, "import grox loaded colorama"
+assert sys.stdout is stdout, "import grox wrapped stdout"
+"""
+
+
+def test_import_grox_leaves_colorama_alone():
+    result = subprocess.run([sys.executable, "-c", IMPORT_GROX], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
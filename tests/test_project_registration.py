@@ -0,0 +1,189 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+import grox.context as context_module
+from grox.config import GroxAppConfig, GroxProjectConfig, ProjectMetadata
+from grox.context import GroxContext, GroxExecutionContext
+
+
+def _write_projects(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"grox_{i}.yaml"
+        path.write_text(yaml.safe_dump({
+            "version": "1.0.0",
+            "metadata": {"title": f"Project {i}", "project": f"proj_{i}"},
+        }))
+        paths.append(str(path))
+    return paths
+
+
+class SlowProject(context_module.GroxProject):
+    builds = 0
+    builds_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        with SlowProject.builds_lock:
+            SlowProject.builds += 1
+        time.sleep(0.05)
+        super().__init__(*args, **kwargs)
+
+
+@pytest.mark.parametrize("mode", ["serial", "parallel", "lazy"])
+def test_register_all_projects_modes(tmp_path, fresh_context, mode):
+    app = GroxAppConfig(tenants={"tenant": _write_projects(tmp_path, 4)})
+    ctx = GroxContext(app)
+    ctx.register_all_projects(mode=mode)
+
+    assert sorted(ctx.list_projects()) == [("tenant", f"proj_{i}") for i in range(4)]
+    project = ctx.get_project("tenant", "proj_2")
+    assert project.project_code == "proj_2"
+    assert ctx.get_project("tenant", "proj_2") is project
+    assert ctx.create_execution_context("tenant", "proj_3").project_code == "proj_3"
+
+
+@pytest.mark.parametrize("mode", ["serial", "parallel", "lazy"])
+def test_registry_is_published_once_per_batch(tmp_path, fresh_context, monkeypatch, mode):
+    app = GroxAppConfig(tenants={"tenant": _write_projects(tmp_path, 4)})
+    ctx = GroxContext(app)
+    updates = []
+    update_projects = ctx._update_projects
+    monkeypatch.setattr(ctx, "_update_projects", lambda update: updates.append(update) or update_projects(update))
+
+    ctx.register_all_projects(mode=mode)
+
+    assert len(updates) == 1
+    assert len(ctx.list_projects()) == 4
+
+
+def test_lazy_project_is_built_once(tmp_path, fresh_context, monkeypatch):
+    monkeypatch.setattr(context_module, "GroxProject", SlowProject)
+    SlowProject.builds = 0
+
+    app = GroxAppConfig(tenants={"tenant": _write_projects(tmp_path, 2)})
+    ctx = GroxContext(app)
+    ctx.register_all_projects(mode="lazy")
+    assert SlowProject.builds == 0
+
+    results = [None] * 8
+    def worker(i):
+        results[i] = ctx.get_project("tenant", "proj_0")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowProject.builds == 1
+    assert all(project is results[0] for project in results)
+
+
+def test_least_recently_used_projects_are_evicted_and_rebuilt(tmp_path, fresh_context):
+    app = GroxAppConfig(tenants={"tenant": _write_projects(tmp_path, 3)}, eviction={"max_projects": 2})
+    ctx = GroxContext(app)
+    evicted = []
+    ctx.add_eviction_hook(lambda project: evicted.append(project.project_code))
+    ctx.register_all_projects(mode="lazy")
+
+    first = ctx.get_project("tenant", "proj_0")
+    ctx.get_project("tenant", "proj_1")
+    ctx.get_project("tenant", "proj_0")  # proj_1 is now the least recently used
+    ctx.get_project("tenant", "proj_2")
+
+    assert evicted == ["proj_1"]
+    assert ctx.project_stats()["active"]["size"] == 2
+    assert ctx.get_project("tenant", "proj_0") is first
+
+    rebuilt = ctx.get_project("tenant", "proj_1")
+    assert rebuilt.project_code == "proj_1"
+    assert evicted == ["proj_1", "proj_2"]
+    assert len(ctx.list_projects()) == 3
+
+
+def test_idle_projects_are_evicted(tmp_path, fresh_context):
+    app = GroxAppConfig(tenants={"tenant": _write_projects(tmp_path, 2)}, eviction={"idle_ttl": "1s"})
+    ctx = GroxContext(app)
+    ctx.register_all_projects(mode="parallel")
+    assert ctx.project_stats()["active"]["size"] == 2
+
+    time.sleep(1.1)
+    assert ctx.evict_idle_projects() == 2
+    assert ctx.get_project("tenant", "proj_0").project_code == "proj_0"
+
+
+def test_lookups_sweep_idle_projects_without_closing_them(tmp_path, fresh_context, monkeypatch):
+    closed = []
+    monkeypatch.setattr(context_module.GroxProject, "close", lambda project: closed.append(project))
+    app = GroxAppConfig(tenants={"tenant": _write_projects(tmp_path, 2)}, eviction={"idle_ttl": "1s"})
+    ctx = GroxContext(app)
+    evicted = []
+    ctx.add_eviction_hook(lambda project: evicted.append(project.project_code))
+    ctx.register_all_projects(mode="serial")
+
+    time.sleep(1.1)
+    ctx.get_project("tenant", "proj_0")
+    assert evicted == ["proj_1"]
+    # requests still running on an evicted project keep its state
+    assert closed == []
+
+
+def test_lookups_run_against_concurrent_registration(fresh_context):
+    ctx = GroxContext(GroxAppConfig())
+    projects = [SimpleNamespace(tenant_id="tenant", project_code=f"proj_{i}") for i in range(200)]
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        while not stop.is_set():
+            try:
+                for project in projects:
+                    found = ctx.get_project("tenant", project.project_code)
+                    assert found is None or found is project
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for project in projects:
+        ctx.register_project(project)
+    for project in projects[::2]:
+        ctx.unregister_project("tenant", project.project_code)
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert not errors
+    assert len(ctx.list_projects()) == 100
+    assert GroxContext.get_instance() is ctx
+
+
+def test_execution_context_reads_through_to_project(fresh_context):
+    app = GroxAppConfig(service="svc")
+    project = context_module.GroxProject(app, "tenant", GroxProjectConfig(
+        version="1.0.0", metadata=ProjectMetadata(title="t", project="proj"),
+    ))
+    ctx = GroxExecutionContext(project, correlation_id="corr", user_id=None)
+
+    assert (ctx.tenant_id, ctx.project_code, ctx.input) == ("tenant", "proj", {})
+    assert ctx.model_manager is project.model_manager
+    assert not hasattr(ctx, "document_store")
+    with pytest.raises(AttributeError):
+        ctx._loop
+
+    assert ctx._logger is None
+    bound = ctx.logger._context
+    assert bound["correlation_id"] == "corr" and bound["service"] == "svc"
+    assert "user_id" not in bound
+    assert ctx.logger is ctx.logger
+
+    # request state set on the context stays on it
+    ctx.retries = 2
+    ctx.project_code = "other"
+    assert (ctx.retries, ctx.project_code, project.project_code) == (2, "other", "proj")
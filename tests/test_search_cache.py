@@ -0,0 +1,68 @@
+import structlog
+import yaml
+from langchain_core.embeddings import Embeddings
+
+from grox.cache import TTLCache
+from grox.config import BackendConfig, CacheConfig, GroxProjectConfig, OrchestrationConfig, ProjectMetadata
+from grox.documents.schema import DocumentSearchParams
+from grox.factory import build_document_store
+from grox.project import search_result_cache_config
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.queries = 0
+
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.queries += 1
+        return [float(len(text)), 1.0]
+
+
+def test_search_results_are_cached_until_reindex(tmp_path):
+    documents = tmp_path / "documents.yaml"
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["short", "a bit longer"], "metadata": {}}]},
+    ]}))
+
+    model = CountingEmbeddings()
+    store = build_document_store(
+        model, "tenant", "project", [str(documents)],
+        BackendConfig(name="vector_store", backend="numpy"), structlog.get_logger(),
+        result_cache=TTLCache(max_size=8),
+    )
+    store.index_documents("faq")
+
+    params = DocumentSearchParams(query="short", collection_name="faq", num_results=1)
+    first = store._tool_fn(params)
+    assert store._tool_fn(params) == first
+    assert model.queries == 1
+
+    store.reindex_documents("faq")  # nothing changed, cache stays valid
+    store._tool_fn(params)
+    assert model.queries == 1
+
+    documents.write_text(yaml.safe_dump({"version": "0.1.0", "collections": [
+        {"name": "faq", "data": [{"documents": ["short", "much much longer"], "metadata": {}}]},
+    ]}))
+    store.reload_collections()
+    store.reindex_documents("faq")
+    store._tool_fn(params)
+    assert model.queries == 2
+
+
+def test_result_cache_is_on_by_default_for_in_process_backends_only():
+    def config(cache=None):
+        return GroxProjectConfig(
+            version="1.0.0", metadata=ProjectMetadata(title="t", project="p"),
+            orchestration=OrchestrationConfig(search_result_cache=cache),
+        )
+
+    numpy = BackendConfig(name="vector_store", backend="numpy")
+    redis = BackendConfig(name="vector_store", backend="redis", url="redis://localhost:6379/0")
+    assert search_result_cache_config(config(), numpy) == CacheConfig(max_size=256, ttl="5m")
+    # versions are per process, another worker's reindex would go unnoticed
+    assert search_result_cache_config(config(), redis).enabled is False
+    assert search_result_cache_config(config(CacheConfig(ttl="30s")), redis) == CacheConfig(ttl="30s")
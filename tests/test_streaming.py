@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+import structlog
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import START, MessagesState, StateGraph
+
+from grox.config import GroxProjectConfig, OrchestrationConfig, ProjectMetadata, StreamingConfig
+from grox.grox import Grox
+
+
+class _Context:
+    """The parts of GroxExecutionContext Grox uses, around a small graph with a streaming model."""
+
+    tenant_id = "tenant"
+    project_code = "project"
+
+    def __init__(self, answer="hello streaming world", streaming=None):
+        self.logger = structlog.wrap_logger(structlog.ReturnLogger())
+        self.config = GroxProjectConfig(
+            version="1.0.0",
+            metadata=ProjectMetadata(title="test", project="project"),
+            orchestration=OrchestrationConfig(streaming=streaming or StreamingConfig()),
+        )
+        model = GenericFakeChatModel(messages=iter([AIMessage(answer)]))
+
+        async def agent(state):
+            return {"messages": [await model.ainvoke(state["messages"])]}
+
+        def tools(state):
+            return {"messages": [ToolMessage("sunny", tool_call_id="call")]}
+
+        builder = StateGraph(MessagesState)
+        builder.add_node("agent", agent)
+        builder.add_node("tools", tools)
+        builder.add_edge(START, "agent")
+        builder.add_edge("agent", "tools")
+        self.graph = builder.compile(checkpointer=InMemorySaver())
+        self.flushed = 0
+
+    def graph_config(self, thread_id):
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def wait_ready(self):
+        pass
+
+    async def flush_checkpoints(self):
+        self.flushed += 1
+
+
+EVENT = {"session_id": "s1", "prompt": "weather?"}
+
+
+def test_updates_mode_is_the_default(capsys):
+    context = _Context()
+    chunks = []
+
+    asyncio.run(Grox(context).handle_event(EVENT, chunks.append))
+
+    assert [list(chunk) for chunk in chunks] == [["agent"], ["tools"]]
+    assert chunks[0]["agent"]["messages"][0].content == "hello streaming world"
+    assert context.flushed == 1
+    # nothing printed on the hot path
+    assert capsys.readouterr().out == ""
+
+
+def test_tokens_mode_streams_llm_tokens_before_the_node_update(capsys):
+    context = _Context(streaming=StreamingConfig(mode="tokens"))
+    chunks = []
+
+    asyncio.run(Grox(context).handle_event(EVENT, chunks.append))
+
+    tokens = [chunk for chunk in chunks if "token" in chunk]
+    assert len(tokens) > 1
+    assert "".join(chunk["token"] for chunk in tokens) == "hello streaming world"
+    assert {chunk["node"] for chunk in tokens} == {"agent"}
+    # the tool result is not a token, it comes with the update of its node
+    assert [next(iter(chunk)) for chunk in chunks if "token" not in chunk] == ["agent", "tools"]
+    assert chunks.index(tokens[-1]) < chunks.index(next(chunk for chunk in chunks if "agent" in chunk))
+    assert capsys.readouterr().out == ""
+
+
+def test_async_output_stream_is_awaited_before_the_graph_continues():
+    context = _Context()
+    pending = []
+    received = []
+
+    async def output(chunk):
+        pending.append(chunk)
+        await asyncio.sleep(0)
+        # the previous chunk was fully handled before this one was produced
+        assert pending == [chunk]
+        received.append(pending.pop())
+
+    asyncio.run(Grox(context).handle_event(EVENT, output, mode="tokens"))
+
+    assert "".join(chunk.get("token", "") for chunk in received) == "hello streaming world"
+
+
+def test_stream_event_as_async_iterator():
+    context = _Context()
+
+    async def first_token():
+        stream = Grox(context).stream_event(EVENT, mode="tokens")
+        async for chunk in stream:
+            await stream.aclose()
+            return chunk
+
+    assert asyncio.run(first_token()) == {"token": "hello", "node": "agent"}
+    assert context.flushed == 1
+
+
+class _TokenCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.tokens = 0
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens += 1
+
+
+def test_tokens_are_not_generated_ahead_of_a_stalled_consumer():
+    context = _Context(answer="one two three four five six seven eight")
+    counter = _TokenCounter()
+    graph_config = context.graph_config
+    context.graph_config = lambda thread_id: {**graph_config(thread_id), "callbacks": [counter]}
+
+    async def stall_after_first_token():
+        stream = Grox(context).stream_event(EVENT, mode="tokens")
+        first = await stream.__anext__()
+        await asyncio.sleep(0.1)
+        generated = counter.tokens
+        await stream.aclose()
+        return first, generated
+
+    first, generated = asyncio.run(stall_after_first_token())
+    assert first["token"] == "one"
+    # one token taken, one buffered, one waiting for the buffer; not the whole answer
+    assert generated <= 3
+
+
+def test_debug_prints_chunks(capsys):
+    context = _Context(streaming=StreamingConfig(debug=True))
+    asyncio.run(Grox(context).handle_event(EVENT, lambda chunk: None))
+    assert "chunk" in capsys.readouterr().out
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        asyncio.run(Grox(_Context()).handle_event(EVENT, print, mode="values"))